@@ -0,0 +1 @@
+say pack3
@@ -2,16 +2,22 @@ __all__ = [
     "Mecha",
     "MechaOptions",
     "AstCacheBackend",
+    "AstContentCache",
     "FORMATTING_PRESETS",
 ]
 
 
 import csv
+import hashlib
 import logging
+import multiprocessing
 import os
 import pickle
+import shutil
 import sys
-from contextlib import contextmanager
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from dataclasses import InitVar, dataclass
 from glob import glob
 from io import BufferedReader, BufferedWriter
@@ -25,6 +31,7 @@ from typing import (
     List,
     Literal,
     Optional,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -69,7 +76,7 @@ from .diagnostic import (
     DiagnosticErrorSummary,
 )
 from .dispatch import Dispatcher, MutatingReducer, Reducer
-from .parse import delegate, get_parsers
+from .parse import MemoizedParser, ParseMemoStats, delegate, get_parsers
 from .preprocess import wrap_backslash_continuation
 from .serialize import FormattingOptions, Serializer
 from .spec import CommandSpec
@@ -81,6 +88,29 @@ PackType = TypeVar("PackType", bound=Union[ResourcePack, DataPack])
 
 logger = logging.getLogger("mecha")
 
+ParseJob = Tuple[str, str, Optional[bool]]
+
+worker_mecha: Optional["Mecha"] = None
+
+
+def initialize_parse_worker(mecha: "Mecha"):
+    """Make the forked mecha instance available to the parse worker."""
+    global worker_mecha
+    worker_mecha = mecha
+
+
+def parse_in_worker(jobs: List[ParseJob]) -> List[Any]:
+    """Parse a batch of sources and return the ast or the syntax error for each."""
+    results: List[Any] = []
+
+    for text, parser, multiline in jobs:
+        try:
+            results.append(worker_mecha.parse_text(text, parser, multiline))  # pyright: ignore[reportOptionalMemberAccess]
+        except InvalidSyntax as exc:
+            results.append(exc)
+
+    return results
+
 
 @dataclass
 class AstCacheBackend:
@@ -110,6 +140,78 @@ class AstCacheBackend:
         self.dump_data({"ast": node}, f)
 
 
+@dataclass
+class AstContentCache:
+    """Ast cache keyed by a hash of the source text.
+
+    The directory can be shared across projects. When the total size exceeds the
+    limit, the least recently used entries get evicted.
+    """
+
+    directory: Path
+    max_size: int = 256 * 1024 * 1024
+
+    def get_path(self, key: str) -> Path:
+        """Return the path of the entry associated with the given key."""
+        return self.directory / f"{key}.ast"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the path of the entry if it exists and mark it as recently used."""
+        path = self.get_path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[BufferedWriter]:
+        """Write a new entry atomically."""
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with tmp.open("wb") as f:
+                yield f
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def store(self, key: str, source: Path):
+        """Copy an existing file into the cache."""
+        with self.open(key) as f, source.open("rb") as src:
+            shutil.copyfileobj(src, f)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits the limit."""
+        entries: List[Tuple[float, int, str]] = []
+        total = 0
+
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".ast"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+
+        if total <= self.max_size:
+            return
+
+        entries.sort()
+
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
 FORMATTING_PRESETS: Dict[str, JsonDict] = {
     "minify": {
         "layout": "dense",
@@ -137,7 +239,12 @@ class MechaOptions(BaseModel):
     match: Optional[List[str]] = None
     rules: Dict[str, Literal["ignore", "info", "warn", "error"]] = {}
     cache: bool = True
+    content_cache: Union[bool, FileSystemPath] = True
+    content_cache_size: int = 256 * 1024 * 1024
     output_perf: Optional[FileSystemPath] = None
+    parallel: bool = False
+    max_workers: Optional[int] = None
+    memoize: List[str] = []
 
     @field_validator("formatting", mode="before")
     @classmethod
@@ -162,10 +269,18 @@ class Mecha:
     directory: Path = extra_field(init=False)
     cache: Optional[Cache] = extra_field(default=None)
     cache_backend: AstCacheBackend = extra_field(default_factory=AstCacheBackend)
+    content_cache: Optional[AstContentCache] = extra_field(default=None)
     output_perf: Optional[FileSystemPath] = extra_field(default=None)
     perf_report: Optional[List[Tuple[str, str, int, List[float]]]] = extra_field(
         default=None
     )
+    parallel: bool = extra_field(default=False)
+    max_workers: Optional[int] = extra_field(default=None)
+    prefetched: Dict[ParseJob, List[Any]] = extra_field(
+        init=False, default_factory=dict
+    )
+    memoize: Set[str] = extra_field(default_factory=set)
+    memo_stats: ParseMemoStats = extra_field(default_factory=ParseMemoStats)
 
     spec: CommandSpec = extra_field(default=None)
 
@@ -217,9 +332,29 @@ class Mecha:
             if not self.cache and opts.cache:
                 self.cache = ctx.cache["mecha"]
 
+            if not self.content_cache and opts.content_cache:
+                if opts.content_cache is True:
+                    if self.cache:
+                        self.content_cache = AstContentCache(
+                            self.cache.get_path("ast-content"),
+                            opts.content_cache_size,
+                        )
+                else:
+                    self.content_cache = AstContentCache(
+                        ctx.directory / Path(opts.content_cache).expanduser(),
+                        opts.content_cache_size,
+                    )
+
             if opts.output_perf:
                 self.output_perf = ctx.directory / opts.output_perf
 
+            if opts.parallel:
+                self.parallel = True
+            if opts.max_workers is not None:
+                self.max_workers = opts.max_workers
+            if opts.memoize:
+                self.memoize.update(opts.memoize)
+
             if opts.commands is not None:
                 commands = [
                     p
@@ -282,18 +417,70 @@ class Mecha:
         multiline: Optional[bool] = None,
     ) -> Iterator[TokenStream]:
         """Prepare the token stream for parsing."""
+        self.wrap_memoized_parsers()
         with (
             stream.reset(*stream.data),
             stream.provide(
                 spec=self.spec,
                 multiline=self.spec.multiline if multiline is None else multiline,
             ),
+            stream.provide(parse_memo={}) if self.memoize else nullcontext(),
         ):
             with stream.reset_syntax(comment=r"#.*$", literal=AstLiteral.regex.pattern):
                 with stream.indent(skip=["comment"]), stream.ignore("indent", "dedent"):
                     with stream.intercept("newline", "eof"):
                         yield stream
 
+    def wrap_memoized_parsers(self):
+        """Wrap the parsers listed in memoize that aren't memoized yet."""
+        for name in self.memoize:
+            parser = self.spec.parsers[name]
+            if not isinstance(parser, MemoizedParser):
+                self.spec.parsers[name] = MemoizedParser(name, parser, self.memo_stats)
+
+    def get_content_key(
+        self,
+        text: str,
+        parser: str,
+        multiline: Optional[bool] = None,
+        resource_location: Optional[str] = None,
+    ) -> str:
+        """Return the key of the content cache entry for the given source."""
+        if multiline is None:
+            multiline = self.spec.multiline
+        if resource_location is None:
+            resource_location = self.database[self.database.current].resource_location
+
+        digest = hashlib.sha256()
+
+        for part in [
+            self.cache_backend.version,
+            sys.version,
+            self.spec.get_fingerprint(),
+            parser,
+            str(multiline),
+            resource_location or "",
+            text,
+        ]:
+            digest.update(part.encode())
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    def parse_text(
+        self,
+        text: str,
+        parser: str,
+        multiline: Optional[bool] = None,
+        provide: Optional[JsonDict] = None,
+        preprocessor: Optional[Preprocessor] = None,
+    ) -> Any:
+        """Parse the given text with the specified parser."""
+        stream = TokenStream(text, preprocessor=preprocessor or self.preprocessor)
+        with self.prepare_token_stream(stream, multiline=multiline):
+            with stream.provide(**provide or {}):
+                return delegate(parser, stream)
+
     @overload
     def parse(
         self,
@@ -376,15 +563,51 @@ class Mecha:
 
             cache_miss = ast_path
 
-        stream = TokenStream(
-            source.text,
-            preprocessor=preprocessor or self.preprocessor,
-        )
+        text = source.text
+        content_key = None
+
+        if (
+            self.content_cache
+            and parser == AstRoot.parser
+            and source is self.database.current
+            and not provide
+            and not preprocessor
+        ):
+            content_key = self.get_content_key(
+                text,
+                parser,
+                multiline,
+                resource_location,
+            )
+            if content_path := self.content_cache.get(content_key):
+                try:
+                    with content_path.open("rb") as f:
+                        ast = self.cache_backend.load(f)
+                        logger.debug('Load cached ast for hash "%s".', content_key)
+                    if cache_miss:
+                        shutil.copyfile(content_path, cache_miss)
+                    return ast
+                except Exception:
+                    pass
 
         try:
-            with self.prepare_token_stream(stream, multiline=multiline):
-                with stream.provide(**provide or {}):
-                    ast = delegate(parser, stream)
+            if (
+                self.prefetched
+                and not provide
+                and not preprocessor
+                and (prefetched := self.prefetched.get((text, parser, multiline)))
+            ):
+                ast = prefetched.pop()
+                if isinstance(ast, InvalidSyntax):
+                    raise ast
+            else:
+                ast = self.parse_text(
+                    text,
+                    parser,
+                    multiline,
+                    provide,
+                    preprocessor,
+                )
         except InvalidSyntax as exc:
             if self.cache and filename and cache_miss:
                 self.cache.invalidate_changes(self.directory / filename)
@@ -403,6 +626,16 @@ class Mecha:
                     with cache_miss.open("wb") as f:
                         self.cache_backend.dump(ast, f)
                         logger.debug('Update cached ast for file "%s".', filename)
+                    if self.content_cache and content_key:
+                        self.content_cache.store(content_key, cache_miss)
+                        content_key = None
+                except Exception:
+                    pass
+            if self.content_cache and content_key:
+                try:
+                    with self.content_cache.open(content_key) as f:
+                        self.cache_backend.dump(ast, f)
+                        logger.debug('Update cached ast for hash "%s".', content_key)
                 except Exception:
                     pass
             return ast
@@ -532,6 +765,9 @@ class Mecha:
             self.database[result] = compilation_unit
             self.database.enqueue(result)
 
+        if self.parallel:
+            self.prefetch(multiline)
+
         for step, file_instance in self.database.process_queue():
             compilation_unit = self.database[file_instance]
             start_time = perf_counter_ns()
@@ -576,6 +812,8 @@ class Mecha:
 
             compilation_unit.perf[step] = (perf_counter_ns() - start_time) * 1e-06
 
+        self.prefetched.clear()
+
         sorted_source_files = sorted(
             self.database.session,
             key=lambda f: self.database[f].resource_location or "<unknown>",
@@ -612,6 +850,83 @@ class Mecha:
 
         return result
 
+    def prefetch(self, multiline: Optional[bool] = None):
+        """Parse the queued compilation units with a pool of worker processes.
+
+        The workers are forked so they inherit the command spec and the
+        parsers. Only the source text goes to the workers and the pickled
+        ast comes back. The results are picked up in order when the queue
+        gets processed, so diagnostics stay deterministic. Files with a
+        cached ast are skipped. The parsers must not depend on other files.
+
+        Forking a process that runs other threads can leave locks held by
+        those threads acquired forever in the children, so nothing gets
+        prefetched unless the current thread is the only one running.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Skip parallel parsing, forking processes isn't supported.")
+            return
+
+        if (thread_count := threading.active_count()) > 1:
+            logger.warning(
+                "Skip parallel parsing, %d other threads are running.",
+                thread_count - 1,
+            )
+            return
+
+        jobs: List[ParseJob] = []
+
+        for step, _, _, _, file_instance in self.database.queue:
+            compilation_unit = self.database[file_instance]
+            if step >= 0 or compilation_unit.ast:
+                continue
+            if self.cache and (filename := compilation_unit.filename):
+                path = self.directory / filename
+                try:
+                    if (
+                        self.cache.get_mtime(str(path)) == path.stat().st_mtime
+                        and self.cache.get_path(f"{path}-ast").is_file()
+                    ):
+                        continue
+                except OSError:
+                    pass
+            if self.content_cache and self.content_cache.get(
+                self.get_content_key(
+                    file_instance.text,
+                    AstRoot.parser,  # pyright: ignore[reportArgumentType]
+                    multiline,
+                    compilation_unit.resource_location,
+                )
+            ):
+                continue
+            jobs.append((file_instance.text, AstRoot.parser, multiline))  # pyright: ignore[reportArgumentType]
+
+        max_workers = self.max_workers or os.cpu_count() or 1
+        if len(jobs) < 2 or max_workers < 2:
+            return
+
+        chunk_size = -(-len(jobs) // (max_workers * 4))
+        chunks = [jobs[i : i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+        with ProcessPoolExecutor(
+            max_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=initialize_parse_worker,
+            initargs=(self,),
+        ) as executor:
+            futures: List[Future[List[Any]]] = [
+                executor.submit(parse_in_worker, chunk) for chunk in chunks
+            ]
+
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results = future.result()
+                except Exception as exc:
+                    logger.debug("Parse %d files serially: %s", len(chunk), exc)
+                    continue
+                for job, result in zip(chunk, results):
+                    self.prefetched.setdefault(job, []).append(result)
+
     def log_reported_diagnostics(self):
         """Log reported diagnostics."""
         for diagnostic in self.diagnostics.exceptions:
@@ -674,6 +989,8 @@ class Mecha:
             if errors := list(self.diagnostics.get_all_errors()):
                 raise DiagnosticErrorSummary(DiagnosticCollection(errors))
         finally:
+            if self.content_cache:
+                self.content_cache.evict()
             if path := self.output_perf:
                 logger.info('Output perf "%s".', os.path.relpath(path, self.directory))
                 with open(path, "w") as f:
@@ -12,7 +12,6 @@ __all__ = [
 from contextlib import contextmanager
 from dataclasses import dataclass, fields, replace
 from functools import partial
-from heapq import heappop, heappush
 from typing import (
     Any,
     Callable,
@@ -137,6 +136,13 @@ class Dispatcher(Generic[T]):
     ] = extra_field(init=False, default_factory=dict)
 
     count: int = extra_field(init=False, default=0)
+    dispatch_cache: Dict[
+        Type[Any],
+        Tuple[
+            List[Tuple[FrozenSet[Tuple[str, Any]], Optional[str], Callable[..., Any]]],
+            Optional[List[Tuple[Optional[str], Callable[..., Any]]]],
+        ],
+    ] = extra_field(init=False, default_factory=dict)
     diagnostics: DiagnosticCollection = extra_field(
         default_factory=DiagnosticCollection
     )
@@ -163,6 +169,8 @@ class Dispatcher(Generic[T]):
             rule_callbacks.append((self.count, rule.name, rule.callback))
             self.count += 1
 
+        self.dispatch_cache.clear()
+
         if rule.next:
             self.add_rule(rule.next)
 
@@ -199,45 +207,100 @@ class Dispatcher(Generic[T]):
                 for rule in arg:
                     self.add_rule(rule)
 
+        self.dispatch_cache.clear()
+
     def reset(self):
         """Remove all rules."""
         self.rules.clear()
         self.count = 0
+        self.dispatch_cache.clear()
+
+    def resolve_rules(
+        self,
+        node_type: Type[Any],
+    ) -> Tuple[
+        List[Tuple[FrozenSet[Tuple[str, Any]], Optional[str], Callable[..., Any]]],
+        Optional[List[Tuple[Optional[str], Callable[..., Any]]]],
+    ]:
+        """Return the ordered rules that can apply to the given node type.
+
+        When none of the rules match fields, the second element holds the
+        callbacks that should always be dispatched for the node type.
+        """
+        candidates: List[
+            Tuple[
+                Tuple[int, int, int],
+                FrozenSet[Tuple[str, Any]],
+                Optional[str],
+                Callable[..., Any],
+            ]
+        ] = []
+
+        for i, mro_type in enumerate(node_type.mro()):
+            if value := self.rules.get(mro_type):
+                for match_fields, callbacks in value.items():
+                    for priority, name, callback in callbacks:
+                        key = (i, -len(match_fields), -priority)
+                        candidates.append((key, match_fields, name, callback))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        conditional = False
+        unconditional: Set[Callable[..., Any]] = set()
+        rules: List[
+            Tuple[FrozenSet[Tuple[str, Any]], Optional[str], Callable[..., Any]]
+        ] = []
+
+        for _, match_fields, name, callback in candidates:
+            if callback in unconditional:
+                continue
+            if match_fields:
+                conditional = True
+            else:
+                unconditional.add(callback)
+            rules.append((match_fields, name, callback))
+
+        if conditional:
+            return rules, None
+
+        return rules, [(name, callback) for _, name, callback in rules]
 
     def dispatch(
         self,
         node: AbstractNode,
     ) -> Iterator[Tuple[Optional[str], Callable[..., Any]]]:
         """Dispatch rules."""
-        priority_queue: List[
-            Tuple[int, int, int, Optional[str], Callable[..., Any]]
-        ] = []
+        node_type = type(node)
 
-        for i, node_type in enumerate(type(node).mro()):
-            if value := self.rules.get(node_type):
-                for match_fields, callbacks in value.items():
-                    if all(
-                        (
-                            node == value
-                            if name == "self"
-                            else hasattr(node, name) and getattr(node, name) == value
-                        )
-                        for name, value in match_fields
-                    ):
-                        for priority, name, callback in callbacks:
-                            heappush(
-                                priority_queue,
-                                (i, -len(match_fields), -priority, name, callback),
-                            )
+        if (resolved := self.dispatch_cache.get(node_type)) is None:
+            resolved = self.resolve_rules(node_type)
+            self.dispatch_cache[node_type] = resolved
 
-        dispatched: Set[Callable[..., Any]] = set()
+        rules, callbacks = resolved
 
-        while priority_queue:
-            _, _, _, name, callback = heappop(priority_queue)
+        if callbacks is not None:
+            return iter(callbacks)
+
+        dispatched: Set[Callable[..., Any]] = set()
+        result: List[Tuple[Optional[str], Callable[..., Any]]] = []
+
+        for match_fields, name, callback in rules:
+            if callback in dispatched:
+                continue
+            if match_fields and not all(
+                (
+                    node == value
+                    if field_name == "self"
+                    else hasattr(node, field_name)
+                    and getattr(node, field_name) == value
+                )
+                for field_name, value in match_fields
+            ):
+                continue
+            dispatched.add(callback)
+            result.append((name, callback))
 
-            if callback not in dispatched:
-                dispatched.add(callback)
-                yield name, callback
+        return iter(result)
 
     def invoke(self, node: AbstractNode, *args: Any, **kwargs: Any) -> Any:
         """Invoke rules on the given ast node."""
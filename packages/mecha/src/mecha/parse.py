@@ -7,6 +7,8 @@ __all__ = [
     "get_stream_multiline",
     "get_stream_line_indentation",
     "UnrecognizedParser",
+    "ParseMemoStats",
+    "MemoizedParser",
     "delegate",
     "consume_line_continuation",
     "parse_root",
@@ -75,6 +77,7 @@ from dataclasses import dataclass, field
 from functools import partial
 from typing import (
     Any,
+    Counter,
     Dict,
     Iterator,
     List,
@@ -91,7 +94,14 @@ from uuid import UUID
 from beet import LATEST_MINECRAFT_VERSION
 from beet.core.utils import VersionNumber, split_version
 from nbtlib import Byte, Double, Float, Int, Long, OutOfRange, Short, String
-from tokenstream import InvalidSyntax, SourceLocation, TokenStream, set_location
+from tokenstream import (
+    InvalidSyntax,
+    SourceLocation,
+    TokenStream,
+    UnexpectedEOF,
+    UnexpectedToken,
+    set_location,
+)
 
 from .ast import (
     AstAdvancementPredicate,
@@ -639,6 +649,93 @@ class UnrecognizedParser(MechaError):
         self.parser = parser
 
 
+@dataclass
+class ParseMemoStats:
+    """Hit and miss counters of the packrat memo, grouped by parser."""
+
+    hits: Counter[str] = field(default_factory=Counter)
+    misses: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the proportion of memoized sub-parses that were reused."""
+        hits = sum(self.hits.values())
+        total = hits + sum(self.misses.values())
+        return hits / total if total else 0.0
+
+
+def is_memo_immutable(value: Any) -> bool:
+    """Return whether the value can't change after being added to a memo key."""
+    if isinstance(value, (tuple, frozenset)):
+        return all(is_memo_immutable(item) for item in value)
+    return value is None or isinstance(value, (bool, int, float, str, bytes))
+
+
+@dataclass
+class MemoizedParser:
+    """Packrat memoization of a parser's successful results within a token stream.
+
+    The memo table is the dict provided under the "parse_memo" stream data key.
+    Results are keyed by token position and the stream state and data visible to
+    the parser, so the parser must not have side effects. The parser runs without
+    the memo when the stream data contains values that aren't immutable.
+    """
+
+    name: str
+    parser: Parser
+    stats: ParseMemoStats = field(default_factory=ParseMemoStats, compare=False)
+
+    def __call__(self, stream: TokenStream) -> Any:
+        entries: Optional[Dict[Any, Tuple[Any, ...]]] = stream.data.get("parse_memo")
+        if entries is None:
+            return self.parser(stream)
+
+        data: List[Tuple[str, Any]] = []
+
+        for key, value in stream.data.items():
+            if key in ["spec", "parse_memo"]:
+                continue
+            if not is_memo_immutable(value):
+                return self.parser(stream)
+            data.append((key, value))
+
+        index = stream.index
+        memo_key = (
+            self.name,
+            index,
+            stream.tokens[index] if index >= 0 else None,
+            stream.syntax_rules,
+            frozenset(stream.ignored_tokens),
+            tuple(stream.indentation),
+            frozenset(stream.indentation_skip),
+            tuple(data),
+        )
+
+        if entry := entries.get(memo_key):
+            self.stats.hits[self.name] += 1
+            result, tokens, locations, indentation = entry
+            stream.crop()
+            stream.tokens.extend(tokens)
+            stream.preprocessed_locations.extend(locations)
+            stream.index = len(stream.tokens) - 1
+            stream.crop()
+            stream.indentation[:] = indentation
+            return result
+
+        self.stats.misses[self.name] += 1
+        result = self.parser(stream)
+
+        if stream.index >= index:
+            entries[memo_key] = (
+                result,
+                stream.tokens[index + 1 : stream.index + 1],
+                stream.preprocessed_locations[index + 1 : stream.index + 1],
+                list(stream.indentation),
+            )
+
+        return result
+
+
 @overload
 def delegate(parser: str) -> Parser: ...
 
@@ -719,70 +816,84 @@ def parse_command(stream: TokenStream) -> AstCommand:
     end_location = None
 
     while tree:
-        with stream.checkpoint() as commit:
-            literal = stream.expect("literal")
-
-            if child := tree.get_literal(literal.value):
-                if not child.children:
-                    if stream.peek():
-                        stream.expect("newline", "eof")
-                    reached_terminal = True
-
-                if location is None:
-                    location = literal.location
-                end_location = literal.end_location
-                scope = scope + (literal.value,)
-                tree = child
+        index = spec.get_tree_index(tree)
+        resolved = False
+        matched = False
 
-                commit()
-
-        if commit.rollback:
-            choices: List[Tuple[str, CommandTree]] = list((tree.children or {}).items())
-            choices.sort(key=lambda p: p[1].type != "argument")
-
-            if tree.executable:
-                choices.append(("", tree))
-
-            for (name, child), alternative in stream.choose(*choices):
-                with (
-                    alternative,
-                    stream.provide(
-                        scope=scope + (name,),
-                        line_indentation=level,
-                    ),
-                ):
-                    literal = None
-                    argument = None
+        if index.literals:
+            with stream.checkpoint() as commit:
+                literal = stream.expect("literal")
 
-                    if tree is child and tree.executable:
+                if child := tree.get_literal(literal.value):
+                    matched = True
+                    if not child.children:
                         if stream.peek():
                             stream.expect("newline", "eof")
                         reached_terminal = True
-                        continue
-
-                    elif child.type == "literal":
-                        literal = stream.expect(("literal", name))
-                        if location is None:
-                            location = literal.location
 
-                    elif child.type == "argument":
-                        argument = delegate("command:argument", stream)
-                        if location is None:
-                            location = argument.location
+                    if location is None:
+                        location = literal.location
+                    end_location = literal.end_location
+                    scope = scope + (literal.value,)
+                    tree = child
 
-                    if not child.children:
-                        if stream.peek():
-                            stream.expect("newline", "eof")
-                        reached_terminal = True
+                    commit()
 
-                    if literal:
-                        end_location = literal.end_location
-                    elif argument:
-                        arguments.append(argument)
-                        end_location = argument.end_location
+            resolved = not commit.rollback
 
-                    scope = stream.data["scope"]
-                    tree = child
+        if not resolved:
+            pos = stream.current.end_location.pos if stream.index >= 0 else 0
+            if matched:
+                choices, expected = index.choices, ()
+            else:
+                choices, expected = index.get_choices(stream)
+
+            try:
+                for (name, child), alternative in stream.choose(*choices):
+                    with (
+                        alternative,
+                        stream.provide(
+                            scope=scope + (name,),
+                            line_indentation=level,
+                        ),
+                    ):
+                        literal = None
+                        argument = None
+
+                        if tree is child and tree.executable:
+                            if stream.peek():
+                                stream.expect("newline", "eof")
+                            reached_terminal = True
+                            continue
+
+                        elif child.type == "literal":
+                            literal = stream.expect(("literal", name))
+                            if location is None:
+                                location = literal.location
+
+                        elif child.type == "argument":
+                            argument = delegate("command:argument", stream)
+                            if location is None:
+                                location = argument.location
+
+                        if not child.children:
+                            if stream.peek():
+                                stream.expect("newline", "eof")
+                            reached_terminal = True
+
+                        if literal:
+                            end_location = literal.end_location
+                        elif argument:
+                            arguments.append(argument)
+                            end_location = argument.end_location
+
+                        scope = stream.data["scope"]
+                        tree = child
+            except (UnexpectedToken, UnexpectedEOF) as exc:
+                # Report the alternatives that were skipped for the next token.
+                if expected and not stream.source[pos : exc.location.pos].strip():
+                    exc.expected_patterns += expected
+                raise
 
         if reached_terminal:
             break
@@ -1,15 +1,33 @@
 __all__ = [
     "Parser",
     "CommandSpec",
+    "CommandTreeIndex",
+    "ArgumentTokens",
+    "DEFAULT_ARGUMENT_TOKENS",
+    "classify_token",
 ]
 
 
-from dataclasses import dataclass
-from typing import Any, Dict, Protocol, Set, Tuple, Union
+import hashlib
+import re
+from dataclasses import dataclass, fields, is_dataclass
+from functools import partial
+from types import BuiltinFunctionType, FunctionType, MethodType
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    Union,
+)
 
 from beet import LATEST_MINECRAFT_VERSION
 from beet.core.utils import JsonDict, extra_field
-from tokenstream import TokenStream
+from tokenstream import TokenPattern, TokenStream
 
 from .config import CommandTree
 from .prototype import CommandArgument, CommandPrototype, CommandSignature
@@ -21,6 +39,229 @@ class Parser(Protocol):
     def __call__(self, stream: TokenStream) -> Any: ...
 
 
+CommandChoices = Tuple[Tuple[str, CommandTree], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ArgumentTokens:
+    """Tokens that can start an argument type with the default parsers.
+
+    The expected patterns are the ones reported by the default parsers when the
+    first token doesn't match, and the parsers are the names of the parsers the
+    argument type relies on.
+    """
+
+    classes: FrozenSet[str]
+    expected: Tuple[TokenPattern, ...]
+    parsers: Tuple[str, ...]
+
+
+NUMBER_TOKENS = frozenset(["number"])
+COORDINATE_TOKENS = frozenset(["number", "relative"])
+ENTITY_TOKENS = frozenset(["selector", "word", "number", "string", "relative", "other"])
+RESOURCE_TOKENS = frozenset(["word", "number"])
+
+BOOL_ARGUMENT = ArgumentTokens(
+    frozenset(["word"]),
+    (("literal", "true"), ("literal", "false")),
+    ("bool",),
+)
+NUMBER_ARGUMENT = ArgumentTokens(NUMBER_TOKENS, ("number",), ("numeric",))
+INTEGER_ARGUMENT = ArgumentTokens(NUMBER_TOKENS, ("number",), ("integer", "numeric"))
+RESOURCE_ARGUMENT = ArgumentTokens(
+    RESOURCE_TOKENS,
+    ("resource_location",),
+    ("resource_location", "resource_location_or_tag"),
+)
+RESOURCE_OR_TAG_ARGUMENT = ArgumentTokens(
+    RESOURCE_TOKENS,
+    ("resource_location",),
+    ("resource_location_or_tag",),
+)
+
+
+def coordinate_argument(*parsers: str) -> ArgumentTokens:
+    return ArgumentTokens(COORDINATE_TOKENS, ("coordinate",), (*parsers, "coordinate"))
+
+
+def entity_argument(parser: str) -> ArgumentTokens:
+    return ArgumentTokens(
+        ENTITY_TOKENS, ("player_name",), (parser, "uuid", "player_name")
+    )
+
+
+DEFAULT_ARGUMENT_TOKENS: Dict[str, ArgumentTokens] = {
+    "brigadier:bool": BOOL_ARGUMENT,
+    "brigadier:double": NUMBER_ARGUMENT,
+    "brigadier:float": NUMBER_ARGUMENT,
+    "brigadier:integer": INTEGER_ARGUMENT,
+    "brigadier:long": INTEGER_ARGUMENT,
+    "minecraft:angle": coordinate_argument(),
+    "minecraft:block_pos": coordinate_argument("block_pos"),
+    "minecraft:column_pos": coordinate_argument("column_pos", "integer_coordinate"),
+    "minecraft:rotation": coordinate_argument("rotation"),
+    "minecraft:vec2": coordinate_argument("vec2"),
+    "minecraft:vec3": coordinate_argument("vec3"),
+    "minecraft:entity": entity_argument("entity"),
+    "minecraft:game_profile": entity_argument("game_profile"),
+    "minecraft:float_range": ArgumentTokens(NUMBER_TOKENS, ("range",), ("range",)),
+    "minecraft:int_range": ArgumentTokens(
+        NUMBER_TOKENS,
+        ("range",),
+        ("integer_range", "range"),
+    ),
+    "minecraft:dimension": RESOURCE_ARGUMENT,
+    "minecraft:entity_summon": RESOURCE_ARGUMENT,
+    "minecraft:function": RESOURCE_OR_TAG_ARGUMENT,
+    "minecraft:mob_effect": RESOURCE_ARGUMENT,
+    "minecraft:resource": RESOURCE_ARGUMENT,
+    "minecraft:resource_key": RESOURCE_ARGUMENT,
+    "minecraft:resource_location": RESOURCE_ARGUMENT,
+    "minecraft:resource_or_tag": RESOURCE_OR_TAG_ARGUMENT,
+    "minecraft:resource_or_tag_key": RESOURCE_OR_TAG_ARGUMENT,
+}
+
+TOKEN_CLASSES: Dict[str, Optional[str]] = {
+    "@": "selector",
+    "{": "compound",
+    "[": "list",
+    '"': "string",
+    "'": "string",
+    "~": "relative",
+    "^": "relative",
+    "-": "number",
+    "+": "number",
+    ".": "number",
+    "#": None,
+    "\\": None,
+    **{digit: "number" for digit in "0123456789"},
+}
+
+TOKEN_CLASS_NAMES: Tuple[str, ...] = (
+    "selector",
+    "compound",
+    "list",
+    "string",
+    "relative",
+    "number",
+    "word",
+    "other",
+)
+
+NEXT_TOKEN_REGEX = re.compile(r"[ \t]*(\S)")
+
+
+def classify_token(source: str, pos: int) -> Optional[str]:
+    """Classify the token starting after the whitespace at the given position.
+
+    Return None when the next token isn't on the same line, or when its first
+    character doesn't say anything about it, like the start of a comment.
+    """
+    if not (match := NEXT_TOKEN_REGEX.match(source, pos)):
+        return None
+    char = match[1]
+    if char in TOKEN_CLASSES:
+        return TOKEN_CLASSES[char]
+    return "word" if char.isalpha() or char == "_" else "other"
+
+
+@dataclass(frozen=True, slots=True)
+class CommandTreeIndex:
+    """Precomputed alternatives for parsing the children of a command tree node.
+
+    Matching literals are handled before falling back to the alternatives, so the
+    alternatives only include literals when there's nothing else to try. All the
+    choices are still needed when a literal matched but what follows it didn't. Arguments
+    that can't start with the class of the next token are left out too. The
+    patterns expected by the alternatives that were left out are returned along
+    with the remaining ones to complete the error when none of them match.
+    """
+
+    tree: CommandTree
+    literals: bool
+    choices: CommandChoices
+    alternatives: Dict[Optional[str], Tuple[CommandChoices, Tuple[TokenPattern, ...]]]
+    parsers: Tuple[Tuple[str, Parser], ...]
+
+    @classmethod
+    def build(cls, tree: CommandTree, spec: "CommandSpec") -> "CommandTreeIndex":
+        """Classify the children of the given node."""
+        arguments: List[Tuple[str, CommandTree]] = []
+        literals: List[Tuple[str, CommandTree]] = []
+        tokens: Dict[str, ArgumentTokens] = {}
+        parsers: Dict[str, Parser] = {}
+
+        for name, child in (tree.children or {}).items():
+            if child.type != "argument":
+                literals.append((name, child))
+                continue
+
+            arguments.append((name, child))
+
+            if child.parser and (argument := spec.get_argument_tokens(child.parser)):
+                tokens[name] = argument
+                for parser in argument.parsers:
+                    parsers[parser] = spec.parsers[parser]
+
+        terminal = [("", tree)] if tree.executable else []
+        choices: CommandChoices
+        expected: Tuple[TokenPattern, ...]
+
+        if arguments or terminal:
+            choices = (*arguments, *terminal)
+            expected = tuple(("literal", name) for name, _ in literals)
+        else:
+            choices = tuple(literals)
+            expected = ()
+
+        alternatives: Dict[
+            Optional[str], Tuple[CommandChoices, Tuple[TokenPattern, ...]]
+        ] = {None: (choices, expected)}
+
+        for token in TOKEN_CLASS_NAMES if tokens else ():
+            remaining = tuple(
+                (name, child)
+                for name, child in choices
+                if name not in tokens or token in tokens[name].classes
+            )
+            if remaining and len(remaining) < len(choices):
+                alternatives[token] = (
+                    remaining,
+                    expected
+                    + tuple(
+                        pattern
+                        for name, argument in tokens.items()
+                        if token not in argument.classes
+                        for pattern in argument.expected
+                    ),
+                )
+
+        return cls(
+            tree,
+            bool(literals),
+            (*arguments, *literals, *terminal),
+            alternatives,
+            tuple(parsers.items()),
+        )
+
+    def get_choices(
+        self,
+        stream: TokenStream,
+    ) -> Tuple[CommandChoices, Tuple[TokenPattern, ...]]:
+        """Return the alternatives that can match the next token.
+
+        The second item holds the patterns expected by the alternatives that were
+        left out.
+        """
+        if len(self.alternatives) > 1:
+            pos = stream.current.end_location.pos if stream.index >= 0 else 0
+            if alternatives := self.alternatives.get(
+                classify_token(stream.source, pos)
+            ):
+                return alternatives
+        return self.alternatives[None]
+
+
 @dataclass
 class CommandSpec:
     """Class responsible for managing the command specification."""
@@ -34,7 +275,24 @@ class CommandSpec:
 
     parsers: Dict[str, Parser] = extra_field(default_factory=dict)
 
+    argument_tokens: Dict[str, ArgumentTokens] = extra_field(
+        default_factory=lambda: dict(DEFAULT_ARGUMENT_TOKENS)
+    )
+    initial_parsers: Dict[str, Parser] = extra_field(default_factory=dict)
+
+    tree_index: Dict[int, CommandTreeIndex] = extra_field(
+        init=False,
+        default_factory=dict,
+    )
+    fingerprint: Optional[str] = extra_field(init=False, default=None)
+    fingerprint_parsers: Dict[str, Parser] = extra_field(
+        init=False,
+        default_factory=dict,
+    )
+
     def __post_init__(self):
+        if not self.initial_parsers:
+            self.initial_parsers = dict(self.parsers)
         self.update()
 
     def add_commands(self, tree: Union[CommandTree, JsonDict]):
@@ -51,6 +309,144 @@ class CommandSpec:
         self.prototypes.clear()
         self.generate_prototypes(self.tree)
 
+        self.tree_index.clear()
+        self.fingerprint = None
+
+    def get_tree_index(self, tree: CommandTree) -> CommandTreeIndex:
+        """Return the precomputed alternatives for the given node."""
+        index = self.tree_index.get(id(tree))
+        if (
+            not index
+            or index.tree is not tree
+            or any(self.parsers.get(name) is not p for name, p in index.parsers)
+        ):
+            index = CommandTreeIndex.build(tree, self)
+            self.tree_index[id(tree)] = index
+        return index
+
+    def get_argument_tokens(self, parser: str) -> Optional[ArgumentTokens]:
+        """Return the classes of tokens that can start the given argument type.
+
+        The classes are only known when the argument parser and the parsers it
+        relies on are still the ones the spec was created with.
+        """
+        if not (argument := self.argument_tokens.get(parser)):
+            return None
+
+        parsers = ("command:argument", f"command:argument:{parser}", *argument.parsers)
+
+        for name in parsers:
+            initial_parser = self.initial_parsers.get(name)
+            if initial_parser is None or self.parsers.get(name) is not initial_parser:
+                return None
+
+        return ArgumentTokens(argument.classes, argument.expected, parsers)
+
+    def get_fingerprint(self) -> str:
+        """Return a hash of the command tree and the registered parsers.
+
+        The fingerprint is computed on first use and reset when the spec gets updated
+        or when the registered parsers change.
+        """
+        if self.fingerprint is not None and (
+            self.parsers.keys() != self.fingerprint_parsers.keys()
+            or any(
+                parser is not self.fingerprint_parsers[name]
+                for name, parser in self.parsers.items()
+            )
+        ):
+            self.fingerprint = None
+
+        if self.fingerprint is None:
+            digest = hashlib.sha256()
+            self.hash_tree(self.tree, digest, {})
+            for name, parser in sorted(self.parsers.items()):
+                identity = self.describe_parser(parser, set())
+                digest.update(f"{name}={identity}\n".encode())
+            self.fingerprint = digest.hexdigest()
+            self.fingerprint_parsers = dict(self.parsers)
+
+        return self.fingerprint
+
+    def describe_parser(self, value: Any, visited: Set[int]) -> str:
+        """Return a description of the parser that doesn't depend on memory addresses.
+
+        Partials include the wrapped function and their arguments. Dataclass parsers
+        include the fields that take part in comparisons.
+        """
+        if id(value) in visited:
+            return "..."
+
+        if isinstance(value, (FunctionType, BuiltinFunctionType, type)):
+            return f"{value.__module__}.{value.__qualname__}"
+
+        visited = visited | {id(value)}
+
+        if isinstance(value, MethodType):
+            owner = self.describe_parser(value.__self__, visited)
+            return f"{owner}.{value.__func__.__name__}"
+
+        if isinstance(value, partial):
+            arguments = [self.describe_parser(arg, visited) for arg in value.args]
+            arguments.extend(
+                f"{key}={self.describe_parser(arg, visited)}"
+                for key, arg in value.keywords.items()
+            )
+            func = self.describe_parser(value.func, visited)
+            return f"partial({func}, {', '.join(arguments)})"
+
+        if is_dataclass(value):
+            arguments = [
+                f"{f.name}={self.describe_parser(getattr(value, f.name), visited)}"
+                for f in fields(value)
+                if f.compare
+            ]
+            name = self.describe_parser(type(value), visited)
+            return f"{name}({', '.join(arguments)})"
+
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = [self.describe_parser(item, visited) for item in value]
+            if isinstance(value, (set, frozenset)):
+                items.sort()
+            return f"{type(value).__name__}[{', '.join(items)}]"
+
+        if isinstance(value, dict):
+            items = [
+                f"{self.describe_parser(key, visited)}: "
+                f"{self.describe_parser(item, visited)}"
+                for key, item in value.items()
+            ]
+            return f"{{{', '.join(items)}}}"
+
+        if type(value).__repr__ is object.__repr__:
+            return self.describe_parser(type(value), visited)
+
+        return repr(value)
+
+    def hash_tree(self, tree: CommandTree, digest: Any, visited: Dict[int, int]):
+        """Feed the command tree to the digest, handling resolved redirections.
+
+        Literals are matched by name so they're sorted to make the digest independent
+        of the order in which plugins registered them. Arguments keep their order.
+        """
+        if (index := visited.get(id(tree))) is not None:
+            digest.update(f"#{index}".encode())
+            return
+
+        visited[id(tree)] = len(visited)
+        digest.update(tree.model_dump_json(exclude={"children"}).encode())
+
+        children = [
+            *tree.get_all_arguments(),
+            *sorted(tree.get_all_literals(), key=lambda item: item[0]),
+        ]
+
+        for name, child in children:
+            digest.update(f"{name}:".encode())
+            self.hash_tree(child, digest, visited)
+
+        digest.update(b";")
+
     def generate_prototypes(
         self,
         tree: CommandTree,
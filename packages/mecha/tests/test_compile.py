@@ -1,4 +1,7 @@
+import os
+import threading
 from dataclasses import replace
+from pathlib import Path
 from typing import Any, ClassVar
 
 import pytest
@@ -8,6 +11,7 @@ from mecha import (
     AstBool,
     AstChildren,
     AstCommand,
+    AstContentCache,
     AstNbtValue,
     AstMessage,
     AstMessageText,
@@ -18,6 +22,7 @@ from mecha import (
     DiagnosticError,
     FileTypeCompilationUnitProvider,
     Mecha,
+    delegate,
     rule,
 )
 
@@ -251,3 +256,97 @@ def test_assets_dummy_source_file_provider(mc: Mecha, dummy_source_file_provider
             ]
         )
     )
+
+
+def test_parallel_compile():
+    def create_pack() -> DataPack:
+        pack = DataPack()
+        command = "execute  if  entity @p run  say hi"
+        for i in range(8):
+            pack[f"demo:foo{i}"] = Function([f"say {i}", command])
+        pack["demo:bad"] = Function(["say hello", "execute foo"])
+        pack["demo:bad_copy"] = Function(["say hello", "execute foo"])
+        return pack
+
+    serial_pack = create_pack()
+    serial_diagnostics = DiagnosticCollection()
+    Mecha().compile(serial_pack, report=serial_diagnostics)
+
+    parallel_pack = create_pack()
+    parallel_diagnostics = DiagnosticCollection()
+    Mecha(parallel=True, max_workers=2).compile(
+        parallel_pack,
+        report=parallel_diagnostics,
+    )
+
+    assert parallel_pack == serial_pack
+    assert [str(d) for d in parallel_diagnostics.exceptions] == [
+        str(d) for d in serial_diagnostics.exceptions
+    ]
+    assert len(parallel_diagnostics.exceptions) == 2
+
+
+def test_parallel_compile_threads(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    def fork(*args: Any, **kwargs: Any):
+        raise AssertionError("Forked while other threads are running.")
+
+    monkeypatch.setattr("mecha.api.ProcessPoolExecutor", fork)
+
+    pack = DataPack()
+    for i in range(8):
+        pack[f"demo:foo{i}"] = Function([f"say {i}"])
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+
+    try:
+        Mecha(parallel=True, max_workers=2).compile(pack)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert pack.functions["demo:foo0"].text == "say 0\n"
+    assert "other threads are running" in caplog.text
+
+
+def test_content_cache(tmp_path: Path):
+    def create_pack() -> DataPack:
+        pack = DataPack()
+        pack["demo:foo"] = Function(["execute  if  entity @p run  say hi"])
+        pack["demo:bar"] = Function(["execute  if  entity @p run  say hi"])
+        return pack
+
+    first_pack = create_pack()
+    Mecha(content_cache=AstContentCache(tmp_path)).compile(first_pack)
+
+    entries = sorted(tmp_path.glob("*.ast"))
+    assert len(entries) == 2
+
+    def parse_text(*args: Any):
+        raise AssertionError("Expected cached ast.")
+
+    mc = Mecha(content_cache=AstContentCache(tmp_path))
+    mc.parse_text = parse_text
+
+    second_pack = create_pack()
+    mc.compile(second_pack)
+    assert second_pack == first_pack
+
+    os.utime(entries[0], (0, 0))
+    AstContentCache(tmp_path, max_size=entries[1].stat().st_size).evict()
+    assert sorted(tmp_path.glob("*.ast")) == entries[1:]
+
+
+def test_content_key_parsers():
+    mc = Mecha()
+    key = mc.get_content_key("say hi", "root", resource_location="demo:foo")
+
+    mc.spec.parsers["command:argument:minecraft:team"] = delegate("word")
+    assert key != mc.get_content_key("say hi", "root", resource_location="demo:foo")
+
+    mc.spec.parsers["command:argument:minecraft:team"] = delegate("team")
+    assert key == mc.get_content_key("say hi", "root", resource_location="demo:foo")
@@ -106,6 +106,33 @@ def test_visitor_result(mc: Mecha):
     assert Foo().invoke(ast) == ["say:message('hello')", "say:message('world')"]
 
 
+def test_dispatch_cache(mc: Mecha):
+    ast = mc.parse("particle dust 1.0 0.5 7 1.0 7 7 7", type=AstCommand)
+
+    numbers: List[AstNumber] = []
+    sevens: List[AstNumber] = []
+
+    visitor = Visitor()
+    visitor.add_rule(rule(AstNumber)(numbers.append))
+    visitor.invoke(ast)
+
+    assert visitor.dispatch_cache
+    assert len(numbers) == 4
+
+    visitor.add_rule(rule(AstNumber, value=7)(sevens.append))
+    assert not visitor.dispatch_cache
+
+    numbers.clear()
+    visitor.invoke(ast)
+
+    assert numbers == [AstNumber(value=1), AstNumber(value=0.5), AstNumber(value=1)]
+    assert sevens == [AstNumber(value=7)]
+
+    visitor.reset()
+    assert not visitor.dispatch_cache
+    assert list(visitor.dispatch(ast)) == []
+
+
 def test_index(mc: Mecha):
     assert mc.steps.index(mc.lint) == 0
     assert mc.steps.index(mc.transform) == 1
@@ -2,8 +2,9 @@ import pytest
 from beet import Function, JsonFile
 from beet.core.utils import JsonDict
 from pytest_insta import SnapshotFixture
+from tokenstream import TokenStream
 
-from mecha import DiagnosticError, Mecha
+from mecha import DiagnosticError, Mecha, delegate
 
 COMMAND_EXAMPLES = Function(source_path="tests/resources/command_examples.mcfunction")
 MULTILINE_COMMAND_EXAMPLES = Function(
@@ -127,3 +128,55 @@ def test_player_name_no_length_restriction(mc: Mecha):
         )
         == "scoreboard players set some_really_long_name_right_here foo 42\n"
     )
+
+
+def test_parse_memo():
+    mc = Mecha()
+    mc.memoize.add("nbt_list")
+
+    stream = TokenStream("[1b, 2b] foo")
+
+    with mc.prepare_token_stream(stream):
+        with stream.checkpoint():
+            first = delegate("nbt_list", stream)
+            end = stream.index
+
+        assert delegate("nbt_list", stream) is first
+        assert stream.index == end
+        assert stream.expect("literal").value == "foo"
+
+    assert mc.memo_stats.hits["nbt_list"] == 1
+    assert mc.memo_stats.misses["nbt_list"] == 1
+    assert mc.memo_stats.hit_rate == 0.5
+
+
+def test_parse_memo_mutable_data():
+    mc = Mecha()
+    mc.memoize.add("nbt_list")
+
+    stream = TokenStream("[1b, 2b]")
+
+    with mc.prepare_token_stream(stream), stream.provide(properties={}):
+        with stream.checkpoint():
+            first = delegate("nbt_list", stream)
+
+        assert delegate("nbt_list", stream) is not first
+
+    assert not mc.memo_stats.hits
+    assert not mc.memo_stats.misses
+
+
+def test_parse_memo_indentation_skip():
+    mc = Mecha()
+    mc.memoize.add("nbt_list")
+
+    stream = TokenStream("[1b, 2b]")
+
+    with mc.prepare_token_stream(stream):
+        with stream.checkpoint():
+            first = delegate("nbt_list", stream)
+
+        with stream.indent(skip=["comment", "literal"]):
+            assert delegate("nbt_list", stream) is not first
+
+    assert mc.memo_stats.misses["nbt_list"] == 2
@@ -1,6 +1,9 @@
+from dataclasses import replace
+
+import pytest
 from pytest_insta import SnapshotFixture
 
-from mecha import CommandArgument, Mecha
+from mecha import CommandArgument, DiagnosticError, Mecha, classify_token
 
 
 def test_prototypes(snapshot: SnapshotFixture, mc: Mecha):
@@ -38,3 +41,66 @@ def test_repr(snapshot: SnapshotFixture, mc: Mecha):
         str(mc.spec.tree.get("execute", "if", "score", "target"))
         == "CommandTree(type='argument', parser='minecraft:score_holder', properties={'amount': 'single'}, children={'targetObjective': ...})"
     )
+
+
+def test_tree_index(mc: Mecha):
+    tree = mc.spec.tree.get("clone")
+    assert tree
+    index = mc.spec.get_tree_index(tree)
+
+    assert index is mc.spec.get_tree_index(tree)
+    assert index.literals
+    assert [name for name, _ in index.choices] == ["begin", "from"]
+    assert [name for name, _ in index.alternatives[None][0]] == ["begin"]
+    assert index.alternatives[None][1] == (("literal", "from"),)
+
+    tree = mc.spec.tree.get("say")
+    assert tree
+    index = mc.spec.get_tree_index(tree)
+
+    assert not index.literals
+    assert [name for name, _ in index.alternatives[None][0]] == ["message"]
+    assert list(index.alternatives) == [None]
+
+    mc.spec.update()
+    assert not mc.spec.tree_index
+
+
+def test_classify_token():
+    assert classify_token("tp @s", 2) == "selector"
+    assert classify_token("tp ~ ~ ~", 2) == "relative"
+    assert classify_token("tp -1 0 0", 2) == "number"
+    assert classify_token("tp foo", 2) == "word"
+    assert classify_token('tp "foo"', 2) == "string"
+    assert classify_token("tp #foo", 2) is None
+    assert classify_token("tp\n@s", 2) is None
+
+
+def test_tree_index_tokens(mc: Mecha):
+    tree = mc.spec.tree.get("tp")
+    assert tree
+    index = mc.spec.get_tree_index(tree)
+
+    choices, expected = index.alternatives["selector"]
+    assert [name for name, _ in choices] == ["destination", "targets"]
+    assert expected == ("coordinate",)
+    assert "number" not in index.alternatives
+
+    with pytest.raises(DiagnosticError) as exc_info:
+        mc.parse("tp {}")
+
+    message = exc_info.value.diagnostics.exceptions[0].format_message()
+    assert "Expected coordinate or player_name" in message
+
+    vec3 = mc.spec.parsers["vec3"]
+    mc.spec.parsers["vec3"] = lambda stream: vec3(stream)
+
+    try:
+        index = mc.spec.get_tree_index(tree)
+        assert "selector" not in index.alternatives
+        assert not mc.spec.get_argument_tokens("minecraft:vec3")
+        assert mc.spec.get_argument_tokens("minecraft:entity")
+        assert not replace(mc.spec).get_argument_tokens("minecraft:vec3")
+    finally:
+        mc.spec.parsers["vec3"] = vec3
+        mc.spec.update()
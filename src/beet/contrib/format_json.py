@@ -7,9 +7,11 @@ __all__ = [
 
 
 import json
+from functools import partial
 from typing import Any, Callable, Optional, Tuple, Union
 
 from beet import Context, JsonFileBase, PluginOptions, configurable
+from beet.core.utils import get_json_backend
 
 
 class FormatJsonOptions(PluginOptions):
@@ -30,6 +32,18 @@ def get_formatter(
 
     opts = FormatJsonOptions(**kwargs)
 
+    if (
+        opts.ensure_ascii
+        and opts.allow_nan
+        and opts.separators is None
+        and opts.final_newline
+    ):
+        return partial(
+            get_json_backend().dumps,
+            indent=opts.indent,
+            sort_keys=opts.sort_keys,
+        )
+
     suffix = "\n" if opts.final_newline else ""
 
     return (
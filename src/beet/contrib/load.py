@@ -7,9 +7,10 @@ __all__ = [
 ]
 
 
+from contextlib import ExitStack
 from glob import glob
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from zipfile import ZipFile
 
 from beet import (
@@ -26,6 +27,9 @@ from beet import (
 class LoadOptions(PluginOptions):
     resource_pack: PackLoadOptions = PackLoadOptions()
     data_pack: PackLoadOptions = PackLoadOptions()
+    cache: bool = False
+    parallel: bool = False
+    max_workers: Optional[int] = None
 
 
 def beet_default(ctx: Context):
@@ -36,6 +40,19 @@ def beet_default(ctx: Context):
 def load(ctx: Context, opts: LoadOptions):
     """Plugin that loads data packs and resource packs."""
     cache = ctx.cache["load"]
+    with ExitStack() as stack:
+        if opts.parallel:
+            for pack in ctx.packs:
+                stack.enter_context(pack.parallel_mount(opts.max_workers))
+        load_packs(ctx, opts, cache)
+
+    if opts.cache:
+        for pack in ctx.packs:
+            for _, file_instance in pack.list_files():
+                ctx.cache.load_cache.attach(file_instance)
+
+
+def load_packs(ctx: Context, opts: LoadOptions, cache: Cache):
     for load_options, pack in zip([opts.resource_pack, opts.data_pack], ctx.packs):
         for load_entry in load_options.entries():
             if isinstance(load_entry, dict):
@@ -6,14 +6,22 @@ __all__ = [
 ]
 
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from typing import Optional
 
-from beet import Context, ListOption, PluginOptions, configurable
+from beet import BlobStore, Context, ListOption, PluginOptions, configurable
 from beet.core.utils import FileSystemPath, log_time_scope
 
+logger = logging.getLogger("output")
+
 
 class OutputOptions(PluginOptions):
     directory: Optional[ListOption[FileSystemPath]] = None
+    incremental: bool = False
+    zip_workers: Optional[int] = None
+    deduplicate: bool = False
 
 
 def beet_default(ctx: Context):
@@ -28,9 +36,25 @@ def output(ctx: Context, opts: OutputOptions):
 
     paths = [ctx.directory / path for path in opts.directory.entries()]
     packs = list(filter(None, ctx.packs))
+    blobs = BlobStore() if opts.deduplicate else None
+    checksums = ctx.cache["output"].json if opts.incremental else None
 
     if paths and packs:
-        with log_time_scope("Output files."):
+        with log_time_scope("Output files."), ExitStack() as stack:
+            executor = (
+                stack.enter_context(ThreadPoolExecutor(opts.zip_workers))
+                if opts.zip_workers
+                else None
+            )
             for pack in packs:
                 for path in paths:
-                    pack.save(path, overwrite=True)
+                    pack.save(
+                        path,
+                        overwrite=True,
+                        checksums=checksums,
+                        executor=executor,
+                        blobs=blobs,
+                    )
+
+    if blobs is not None:
+        logger.debug("Deduplicated %d bytes.", blobs.deduplicated)
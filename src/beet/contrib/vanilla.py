@@ -16,7 +16,7 @@ __all__ = [
 
 import re
 from pathlib import Path
-from typing import Iterator, Optional, Union
+from typing import Dict, Iterable, Iterator, Optional, Union
 from zipfile import ZipFile
 
 from beet import (
@@ -27,6 +27,7 @@ from beet import (
     DataPack,
     JsonFile,
     PackFilesOption,
+    PackFile,
     PackMatchOption,
     PluginOptions,
     ResourcePack,
@@ -34,7 +35,12 @@ from beet import (
     configurable,
 )
 from beet.contrib.worldgen import worldgen
-from beet.core.utils import FileSystemPath, log_time_scope
+from beet.core.utils import (
+    FileSystemPath,
+    ZipMemberPath,
+    log_time_scope,
+    resolve_zip_member,
+)
 
 MANIFEST_URL: str = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
 RESOURCES_URL: str = "https://resources.download.minecraft.net"
@@ -43,22 +49,65 @@ RESOURCES_URL: str = "https://resources.download.minecraft.net"
 class VanillaOptions(PluginOptions):
     version: Optional[str] = None
     manifest: Optional[str] = None
+    lazy: bool = False
+    content_cache: bool = True
 
 
 class ClientJar:
-    """Class holding information about a client jar."""
+    """Class holding information about a client jar.
+
+    In lazy mode, the packs are mounted straight from the central directory
+    of the jar and individual files only get extracted when they're used.
+
+    With the content cache, the raw and deserialized content of the files
+    that get used is kept in a pickle next to the extracted packs. The jar
+    never changes so the entries are served without reading the files again.
+    """
 
     cache: Cache
     path: Path
+    lazy: bool
+    content_cache: bool
     assets: ResourcePack
     data: DataPack
 
-    def __init__(self, cache: Cache, path: FileSystemPath):
+    _members: Optional[UnveilMapping]
+
+    def __init__(
+        self,
+        cache: Cache,
+        path: FileSystemPath,
+        lazy: bool = False,
+        content_cache: bool = True,
+    ):
         self.cache = cache
         self.path = Path(path)
+        self.lazy = lazy
+        self.content_cache = content_cache
         self.assets = ResourcePack()
         self.data = DataPack()
         worldgen(self.data)
+        self._members = None
+
+    @property
+    def members_directory(self) -> str:
+        return str(self.cache.get_path(f"{self.path} vanilla members"))
+
+    @property
+    def members(self) -> UnveilMapping:
+        if not self._members:
+            directory = self.members_directory
+            members: Dict[str, FileSystemPath] = {}
+            with ZipFile(self.path) as jar:
+                for info in jar.infolist():
+                    if info.is_dir():
+                        continue
+                    if destination := resolve_zip_member(directory, info.filename):
+                        members[info.filename] = ZipMemberPath(
+                            self.path, info, destination
+                        )
+            self._members = UnveilMapping(members)
+        return self._members
 
     def mount(
         self,
@@ -80,13 +129,18 @@ class ClientJar:
         else:
             return self
 
-        if not path.is_dir():
+        if self.lazy:
+            if pack.unveil(prefix, self.members):
+                with log_time_scope("Mount vanilla pack."):
+                    mounted = pack.mount(prefix, self.members.with_prefix(prefix))
+                self.attach_content(mounted)
+        elif not path.is_dir():
             with log_time_scope("Extract vanilla pack."):
                 pack.load(ZipFile(self.path))
                 pack.save(path=path)
         elif pack.path != path.parent:
             if pack.unveil(prefix, path):
-                pack.mount(prefix, path / prefix)
+                self.attach_content(pack.mount(prefix, path / prefix))
 
         if object_mapping and isinstance(pack, ResourcePack):
             if pack.unveil(prefix, object_mapping):
@@ -100,6 +154,19 @@ class ClientJar:
 
         return self
 
+    def attach_content(self, files: Iterable[PackFile]):
+        """Serve the files mounted from the client jar with the content cache."""
+        if not self.content_cache:
+            return
+
+        load_cache = self.cache.get_load_cache(
+            f"{self.path} vanilla content.sqlite",
+            immutable=True,
+        )
+
+        for file_instance in files:
+            load_cache.attach(file_instance)
+
 
 class AssetIndex(Container[str, FileSystemPath]):
     """Class for retrieving assets referenced by a particular release."""
@@ -145,13 +212,23 @@ class Release:
 
     cache: Cache
     info: JsonFile
+    lazy: bool
+    content_cache: bool
 
     _client_jar: Optional[ClientJar]
     _object_mapping: Optional[UnveilMapping]
 
-    def __init__(self, cache: Cache, info: JsonFile):
+    def __init__(
+        self,
+        cache: Cache,
+        info: JsonFile,
+        lazy: bool = False,
+        content_cache: bool = True,
+    ):
         self.cache = cache
         self.info = info
+        self.lazy = lazy
+        self.content_cache = content_cache
         self._client_jar = None
         self._object_mapping = None
 
@@ -163,7 +240,12 @@ class Release:
     def client_jar(self) -> ClientJar:
         if not self._client_jar:
             path = self.cache.download(self.info.data["downloads"]["client"]["url"])
-            self._client_jar = ClientJar(self.cache, path)
+            self._client_jar = ClientJar(
+                self.cache,
+                path,
+                self.lazy,
+                self.content_cache,
+            )
         return self._client_jar
 
     @property
@@ -199,14 +281,20 @@ class ReleaseRegistry(Container[str, Release]):
 
     cache: Cache
     manifest: JsonFile
+    lazy: bool
+    content_cache: bool
 
     def __init__(
         self,
         cache: Cache,
         manifest: Optional[Union[FileSystemPath, JsonFile]] = None,
+        lazy: bool = False,
+        content_cache: bool = True,
     ):
         super().__init__()
         self.cache = cache
+        self.lazy = lazy
+        self.content_cache = content_cache
 
         manifest = manifest or MANIFEST_URL
 
@@ -229,7 +317,7 @@ class ReleaseRegistry(Container[str, Release]):
         for version in self.manifest.data["versions"]:
             if pattern.match(version["id"]):
                 info = JsonFile(source_path=self.cache.download(version["url"]))
-                return Release(self.cache, info)
+                return Release(self.cache, info, self.lazy, self.content_cache)
         raise KeyError(key)
 
 
@@ -247,6 +335,8 @@ class Vanilla:
         cache: Optional[Cache] = None,
         manifest: Optional[Union[FileSystemPath, JsonFile]] = None,
         minecraft_version: Optional[str] = None,
+        lazy: Optional[bool] = None,
+        content_cache: Optional[bool] = None,
     ):
         opts = ctx and ctx.validate("vanilla", VanillaOptions)
 
@@ -257,7 +347,17 @@ class Vanilla:
         else:
             raise ValueError("Cache was not provided.")
 
-        self.releases = ReleaseRegistry(self.cache, manifest or opts and opts.manifest)
+        if lazy is None:
+            lazy = bool(opts and opts.lazy)
+        if content_cache is None:
+            content_cache = opts.content_cache if opts else True
+
+        self.releases = ReleaseRegistry(
+            self.cache,
+            manifest or opts and opts.manifest,
+            lazy,
+            content_cache,
+        )
 
         if minecraft_version:
             self.minecraft_version = minecraft_version
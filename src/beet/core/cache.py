@@ -1,25 +1,59 @@
 __all__ = [
     "MultiCache",
     "Cache",
+    "SqliteCache",
     "CachePin",
     "CacheTransaction",
     "DownloadManager",
+    "ConnectionPool",
+    "LoadCache",
 ]
 
 
 import json
 import logging
+import os
+import pickle
 import shutil
+import sqlite3
+import sys
 from concurrent.futures import Executor, ThreadPoolExecutor
-from contextlib import closing, contextmanager
+from contextlib import closing, contextmanager, nullcontext
 from datetime import datetime, timedelta
+from email.message import Message
+from http.client import (
+    HTTPConnection,
+    HTTPResponse,
+    HTTPSConnection,
+    RemoteDisconnected,
+)
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from textwrap import indent
-from typing import Any, BinaryIO, ClassVar, Mapping, Optional, Set, Type, TypeVar, Union
-from urllib.request import Request, urlopen
+from threading import BoundedSemaphore, Lock
+from typing import (
+    Any,
+    BinaryIO,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
 
 from .container import Container, MatchMixin, Pin
+from .file import DataModelBase, File, TextFileBase
 from .utils import (
+    COPY_BUFSIZE,
     FileSystemPath,
     JsonDict,
     dump_json,
@@ -62,6 +96,7 @@ class Cache:
     index: JsonDict
     transaction: CacheTransaction
     download_manager: "DownloadManager"
+    load_caches: Dict[str, "LoadCache"]
 
     index_file: ClassVar[str] = "index.json"
 
@@ -71,17 +106,24 @@ class Cache:
         transaction: Optional[CacheTransaction] = None,
     ):
         self.deleted = False
+        self.load_caches = {}
         self.directory = Path(directory).resolve()
         self.index_path = self.directory / self.index_file
-        self.index = (
-            json.loads(self.index_path.read_text("utf-8"))
-            if self.index_path.is_file()
-            else self.get_initial_index()
-        )
+        self.index = self.load_index()
         self.transaction = transaction or CacheTransaction()
         self.download_manager = DownloadManager()
         self.flush()
 
+    def load_index(self) -> JsonDict:
+        """Load the cache index from the filesystem."""
+        if self.index_path.is_file():
+            return json.loads(self.index_path.read_text("utf-8"))
+        return self.get_initial_index()
+
+    def write_index(self):
+        """Write the cache index to the filesystem."""
+        self.index_path.write_text(dump_json(self.index))
+
     def get_initial_index(self) -> JsonDict:
         """Return the initial cache index."""
         return {
@@ -117,10 +159,28 @@ class Cache:
 
         return self.directory / path
 
+    def get_load_cache(self, key: str, immutable: bool = False) -> "LoadCache":
+        """Return a load cache associated with the given key.
+
+        The load cache is flushed along with the cache.
+        """
+        if not (load_cache := self.load_caches.get(key)):
+            path = self.get_path(key)
+            load_cache = LoadCache(path, immutable)
+            self.load_caches[key] = load_cache
+        return load_cache
+
     @contextmanager
-    def parallel_downloads(self, max_workers: Optional[int] = None):
+    def parallel_downloads(
+        self,
+        max_workers: Optional[int] = None,
+        max_per_host: Optional[int] = 8,
+    ):
         """Launch multiple requests at the same time."""
-        with DownloadManager.parallel(max_workers) as parallel_download_manager:
+        with DownloadManager.parallel(
+            max_workers,
+            max_per_host,
+        ) as parallel_download_manager:
             previous_manager = self.download_manager
             self.download_manager = parallel_download_manager
             try:
@@ -142,12 +202,14 @@ class Cache:
             for key, value in headers.items():
                 arg.add_header(key, value)
 
+        validators = None
+
         if not path:
-            path = self.get_path(
-                arg.get_full_url() if isinstance(arg, Request) else arg
-            )
+            url = arg.get_full_url() if isinstance(arg, Request) else arg
+            path = self.get_path(url)
+            validators = self.index.setdefault("downloads", {}).setdefault(url, {})
 
-        return self.download_manager.download(arg, path)
+        return self.download_manager.download(arg, path, validators)
 
     def has_changed(self, *filenames: Optional[FileSystemPath]) -> bool:
         """Return whether any of the given files changed since the last check."""
@@ -168,6 +230,10 @@ class Cache:
 
         return changed
 
+    def get_mtime(self, key: str) -> Optional[float]:
+        """Return the last recorded modification time of the given file."""
+        return self.index.get("mtime", {}).get(key)
+
     def invalidate_changes(self, *filenames: Optional[FileSystemPath]):
         """Reset the modification time of the given files."""
         mtime = self.index.setdefault("mtime", {})
@@ -217,6 +283,8 @@ class Cache:
                 import_from_string(finalizer)(self)
             if self.directory.is_dir():
                 shutil.rmtree(self.directory)
+            for load_cache in self.load_caches.values():
+                load_cache.clear()
             self.index = self.get_initial_index()
             self.deleted = True
 
@@ -233,10 +301,44 @@ class Cache:
 
         if self.expire and self.expire <= datetime.now():
             logger.debug('Cache "%s" expired.', self.directory.name)
-            self.clear()
+            with TemporaryDirectory(dir=self.directory.parent) as tmpdir:
+                downloads = self.stash_downloads(Path(tmpdir))
+                self.clear()
+                self.restore_downloads(Path(tmpdir), downloads)
         else:
             self.directory.mkdir(parents=True, exist_ok=True)
-            self.index_path.write_text(dump_json(self.index))
+            self.write_index()
+            for load_cache in self.load_caches.values():
+                load_cache.flush()
+
+    def close(self):
+        """Release the resources held by the cache."""
+        for load_cache in self.load_caches.values():
+            load_cache.close()
+
+    def stash_downloads(self, directory: Path) -> JsonDict:
+        """Move the downloaded files that can be revalidated to the given directory."""
+        stashed: JsonDict = {}
+
+        for url, validators in self.index.get("downloads", {}).items():
+            if validators.get("etag") or validators.get("last_modified"):
+                if (path := self.get_path(url)).is_file():
+                    path.replace(directory / str(len(stashed)))
+                    stashed[url] = validators
+
+        return stashed
+
+    def restore_downloads(self, directory: Path, stashed: JsonDict):
+        """Restore the stashed downloads and mark them as stale."""
+        downloads = self.index.setdefault("downloads", {})
+
+        for i, (url, validators) in enumerate(stashed.items()):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (directory / str(i)).replace(self.get_path(url))
+            downloads[url] = {**validators, "stale": True}
+
+        if stashed:
+            self.write_index()
 
     @contextmanager
     def override(self, **data: Any):
@@ -274,6 +376,151 @@ class Cache:
         )
 
 
+class SqliteCache(Cache):
+    """A cache that keeps its index in an sqlite database.
+
+    The modification times tracked by `has_changed` live in their own table
+    and are queried on demand, so flushing only writes what changed since
+    the last flush. Each flush is committed atomically, and concurrent
+    processes sharing the cache directory merge their modification times
+    instead of overwriting each other.
+    """
+
+    connection: Optional[sqlite3.Connection]
+    flushed: Dict[str, str]
+    mtime_changes: Dict[str, Optional[float]]
+
+    index_file: ClassVar[str] = "index.sqlite"
+    legacy_index_file: ClassVar[str] = Cache.index_file
+
+    def __init__(
+        self,
+        directory: FileSystemPath,
+        transaction: Optional[CacheTransaction] = None,
+    ):
+        self.connection = None
+        self.flushed = {}
+        self.mtime_changes = {}
+        super().__init__(directory, transaction)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database and create the tables if needed."""
+        if self.connection is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(
+                self.index_path,
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS mtime (path TEXT PRIMARY KEY, mtime REAL)"
+            )
+        return self.connection
+
+    def close(self):
+        """Close the database."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def load_index(self) -> JsonDict:
+        if not self.index_path.is_file():
+            legacy_path = self.directory / self.legacy_index_file
+            if legacy_path.is_file():
+                index = json.loads(legacy_path.read_text("utf-8"))
+                self.mtime_changes.update(index.pop("mtime", {}))
+                return index
+            return self.get_initial_index()
+
+        rows = self.connect().execute("SELECT key, value FROM entries")
+        self.flushed = dict(rows.fetchall())
+        return {key: json.loads(value) for key, value in self.flushed.items()}
+
+    def write_index(self):
+        entries = {key: json.dumps(value) for key, value in self.index.items()}
+        connection = self.connect()
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO entries VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                [
+                    (key, value)
+                    for key, value in entries.items()
+                    if self.flushed.get(key) != value
+                ],
+            )
+            connection.executemany(
+                "DELETE FROM entries WHERE key = ?",
+                [(key,) for key in self.flushed.keys() - entries.keys()],
+            )
+            connection.executemany(
+                "INSERT INTO mtime VALUES (?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET mtime = excluded.mtime",
+                [(k, v) for k, v in self.mtime_changes.items() if v is not None],
+            )
+            connection.executemany(
+                "DELETE FROM mtime WHERE path = ?",
+                [(k,) for k, v in self.mtime_changes.items() if v is None],
+            )
+        except:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+        self.flushed = entries
+        self.mtime_changes.clear()
+
+        legacy_path = self.directory / self.legacy_index_file
+        legacy_path.unlink(missing_ok=True)
+
+    def get_mtime(self, key: str) -> Optional[float]:
+        """Return the last recorded modification time of the given file."""
+        if key in self.mtime_changes:
+            return self.mtime_changes[key]
+        row = (
+            self.connect()
+            .execute("SELECT mtime FROM mtime WHERE path = ?", (key,))
+            .fetchone()
+        )
+        return row and row[0]
+
+    def has_changed(self, *filenames: Optional[FileSystemPath]) -> bool:
+        changed = False
+
+        for filename in filenames:
+            if not filename:
+                continue
+
+            path = Path(filename)
+            key = str(path)
+            last_modified = path.stat().st_mtime
+
+            if self.get_mtime(key) != last_modified:
+                self.mtime_changes[key] = last_modified
+                changed = True
+
+        return changed
+
+    def invalidate_changes(self, *filenames: Optional[FileSystemPath]):
+        for filename in filenames:
+            if filename:
+                self.mtime_changes[str(Path(filename))] = None
+
+    def delete(self):
+        self.close()
+        if not self.deleted:
+            self.flushed = {}
+            self.mtime_changes.clear()
+        super().delete()
+
+
 class CachePin(Pin[str, PinType]):
     """Descriptor that makes cache data accessible through attribute lookup."""
 
@@ -328,6 +575,7 @@ class MultiCache(MatchMixin, Container[str, CacheType]):
     def __exit__(self, *_):
         if self.transaction.exit():
             self.flush()
+            self.close()
 
     def preload(self):
         """Preload all the named caches."""
@@ -356,40 +604,478 @@ class MultiCache(MatchMixin, Container[str, CacheType]):
         ):
             ignore.write_text("# Automatically created by beet\n*\n")
 
+    def close(self):
+        """Release the resources held by the named caches."""
+        for cache in self.values():
+            cache.close()
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({str(self.path)!r})"
 
 
+class ConnectionPool:
+    """Thread-safe pool of persistent http connections.
+
+    Idle connections are kept per host and reused by subsequent requests.
+    The number of concurrent requests to the same host can be bounded.
+    Requests that send data, use another method than GET, or need to go
+    through a proxy fall back to urllib.
+    """
+
+    max_per_host: Optional[int]
+    timeout: float
+    lock: Lock
+    idle: Dict[Tuple[str, str], List[HTTPConnection]]
+    semaphores: Dict[Tuple[str, str], BoundedSemaphore]
+
+    max_redirects: ClassVar[int] = 10
+    user_agent: ClassVar[str] = "Python-urllib/%d.%d" % sys.version_info[:2]
+
+    def __init__(self, max_per_host: Optional[int] = None, timeout: float = 60):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.lock = Lock()
+        self.idle = {}
+        self.semaphores = {}
+
+    @contextmanager
+    def acquire(self, scheme: str, netloc: str) -> Iterator[HTTPConnection]:
+        """Borrow a connection to the given host."""
+        key = (scheme, netloc)
+
+        with self.lock:
+            semaphore = self.semaphores.get(key)
+            if semaphore is None and self.max_per_host:
+                semaphore = self.semaphores[key] = BoundedSemaphore(self.max_per_host)
+
+        with semaphore or nullcontext():
+            with self.lock:
+                idle = self.idle.get(key)
+                connection = idle.pop() if idle else None
+
+            if connection is None:
+                connection_type = HTTPConnection
+                if scheme == "https":
+                    connection_type = HTTPSConnection
+                connection = connection_type(netloc, timeout=self.timeout)
+
+            try:
+                yield connection
+            except:
+                connection.close()
+                raise
+
+            with self.lock:
+                self.idle.setdefault(key, []).append(connection)
+
+    @contextmanager
+    def open(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        data: Any = None,
+        method: Optional[str] = None,
+    ) -> Iterator[Any]:
+        """Send the request and return the response.
+
+        Redirects are followed. Unlike urllib, 304 and 416 responses are
+        returned instead of being raised as HTTPError.
+        """
+        headers = {"User-Agent": self.user_agent, **headers}
+
+        for _ in range(self.max_redirects):
+            scheme, netloc, path, query, _ = urlsplit(url)
+
+            if (
+                data is not None
+                or method not in [None, "GET"]
+                or scheme not in ["http", "https"]
+                or (scheme in getproxies() and not proxy_bypass(netloc))
+            ):
+                try:
+                    request = Request(url, data, headers, method=method)
+                    fallback = urlopen(request)
+                except HTTPError as exc:
+                    if exc.code not in [304, 416]:
+                        raise
+                    fallback = exc
+                with fallback:
+                    yield fallback
+                return
+
+            with self.acquire(scheme, netloc) as connection:
+                target = f"{path or '/'}?{query}" if query else path or "/"
+                response = self.request(connection, target, headers)
+                status = response.status
+                location = response.headers.get("Location")
+
+                if status in [301, 302, 303, 307, 308] and location:
+                    self.release(connection, response)
+                    url = urljoin(url, location)
+                    continue
+
+                if status >= 400 and status != 416:
+                    self.release(connection, response)
+                    reason = response.reason
+                    raise HTTPError(url, status, reason, response.headers, None)
+
+                yield response
+                self.release(connection, response)
+                return
+
+        raise HTTPError(url, 310, "Too many redirects.", Message(), None)
+
+    def request(
+        self,
+        connection: HTTPConnection,
+        target: str,
+        headers: Mapping[str, str],
+    ) -> HTTPResponse:
+        """Send the request and retry once if the server dropped the connection."""
+        try:
+            connection.request("GET", target, headers=headers)
+            return connection.getresponse()
+        except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            connection.request("GET", target, headers=headers)
+            return connection.getresponse()
+
+    def release(self, connection: HTTPConnection, response: HTTPResponse):
+        """Consume the rest of the response so that the connection can be reused."""
+        while response.read(COPY_BUFSIZE):
+            pass
+        if response.will_close:
+            connection.close()
+
+    def close(self):
+        """Close all the idle connections."""
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
 class DownloadManager:
-    """Download manager."""
+    """Download manager.
+
+    Files are first downloaded next to their destination with a ".part"
+    suffix, so interrupted downloads can resume with a range request. When
+    a validators dict is provided, the manager stores the ETag and
+    Last-Modified headers of the response and uses them to revalidate files
+    marked as stale with a conditional request.
+    """
 
     executor: Optional[Executor]
+    pool: ConnectionPool
+    pending: Set[Path]
+    lock: Lock
 
-    def __init__(self, executor: Optional[Executor] = None):
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        pool: Optional[ConnectionPool] = None,
+    ):
         self.executor = executor
+        self.pool = pool or ConnectionPool()
+        self.pending = set()
+        self.lock = Lock()
 
     @classmethod
     @contextmanager
-    def parallel(cls, max_workers: Optional[int] = None):
+    def parallel(
+        cls,
+        max_workers: Optional[int] = None,
+        max_per_host: Optional[int] = 8,
+    ):
         """Create a download manager that launches multiple requests at the same time."""
-        with ThreadPoolExecutor(max_workers) as executor:
-            yield cls(executor)
+        pool = ConnectionPool(max_per_host)
+        with closing(pool), ThreadPoolExecutor(max_workers) as executor:
+            yield cls(executor, pool)
 
-    def download(self, arg: Union[str, Request], path: FileSystemPath) -> Path:
+    def download(
+        self,
+        arg: Union[str, Request],
+        path: FileSystemPath,
+        validators: Optional[JsonDict] = None,
+    ) -> Path:
         """Download and cache a given url."""
         path = Path(path)
 
-        if not path.is_file():
-            fileobj = path.open("wb")
-            if self.executor:
-                self.executor.submit(self.retrieve, arg, fileobj)
-            else:
-                self.retrieve(arg, fileobj)
+        if path.is_file() and not (validators and validators.get("stale")):
+            return path
+
+        with self.lock:
+            if path in self.pending:
+                return path
+            self.pending.add(path)
+
+        if self.executor:
+            self.executor.submit(self.retrieve, arg, path, validators)
+        else:
+            self.retrieve(arg, path, validators)
 
         return path
 
-    def retrieve(self, arg: Union[str, Request], fileobj: BinaryIO):
+    def retrieve(
+        self,
+        arg: Union[str, Request],
+        path: Path,
+        validators: Optional[JsonDict] = None,
+    ):
         """Retrieve file from url."""
-        url = arg.get_full_url() if isinstance(arg, Request) else arg
-        with log_time('Download "%s".', url), closing(fileobj), urlopen(arg) as f:
-            fileobj.write(f.read())
+        if isinstance(arg, Request):
+            url = arg.get_full_url()
+            headers = dict(arg.header_items())
+            data = arg.data
+            method = arg.get_method()
+        else:
+            url = arg
+            headers = {}
+            data = None
+            method = None
+
+        part = path.with_name(path.name + ".part")
+        validators = {} if validators is None else validators
+        partial = validators.get("partial") or {}
+        validator = partial.get("etag") or partial.get("last_modified")
+
+        if path.is_file():
+            if etag := validators.get("etag"):
+                headers["If-None-Match"] = etag
+            if last_modified := validators.get("last_modified"):
+                headers["If-Modified-Since"] = last_modified
+        elif validator and part.is_file():
+            headers["Range"] = f"bytes={part.stat().st_size}-"
+            headers["If-Range"] = validator
+
+        try:
+            with log_time('Download "%s".', url):
+                status = self.fetch(url, headers, data, method, part, validators)
+
+                # The server answers 416 when the partial file is already complete.
+                # Without partial file, the download restarts from scratch.
+                if status == 416 and not part.is_file() and "Range" in headers:
+                    del headers["Range"]
+                    headers.pop("If-Range", None)
+                    status = self.fetch(url, headers, data, method, part, validators)
+
+                if status == 304:
+                    return
+                if status == 416 and not part.is_file():
+                    raise HTTPError(url, 416, "Range Not Satisfiable", Message(), None)
+
+            part.replace(path)
+            validators.update(validators.pop("partial", {}))
+
+        except Exception:
+            if not (validators.get("stale") and path.is_file()):
+                raise
+            logger.warning('Couldn\'t revalidate "%s".', url, exc_info=True)
+
+        finally:
+            validators.pop("stale", None)
+            with self.lock:
+                self.pending.discard(path)
+
+    def fetch(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        data: Any,
+        method: Optional[str],
+        part: Path,
+        validators: JsonDict,
+    ) -> int:
+        """Write the response to the partial file and return the status code."""
+        with self.pool.open(url, headers, data, method) as f:
+            if f.status not in [304, 416]:
+                validators["partial"] = {
+                    "etag": f.headers.get("ETag"),
+                    "last_modified": f.headers.get("Last-Modified"),
+                }
+                with part.open("ab" if f.status == 206 else "wb") as fileobj:
+                    shutil.copyfileobj(f, fileobj)
+            return f.status
+
+
+class LoadCache:
+    """Persistent cache for the content of files loaded from the filesystem.
+
+    Entries are keyed by path and invalidated when the size, modification
+    time, inode or change time of the file doesn't match anymore. The cache
+    holds the raw text of the file and a pickled copy of the deserialized
+    value for data models.
+
+    Entries live in an sqlite database. They're queried one at a time when
+    a file is read, and flushing only upserts the entries that changed, so
+    the cost of a build doesn't grow with the size of the cache.
+
+    Immutable load caches are meant for files that never change once they're
+    written, like the content of a specific client jar. Their entries are
+    served without touching the files at all.
+    """
+
+    path: Path
+    immutable: bool
+    connection: Optional[sqlite3.Connection]
+    entries: Dict[str, Optional[List[Any]]]
+    changes: Set[str]
+    lock: Lock
+
+    def __init__(self, path: FileSystemPath, immutable: bool = False):
+        self.path = Path(path)
+        self.immutable = immutable
+        self.connection = None
+        self.entries = {}
+        self.changes = set()
+        self.lock = Lock()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changes)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database and create the table if needed."""
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(
+                self.path,
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, stat TEXT, raw, value BLOB)"
+            )
+        return self.connection
+
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def get_entry(self, key: str) -> Optional[List[Any]]:
+        """Return the cache entry associated with the given path if it exists."""
+        with self.lock:
+            if key in self.entries:
+                return self.entries[key]
+
+            entry = None
+            try:
+                row = (
+                    self.connect()
+                    .execute(
+                        "SELECT stat, raw, value FROM entries WHERE key = ?",
+                        (key,),
+                    )
+                    .fetchone()
+                )
+            except sqlite3.Error as exc:
+                logger.debug('Ignore invalid load cache "%s": %s', self.path, exc)
+            else:
+                if row:
+                    entry = [tuple(json.loads(row[0])), row[1], row[2]]
+
+            self.entries[key] = entry
+            return entry
+
+    def set_entry(self, key: str, entry: List[Any]):
+        """Update the cache entry associated with the given path."""
+        with self.lock:
+            self.entries[key] = entry
+            self.changes.add(key)
+
+    def stat(self, path: FileSystemPath) -> Tuple[int, ...]:
+        """Return the key used to detect modifications."""
+        if self.immutable:
+            return ()
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns
+
+    def attach(self, file_instance: File[Any, Any]):
+        """Read the file and its deserialized value from the cache when possible."""
+        if (
+            not isinstance(file_instance, TextFileBase)
+            or getattr(file_instance.reader, "load_cache", None) is not None
+            or not file_instance.source_path
+            or file_instance.source_start is not None
+            or file_instance.source_stop is not None
+        ):
+            return
+
+        key = str(file_instance.source_path)
+        reader = file_instance.reader
+        deserializer = file_instance.deserializer
+
+        def cached_reader(path: FileSystemPath, start: int, stop: int) -> Any:
+            stat = self.stat(path)
+
+            if (entry := self.get_entry(key)) and entry[0] == stat:
+                return entry[1]
+
+            raw = reader(path, start, stop)
+            self.set_entry(key, [stat, raw, None])
+            return raw
+
+        def cached_deserializer(content: Any) -> Any:
+            if not (entry := self.get_entry(key)) or content is not entry[1]:
+                return deserializer(content)
+
+            if entry[2] is not None:
+                return pickle.loads(entry[2])
+
+            value = deserializer(content)
+            try:
+                entry[2] = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                pass
+            else:
+                self.set_entry(key, entry)
+            return value
+
+        setattr(cached_reader, "load_cache", self)
+        file_instance.reader = cached_reader
+        if isinstance(file_instance, DataModelBase):
+            file_instance.deserializer = cached_deserializer
+
+    def clear(self):
+        """Remove all the entries."""
+        self.close()
+        with self.lock:
+            self.entries.clear()
+            self.changes.clear()
+            for suffix in ["", "-wal", "-shm"]:
+                self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+
+    def flush(self):
+        """Upsert the entries that changed since the last flush."""
+        with self.lock:
+            if not self.changes:
+                return
+
+            rows = [
+                (key, json.dumps(entry[0]), entry[1], entry[2])
+                for key in self.changes
+                if (entry := self.entries[key])
+            ]
+            connection = self.connect()
+
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET stat = excluded.stat, "
+                    "raw = excluded.raw, value = excluded.value",
+                    rows,
+                )
+            except:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+            self.changes.clear()
@@ -2,6 +2,7 @@ __all__ = [
     "SupportsMerge",
     "MergeMixin",
     "MatchMixin",
+    "compile_match_patterns",
     "Pin",
     "PinDefault",
     "PinDefaultFactory",
@@ -11,13 +12,17 @@ __all__ = [
 ]
 
 
+from bisect import bisect_left
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import (
     Any,
     Callable,
     Dict,
     Generic,
+    Iterable,
     Iterator,
+    List,
     Mapping,
     MutableMapping,
     Optional,
@@ -30,6 +35,7 @@ from typing import (
 )
 
 from pathspec import PathSpec
+from pathspec.util import NORMALIZE_PATH_SEPS
 
 from .utils import SENTINEL_OBJ, Sentinel
 
@@ -66,11 +72,83 @@ class MergeMixin:
         return True
 
 
+REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]|()")
+
+
+@lru_cache(maxsize=256)
+def compile_match_patterns(
+    patterns: Tuple[str, ...],
+) -> Tuple[PathSpec, Optional[Tuple[str, ...]]]:  # pyright: ignore[reportMissingTypeArgument]
+    """Compile the given path patterns and extract their literal prefixes.
+
+    The prefixes are None when some of the patterns can match keys that don't
+    start with a literal prefix.
+    """
+    spec = PathSpec.from_lines("gitwildmatch", patterns)
+
+    if NORMALIZE_PATH_SEPS:
+        return spec, None
+
+    prefixes: List[str] = []
+
+    for pattern in spec.patterns:
+        if not pattern.include or not pattern.regex:  # pyright: ignore[reportAttributeAccessIssue]
+            continue
+        if not (prefix := get_regex_prefix(pattern.regex.pattern)):  # pyright: ignore[reportAttributeAccessIssue]
+            return spec, None
+        prefixes.append(prefix)
+
+    # Keys are normalized before matching so they could also start with these.
+    prefixes.extend(["/", "./"])
+
+    distinct: List[str] = []
+    for prefix in sorted(prefixes):
+        if not distinct or not prefix.startswith(distinct[-1]):
+            distinct.append(prefix)
+
+    return spec, tuple(distinct)
+
+
+def get_regex_prefix(regex: str) -> str:
+    """Return the literal text that must be at the beginning of any match."""
+    if not regex.startswith("^"):
+        return ""
+
+    prefix: List[str] = []
+    escaped = False
+
+    for char in regex[1:]:
+        if escaped:
+            prefix.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in REGEX_SPECIAL_CHARS:
+            if char in "*+?{" and prefix:
+                prefix.pop()
+            break
+        else:
+            prefix.append(char)
+
+    return "".join(prefix)
+
+
 class MatchMixin:
     def match(self, *patterns: str) -> Set[str]:
         """Return keys matching the given path patterns."""
-        spec = PathSpec.from_lines("gitwildmatch", patterns)
-        return set(map(str, spec.match_files(self.keys())))  # pyright: ignore[reportAttributeAccessIssue]
+        spec, prefixes = compile_match_patterns(patterns)
+        keys = self.keys() if prefixes is None else self.match_prefixes(prefixes)  # pyright: ignore[reportAttributeAccessIssue]
+        return set(map(str, spec.match_files(keys)))
+
+    def match_prefixes(self, prefixes: Tuple[str, ...]) -> Iterable[str]:
+        """Return the keys starting with one of the given prefixes."""
+        if isinstance(self, Container):
+            return [
+                key
+                for prefix in prefixes
+                for key in self.keys_with_prefix(prefix)  # pyright: ignore[reportUnknownVariableType]
+            ]
+        return [key for key in self.keys() if key.startswith(prefixes)]  # pyright: ignore[reportAttributeAccessIssue]
 
 
 @dataclass
@@ -148,9 +226,11 @@ class Container(MutableMapping[K, V]):
     """Generic dict-like container."""
 
     _wrapped: Dict[K, V]
+    _sorted_keys: Optional[List[K]]
 
     def __init__(self):
         self._wrapped = {}
+        self._sorted_keys = None
 
     def __getitem__(self, key: K) -> V:
         key = self.normalize_key(key)
@@ -174,6 +254,8 @@ class Container(MutableMapping[K, V]):
         except Drop:
             should_delete = True
 
+        if key not in self._wrapped:
+            self._sorted_keys = None
         self._wrapped[key] = value
 
         if should_delete:
@@ -182,6 +264,7 @@ class Container(MutableMapping[K, V]):
     def __delitem__(self, key: K):
         key = self.normalize_key(key)
         del self._wrapped[key]
+        self._sorted_keys = None
 
     def __iter__(self) -> Iterator[K]:
         return iter(self._wrapped)
@@ -193,6 +276,20 @@ class Container(MutableMapping[K, V]):
         """Normalize the key before accessing an item."""
         return key
 
+    def keys_with_prefix(self, prefix: str) -> List[K]:
+        """Return the keys starting with the given prefix in sorted order."""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._wrapped)  # pyright: ignore[reportArgumentType]
+
+        keys = self._sorted_keys
+        start = bisect_left(keys, prefix)  # pyright: ignore[reportArgumentType]
+        stop = start
+
+        while stop < len(keys) and keys[stop].startswith(prefix):  # pyright: ignore[reportAttributeAccessIssue]
+            stop += 1
+
+        return keys[start:stop]
+
     def process(self, key: K, value: V) -> V:
         """Process the value before inserting it."""
         return value
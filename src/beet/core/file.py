@@ -18,28 +18,37 @@ __all__ = [
     "SerializationError",
     "DeserializationError",
     "InvalidDataModel",
+    "BlobStore",
 ]
 
 
+import hashlib
 import io
-import json
+import locale
+import os
 import shutil
+from contextlib import contextmanager
 from copy import deepcopy
-from dataclasses import dataclass, replace
-from pathlib import Path
+from dataclasses import dataclass, field, replace
+from functools import partial
+from mmap import ACCESS_READ, mmap
+from pathlib import Path, PurePath
 from typing import (
     Any,
     Callable,
     ClassVar,
+    Dict,
     Generic,
+    Iterator,
     Mapping,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
     Self,
 )
-from zipfile import ZipFile
+from zipfile import BadZipFile, ZipFile, ZipInfo
 
 import yaml
 from PIL import Image, ImageChops
@@ -51,10 +60,15 @@ from .error import BubbleException, WrappedException
 from .utils import (
     FileSystemPath,
     JsonDict,
-    dump_json,
+    can_write_zip_entry,
     extra_field,
     format_validation_error,
+    get_json_backend,
+    get_zip_stamp,
+    read_zip_entry,
     snake_case,
+    stream_file,
+    write_zip_entry,
 )
 
 ValueType = TypeVar("ValueType", bound=Any)
@@ -77,6 +91,9 @@ class File(Generic[ValueType, SerializeType]):
 
     source_start: Optional[int] = extra_field(default=None)
     source_stop: Optional[int] = extra_field(default=None)
+    source_entry: Optional[Tuple[str, ZipInfo, Tuple[int, int]]] = extra_field(
+        default=None
+    )
 
     on_bind: Optional[Callable[[Any, Any, str], Any]] = extra_field(default=None)
 
@@ -87,6 +104,7 @@ class File(Generic[ValueType, SerializeType]):
     )
 
     original: "File[ValueType, SerializeType]" = extra_field(default=None)
+    shared: bool = extra_field(default=False)
 
     snake_name: ClassVar[str] = "file"
 
@@ -134,6 +152,9 @@ class File(Generic[ValueType, SerializeType]):
             self.source_path = None
             self.source_start = None
             self.source_stop = None
+        if content is not self._content:
+            self.source_entry = None
+            self.shared = False
         self._content = content
 
     def get_content(self) -> Union[ValueType, SerializeType]:
@@ -188,6 +209,9 @@ class File(Generic[ValueType, SerializeType]):
         finally:
             self.deserializer = backup
 
+        if self.shared and content is self._content:
+            content = deepcopy(content)
+
         self.set_content(content)
         return content
 
@@ -212,12 +236,71 @@ class File(Generic[ValueType, SerializeType]):
 
     def content_equal(self, other: Self) -> bool:
         """Compare file contents."""
+        if self._content is other._content is None:
+            with self.view() as data, other.view() as other_data:
+                if data == other_data:
+                    return True
         return (
             self.get_content() == other.get_content()
             or self.ensure_serialized() == other.ensure_serialized()
             or self.ensure_deserialized() == other.ensure_deserialized()
         )
 
+    @contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """Expose the raw bytes of the file, memory-mapping the source when unloaded."""
+        if self._content is not None:
+            with memoryview(self.dump_bytes()) as data:
+                yield data
+            return
+
+        start = 0 if self.source_start is None else self.source_start
+
+        with open(self.ensure_source_path(), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                with memoryview(b"") as data:
+                    yield data
+                return
+
+            stop = None if self.source_stop is None else self.source_stop
+
+            with mmap(f.fileno(), 0, access=ACCESS_READ) as mapped:
+                with memoryview(mapped) as whole, whole[start:stop] as data:
+                    yield data
+
+    def checksum(self) -> str:
+        """Return a hash of the serialized content."""
+        if self._content is None:
+            if self.source_start is self.source_stop is None:
+                with open(self.ensure_source_path(), "rb") as f:
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+            with self.view() as data:
+                return hashlib.sha256(data).hexdigest()
+        raw = self.ensure_serialized()
+        return hashlib.sha256(raw.encode() if isinstance(raw, str) else raw).hexdigest()
+
+    def dump_digest(self) -> Tuple[str, Optional[bytes]]:
+        """Return a hash of the bytes written when dumping the file.
+
+        The encoded bytes are returned alongside the hash when the file is loaded.
+        Unloaded files are hashed from their source without reading it in memory.
+        """
+        if self._content is None:
+            return self.checksum(), None
+        data = self.dump_bytes()
+        return hashlib.sha256(data).hexdigest(), data
+
+    def source_stat(self) -> Optional[os.stat_result]:
+        """Return the stat of the source file if the content hasn't been loaded."""
+        if self._content is None and self.source_start is self.source_stop is None:
+            return os.stat(self.ensure_source_path())
+        return None
+
+    def share_content(self, blobs: "BlobStore"):
+        """Replace the serialized content with the shared buffer from the blob store."""
+        if isinstance(self._content, (str, bytes)):
+            self._content = blobs.add(self._content)  # pyright: ignore[reportArgumentType]
+
     @classmethod
     def default(cls) -> ValueType:
         """Return the file's default value."""
@@ -227,8 +310,10 @@ class File(Generic[ValueType, SerializeType]):
         )
 
     def copy(self: FileType) -> FileType:
-        """Copy the file."""
-        return replace(self, _content=deepcopy(self._content))
+        """Copy the file, sharing deserialized content until it's accessed."""
+        if not isinstance(self._content, (str, bytes, type(None))):
+            self.shared = True
+        return replace(self)
 
     def serialize(self, content: Union[ValueType, SerializeType]) -> SerializeType:
         """Serialize file content."""
@@ -253,9 +338,10 @@ class File(Generic[ValueType, SerializeType]):
         cls: Type[FileType],
         origin: FileOrigin,
         path: FileSystemPath = "",
+        source_stamp: Optional[Tuple[int, int]] = None,
     ) -> FileType:
         """Load a file from a zipfile or from the filesystem."""
-        instance = cls.try_load(origin, path)
+        instance = cls.try_load(origin, path, source_stamp)
         if instance is None:
             raise FileNotFoundError(path)
         return instance
@@ -265,16 +351,32 @@ class File(Generic[ValueType, SerializeType]):
         cls: Type[FileType],
         origin: FileOrigin,
         path: FileSystemPath = "",
+        source_stamp: Optional[Tuple[int, int]] = None,
     ) -> Optional[FileType]:
-        """Try to load a file from a zipfile or from the filesystem."""
+        """Try to load a file from a zipfile or from the filesystem.
+
+        The source stamp is the size and modification time of the zipfile. It's
+        computed when not provided, which lets callers stat the archive only once.
+        """
         if isinstance(origin, ZipFile):
             try:
-                return cls(cls.from_zip(origin, str(path)))
+                instance = cls(cls.from_zip(origin, str(path)))
             except KeyError:
                 return None
+            if source_stamp is None:
+                source_stamp = get_zip_stamp(origin)
+            if origin.filename and source_stamp is not None:
+                instance.source_entry = (
+                    origin.filename,
+                    origin.getinfo(str(path)),
+                    source_stamp,
+                )
+            return instance
         elif isinstance(origin, Mapping):
             try:
-                path = "" if Path(path) == Path() else str(path)
+                path = str(path)
+                if not path.strip("./") and Path(path) == Path():
+                    path = ""
                 value, path = origin[path], ""
             except KeyError:
                 return None
@@ -282,6 +384,9 @@ class File(Generic[ValueType, SerializeType]):
                 if isinstance(value, cls):
                     return value.copy()
                 return None
+            # Custom path-like objects may only materialize the file when used.
+            if not isinstance(value, (str, PurePath)):
+                return cls(source_path=value)
             origin = value
         path = Path(origin, path)
         return cls(source_path=path) if path.is_file() else None
@@ -290,19 +395,86 @@ class File(Generic[ValueType, SerializeType]):
         """Write file content to path."""
         raise NotImplementedError()
 
+    def dump_bytes(self) -> bytes:
+        """Return the bytes that would be written when dumping the file."""
+        if self._content is None:
+            with self.view() as data:
+                return bytes(data)
+        return self.encode(self.ensure_serialized())
+
+    def encode(self, raw: SerializeType) -> bytes:
+        """Convert serialized content to bytes."""
+        raise NotImplementedError()
+
     def dump_zip(self, origin: ZipFile, name: str, raw: SerializeType) -> None:
         """Write file content to zip."""
         raise NotImplementedError()
 
+    def raw_zip_entry(
+        self,
+        origin: ZipFile,
+        name: str,
+    ) -> Optional[Tuple[ZipInfo, bytes]]:
+        """Return the untouched compressed entry from the source zip if possible."""
+        if not self.source_entry:
+            return None
+
+        source, zinfo, stamp = self.source_entry
+
+        if (
+            not can_write_zip_entry(origin)
+            or zinfo.compress_type != origin.compression
+            or zinfo.flag_bits & 0x01
+            or not origin.filename
+            or os.path.abspath(source) == os.path.abspath(origin.filename)
+        ):
+            return None
+
+        try:
+            entry, data = read_zip_entry(source, zinfo, stamp)
+        except (OSError, BadZipFile):
+            return None
+
+        entry.filename = entry.orig_filename = name
+        return entry, data
+
+    def zip_info(self, origin: ZipFile, name: str) -> ZipInfo:
+        """Return the header of the zip entry written when dumping the file."""
+        if self._content is None and self.source_start is self.source_stop is None:
+            zinfo = ZipInfo.from_file(self.ensure_source_path(), name)
+        else:
+            zinfo = ZipInfo(name)
+            zinfo.external_attr = 0o600 << 16
+        zinfo.compress_type = origin.compression
+        zinfo.compress_level = origin.compresslevel
+        return zinfo
+
     def dump(self, origin: FileOrigin, path: FileSystemPath):
         """Write the file to a zipfile or to the filesystem."""
         if isinstance(origin, Mapping):
             raise TypeError(f'Can\'t dump file "{path}" to read-only mapping.')
-        if self._content is None:
+        if isinstance(origin, ZipFile) and (
+            entry := self.raw_zip_entry(origin, str(path))
+        ):
+            write_zip_entry(origin, *entry)
+        elif self._content is None and self.source_start is self.source_stop is None:
             if isinstance(origin, ZipFile):
                 origin.write(self.ensure_source_path(), str(path))
             else:
                 shutil.copyfile(self.ensure_source_path(), str(Path(origin, path)))
+        elif self._content is None:
+            start = 0 if self.source_start is None else self.source_start
+            stop = -1 if self.source_stop is None else self.source_stop
+            if isinstance(origin, ZipFile):
+                zinfo = self.zip_info(origin, str(path))
+                zinfo.file_size = (
+                    os.path.getsize(self.ensure_source_path()) if stop < 0 else stop
+                ) - start
+                with origin.open(zinfo, "w") as f:
+                    stream_file(self.ensure_source_path(), f, start, stop)
+            else:
+                with open(Path(origin, path), "wb") as f:
+                    stream_file(self.ensure_source_path(), f, start, stop)
         else:
             raw = self.ensure_serialized()
             if isinstance(origin, ZipFile):
@@ -447,6 +619,15 @@ class TextFileBase(File[ValueType, str]):
         ) as f:
             f.write(raw)
 
+    def encode(self, raw: str) -> bytes:
+        newline = os.linesep if self.newline is None else self.newline
+        if newline not in ("", "\n"):
+            raw = raw.replace("\n", newline)
+        return raw.encode(
+            self.encoding or locale.getencoding(),
+            self.errors or "strict",
+        )
+
     def dump_zip(self, origin: ZipFile, name: str, raw: str) -> None:
         with origin.open(name, "w") as f:
             with io.TextIOWrapper(
@@ -531,6 +712,9 @@ class BinaryFileBase(File[ValueType, bytes]):
         with open(path, "wb") as f:
             f.write(raw)
 
+    def encode(self, raw: bytes) -> bytes:
+        return raw
+
     def dump_zip(self, origin: ZipFile, name: str, raw: bytes) -> None:
         with origin.open(name, "w") as f:
             f.write(raw)
@@ -619,12 +803,21 @@ class DataModelBase(TextFileBase[ValueType]):
 class JsonFileBase(DataModelBase[ValueType]):
     """Base class for json files."""
 
+    json_backend: ClassVar[Optional[str]] = None
+    json_indent: ClassVar[Union[int, str, None]] = 2
+    json_sort_keys: ClassVar[bool] = False
+
     def __post_init__(self):
         super().__post_init__()
+        backend = get_json_backend(self.json_backend)
         if not self.encoder:
-            self.encoder = dump_json
+            self.encoder = partial(
+                backend.dumps,
+                indent=self.json_indent,
+                sort_keys=self.json_sort_keys,
+            )
         if not self.decoder:
-            self.decoder = json.loads
+            self.decoder = backend.loads
 
 
 @dataclass(eq=False, repr=False)
@@ -686,3 +879,30 @@ class PngFile(BinaryFileBase[Image.Image]):
     @classmethod
     def default(cls) -> Image.Image:
         return Image.new("RGBA", (16, 16), "magenta")
+
+
+BlobType = TypeVar("BlobType", str, bytes)
+
+
+@dataclass
+class BlobStore:
+    """Content-addressed store for sharing identical file payloads."""
+
+    blobs: Dict[str, Union[str, bytes]] = field(default_factory=dict)
+    deduplicated: int = 0
+
+    def digest(self, data: Union[str, bytes]) -> str:
+        """Return the key associated with the given payload."""
+        if isinstance(data, str):
+            return "s" + hashlib.sha256(data.encode()).hexdigest()
+        return "b" + hashlib.sha256(data).hexdigest()
+
+    def add(self, data: BlobType) -> BlobType:
+        """Store the payload and return the shared buffer with identical content."""
+        key = self.digest(data)
+        if (existing := self.blobs.get(key)) is None:
+            self.blobs[key] = data
+            return data
+        if existing is not data:
+            self.deduplicated += len(data.encode() if isinstance(data, str) else data)
+        return existing  # pyright: ignore[reportReturnType]
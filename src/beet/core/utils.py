@@ -7,6 +7,10 @@ __all__ = [
     "Sentinel",
     "SENTINEL_OBJ",
     "dump_json",
+    "JsonDumps",
+    "JsonBackend",
+    "JSON_BACKENDS",
+    "get_json_backend",
     "extra_field",
     "required_field",
     "intersperse",
@@ -21,6 +25,9 @@ __all__ = [
     "log_time",
     "log_time_scope",
     "remove_path",
+    "COPY_BUFSIZE",
+    "stream_file",
+    "clone_file",
     "format_obj",
     "format_exc",
     "format_validation_error",
@@ -28,29 +35,46 @@ __all__ = [
     "pop_traceback",
     "change_directory",
     "resolve_within",
+    "can_write_zip_entry",
+    "compress_zip_entry",
+    "write_zip_entry",
+    "read_zip_entry",
+    "get_zip_stamp",
+    "decompress_zip_entry",
+    "resolve_zip_member",
+    "ZipMemberPath",
 ]
 
 
+import bz2
 import json
 import logging
+import lzma
 import os
 import re
 import shutil
+import struct
 import sys
+import threading
 import time
+import zipfile
+import zlib
 from contextlib import contextmanager
-from dataclasses import field
+from dataclasses import dataclass, field
 from importlib import import_module
 from importlib.util import find_spec
 from pathlib import Path
 from traceback import format_exception
 from typing import (
+    IO,
     Any,
+    Callable,
     Dict,
     Iterable,
     Iterator,
     List,
     Optional,
+    Protocol,
     Tuple,
     TypedDict,
     TypeVar,
@@ -84,8 +108,93 @@ class Sentinel:
 SENTINEL_OBJ = Sentinel()
 
 
+class JsonDumps(Protocol):
+    """Protocol describing the signature of json encoders."""
+
+    def __call__(
+        self,
+        value: Any,
+        indent: Union[int, str, None] = 2,
+        sort_keys: bool = False,
+    ) -> str: ...
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    """Json encoder and decoder pair."""
+
+    dumps: JsonDumps
+    loads: Callable[[str], Any]
+
+
+def _json_dumps(
+    value: Any,
+    indent: Union[int, str, None] = 2,
+    sort_keys: bool = False,
+) -> str:
+    return json.dumps(value, indent=indent, sort_keys=sort_keys) + "\n"
+
+
+JSON_BACKENDS: Dict[str, JsonBackend] = {"json": JsonBackend(_json_dumps, json.loads)}
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    ORJSON_MISMATCHES = (b"0.0000", b"null", b"\\u00", b"\x7f")
+    ORJSON_EXPONENT_REGEX = re.compile(rb"\de[-+\d]")
+    ORJSON_OPTIONS = (
+        orjson.OPT_INDENT_2
+        | orjson.OPT_APPEND_NEWLINE
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
+
+    def _orjson_dumps(
+        value: Any,
+        indent: Union[int, str, None] = 2,
+        sort_keys: bool = False,
+    ) -> str:
+        if indent != 2:
+            return _json_dumps(value, indent, sort_keys)
+
+        option = ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else ORJSON_OPTIONS
+
+        try:
+            data = orjson.dumps(value, option=option)
+        except TypeError:
+            return _json_dumps(value, indent, sort_keys)
+
+        # Escaped characters, exponents and nan don't match the output of the
+        # json module so the stdlib takes over whenever they might appear.
+        if (
+            not data.isascii()
+            or any(chunk in data for chunk in ORJSON_MISMATCHES)
+            or ORJSON_EXPONENT_REGEX.search(data)
+        ):
+            return _json_dumps(value, indent, sort_keys)
+
+        return data.decode()
+
+    def _orjson_loads(value: str) -> Any:
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            return json.loads(value)
+
+    JSON_BACKENDS["orjson"] = JsonBackend(_orjson_dumps, _orjson_loads)
+
+
+def get_json_backend(name: Optional[str] = None) -> JsonBackend:
+    if name is None:
+        name = "orjson" if "orjson" in JSON_BACKENDS else "json"
+    return JSON_BACKENDS[name]
+
+
 def dump_json(value: Any) -> str:
-    return json.dumps(value, indent=2) + "\n"
+    return get_json_backend().dumps(value, 2, False)
 
 
 def extra_field(**kwargs: Any) -> Any:
@@ -250,6 +359,63 @@ def remove_path(*paths: FileSystemPath):
             path.unlink(missing_ok=True)
 
 
+COPY_BUFSIZE = 1024 * 1024 if os.name == "nt" else 64 * 1024
+
+
+def stream_file(path: FileSystemPath, dst: IO[bytes], start: int = 0, stop: int = -1):
+    """Copy a byte range of the file at the given path to the destination stream."""
+    with open(path, "rb") as src:
+        count = (os.fstat(src.fileno()).st_size if stop == -1 else stop) - start
+
+        try:
+            dst.flush()
+            out_fd = dst.fileno()
+        except (AttributeError, OSError):
+            out_fd = None
+
+        if out_fd is not None and hasattr(os, "sendfile"):
+            offset = start
+            try:
+                while count > 0:
+                    if not (sent := os.sendfile(out_fd, src.fileno(), offset, count)):
+                        break
+                    offset += sent
+                    count -= sent
+            except OSError:
+                if offset > start:
+                    raise
+            else:
+                return
+
+        src.seek(start)
+        while count > 0 and (chunk := src.read(min(count, COPY_BUFSIZE))):
+            dst.write(chunk)
+            count -= len(chunk)
+
+
+FICLONE = 0x40049409
+
+
+def clone_file(src: FileSystemPath, dst: FileSystemPath) -> bool:
+    """Create the destination as a copy-on-write clone of the source file.
+
+    Return False when the platform or the filesystem doesn't support reflinks.
+    The destination might then exist but be empty.
+    """
+    if sys.platform != "linux":
+        return False
+
+    import fcntl
+
+    try:
+        with open(src, "rb") as f, open(dst, "wb") as g:
+            fcntl.ioctl(g.fileno(), FICLONE, f.fileno())
+    except OSError:
+        return False
+
+    return True
+
+
 def format_exc(exc: BaseException) -> str:
     return "".join(format_exception(exc.__class__, exc, exc.__traceback__))
 
@@ -345,3 +511,262 @@ def resolve_within(
                 pass
         return Path(path).resolve().as_posix()
     return None
+
+
+ZIP_RAW_WRITE = sys.version_info < (3, 15)
+ZIP_RAW_WRITE_ATTRIBUTES = (
+    "_lock",
+    "_writing",
+    "_seekable",
+    "start_dir",
+    "_didModify",
+    "_writecheck",
+)
+
+# Same settings as the lzma compressor used by zipfile: the lzma1 filter with the
+# default preset, preceded by the lzma sdk version and the encoded properties.
+ZIP_LZMA_FILTER = {
+    "id": lzma.FILTER_LZMA1,
+    "dict_size": 1 << 23,
+    "lc": 3,
+    "lp": 0,
+    "pb": 2,
+}
+ZIP_LZMA_PROPERTIES = bytes([(2 * 5 + 0) * 9 + 3]) + (1 << 23).to_bytes(4, "little")
+ZIP_LZMA_HEADER = struct.pack("<BBH", 9, 4, len(ZIP_LZMA_PROPERTIES))
+
+
+def can_write_zip_entry(origin: zipfile.ZipFile) -> bool:
+    """Check if precompressed entries can be appended to the zipfile as-is."""
+    return ZIP_RAW_WRITE and all(
+        hasattr(origin, attr) for attr in ZIP_RAW_WRITE_ATTRIBUTES
+    )
+
+
+def compress_zip_entry(
+    zinfo: zipfile.ZipInfo,
+    data: Union[bytes, memoryview],
+    compresslevel: Optional[int] = None,
+) -> Tuple[zipfile.ZipInfo, bytes]:
+    """Compress the data for the given zip entry."""
+    zinfo.compress_level = compresslevel
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel,
+            zlib.DEFLATED,
+            -15,
+        )
+        payload = compressor.compress(data) + compressor.flush()
+    elif zinfo.compress_type == zipfile.ZIP_BZIP2:
+        payload = bz2.compress(data, 9 if compresslevel is None else compresslevel)
+    elif zinfo.compress_type == zipfile.ZIP_LZMA:
+        zinfo.flag_bits |= 0x02
+        compressor = lzma.LZMACompressor(lzma.FORMAT_RAW, filters=[ZIP_LZMA_FILTER])
+        payload = (
+            ZIP_LZMA_HEADER
+            + ZIP_LZMA_PROPERTIES
+            + compressor.compress(data)
+            + compressor.flush()
+        )
+    else:
+        payload = bytes(data)
+
+    zinfo.compress_size = len(payload)
+    return zinfo, payload
+
+
+def write_zip_entry(origin: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: bytes):
+    """Append a precompressed entry to the zipfile.
+
+    The entry is copied without recompressing when the zipfile internals are
+    known to support it, and goes through the public api otherwise.
+    """
+    if not can_write_zip_entry(origin):
+        content = decompress_zip_entry(zinfo, data)
+        with origin.open(zinfo, "w") as f:
+            f.write(content)
+        return
+
+    archive: Any = origin
+
+    if not archive.fp:
+        raise ValueError("Attempt to write to ZIP archive that was already closed")
+    if archive._writing:
+        raise ValueError(
+            "Can't write to ZIP archive while an open writing handle exists."
+        )
+
+    with archive._lock:
+        if archive._seekable:
+            archive.fp.seek(archive.start_dir)
+        zinfo.header_offset = archive.fp.tell()
+        archive._writecheck(zinfo)
+        archive._didModify = True
+        archive.fp.write(zinfo.FileHeader())
+        archive.fp.write(data)
+        archive.start_dir = archive.fp.tell()
+        archive.filelist.append(zinfo)
+        archive.NameToInfo[zinfo.filename] = zinfo
+
+
+def read_zip_entry(
+    path: FileSystemPath,
+    zinfo: zipfile.ZipInfo,
+    stamp: Optional[Tuple[int, int]] = None,
+) -> Tuple[zipfile.ZipInfo, bytes]:
+    """Read the compressed data of a zip entry.
+
+    When provided, the stamp is the size and modification time of the archive
+    at the time the entry was listed. The archive is rejected if it changed.
+    """
+    with open(path, "rb") as f:
+        if stamp is not None:
+            stat = os.fstat(f.fileno())
+            if (stat.st_size, stat.st_mtime_ns) != stamp:
+                raise zipfile.BadZipFile(
+                    f"Archive changed since {zinfo.filename!r} was loaded."
+                )
+        f.seek(zinfo.header_offset)
+        header = f.read(30)
+        if len(header) != 30 or header[:4] != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"Bad local file header for {zinfo.filename!r}.")
+        name_length, extra_length = struct.unpack("<HH", header[26:])
+        name = f.read(name_length)
+        f.seek(extra_length, os.SEEK_CUR)
+        data = f.read(zinfo.compress_size)
+
+    encoding = "utf-8" if zinfo.flag_bits & 0x800 else "cp437"
+    if name != zinfo.orig_filename.encode(encoding) or len(data) != zinfo.compress_size:
+        raise zipfile.BadZipFile(f"Mismatched zip entry for {zinfo.filename!r}.")
+
+    entry = zipfile.ZipInfo(zinfo.filename, zinfo.date_time)
+    entry.compress_type = zinfo.compress_type
+    entry.external_attr = zinfo.external_attr
+    entry.flag_bits = zinfo.flag_bits & 0x06
+    entry.file_size = zinfo.file_size
+    entry.compress_size = zinfo.compress_size
+    entry.CRC = zinfo.CRC
+
+    return entry, data
+
+
+def get_zip_stamp(origin: zipfile.ZipFile) -> Optional[Tuple[int, int]]:
+    """Return the size and modification time of the archive backing the zipfile."""
+    if not origin.filename:
+        return None
+    stat = os.stat(origin.filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def decompress_zip_entry(zinfo: zipfile.ZipInfo, data: bytes) -> bytes:
+    if zinfo.flag_bits & 0x01:
+        raise zipfile.BadZipFile(f"Encrypted zip entry {zinfo.filename!r}.")
+    try:
+        if zinfo.compress_type == zipfile.ZIP_STORED:
+            content = data
+        elif zinfo.compress_type == zipfile.ZIP_DEFLATED:
+            content = zlib.decompress(data, -15)
+        elif zinfo.compress_type == zipfile.ZIP_BZIP2:
+            content = bz2.decompress(data)
+        elif zinfo.compress_type == zipfile.ZIP_LZMA:
+            content = decompress_zip_lzma(data)
+        else:
+            raise zipfile.BadZipFile(
+                f"Unsupported compression method for {zinfo.filename!r}."
+            )
+    except zipfile.BadZipFile:
+        raise
+    except Exception as exc:
+        raise zipfile.BadZipFile(f"Corrupted zip entry {zinfo.filename!r}.") from exc
+    if zlib.crc32(content) != zinfo.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {zinfo.filename!r}.")
+    return content
+
+
+def decompress_zip_lzma(data: bytes) -> bytes:
+    """Decompress an lzma zip entry made of a header, the properties and the stream."""
+    (size,) = struct.unpack("<H", data[2:4])
+    properties = data[4 : 4 + size]
+    settings, dict_size = properties[0], int.from_bytes(properties[1:5], "little")
+    lzma_filter = {
+        "id": lzma.FILTER_LZMA1,
+        "dict_size": dict_size,
+        "lc": settings % 9,
+        "lp": settings // 9 % 5,
+        "pb": settings // 45,
+    }
+    decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=[lzma_filter])
+    return decompressor.decompress(data[4 + size :])
+
+
+def resolve_zip_member(directory: FileSystemPath, filename: str) -> Optional[str]:
+    """Return the extraction path of the zip member inside the directory.
+
+    Members with absolute paths or parent references that would end up
+    outside the directory are rejected by returning None.
+    """
+    directory = os.path.normpath(os.path.abspath(directory))
+    destination = os.path.normpath(os.path.join(directory, filename))
+    if os.path.commonpath([directory, destination]) != directory:
+        return None
+    if destination == directory:
+        return None
+    return destination
+
+
+class ZipMemberPath(os.PathLike[str]):
+    """Path to a zip member that gets extracted the first time the path is used."""
+
+    archive: FileSystemPath
+    info: zipfile.ZipInfo
+    destination: str
+    extracted: bool
+
+    def __init__(
+        self,
+        archive: FileSystemPath,
+        info: zipfile.ZipInfo,
+        destination: FileSystemPath,
+    ):
+        self.archive = archive
+        self.info = info
+        self.destination = os.fspath(destination)
+        self.extracted = False
+
+    def __fspath__(self) -> str:
+        if not self.extracted:
+            if not os.path.isfile(self.destination):
+                self.extract()
+            self.extracted = True
+        return self.destination
+
+    def extract(self):
+        """Extract the member to its destination."""
+        try:
+            content = decompress_zip_entry(*read_zip_entry(self.archive, self.info))
+        except zipfile.BadZipFile:
+            with zipfile.ZipFile(self.archive) as archive:
+                content = archive.read(self.info)
+
+        os.makedirs(os.path.dirname(self.destination), exist_ok=True)
+        tmp = f"{self.destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, self.destination)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ZipMemberPath):
+            return self.destination == other.destination
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.destination)
+
+    def __str__(self) -> str:
+        return self.destination
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.destination!r})"
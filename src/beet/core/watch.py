@@ -1,15 +1,33 @@
 __all__ = [
     "DirectoryWatcher",
     "FileChanges",
+    "InotifyObserver",
     "detect_repeated_changes",
 ]
 
 
+import ctypes
+import ctypes.util
 import os
+import select
+import stat
+import struct
+import sys
 import time
 from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, Literal, Optional, Sequence, Tuple, cast
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
 from pathspec import PathSpec
 
@@ -18,9 +36,116 @@ from .utils import FileSystemPath, extra_field
 FileChanges = Dict[str, Literal["created", "edited", "removed"]]
 
 
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+INOTIFY_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_ONLYDIR
+)
+INOTIFY_EVENT = struct.Struct("iIII")
+
+RACY_LISTING_NS = 1_000_000_000
+IGNORED_CACHE_SIZE = 65536
+
+
+class InotifyObserver:
+    """Minimal inotify binding that reports the paths changed in watched directories."""
+
+    fd: int
+    directories: Dict[int, str]
+    watches: Dict[str, int]
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("Inotify is only available on linux.")
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self.add_watch = libc.inotify_add_watch
+            self.rm_watch = libc.inotify_rm_watch
+            self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except AttributeError as exc:
+            raise OSError("Couldn't load inotify functions.") from exc
+
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.directories = {}
+        self.watches = {}
+
+    def add(self, directory: str) -> bool:
+        """Start watching the directory."""
+        wd = self.add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK)
+        if wd < 0:
+            return False
+        self.directories[wd] = directory
+        self.watches[directory] = wd
+        return True
+
+    def discard(self, directory: str):
+        """Stop watching the directory and all its subdirectories."""
+        prefix = directory + os.sep
+        for path in [p for p in self.watches if p == directory or p.startswith(prefix)]:
+            wd = self.watches.pop(path)
+            del self.directories[wd]
+            self.rm_watch(self.fd, wd)
+
+    def read(self, timeout: Optional[float] = None) -> Optional[List[Tuple[str, int]]]:
+        """Wait for events and return the affected paths or None on overflow."""
+        events: List[Tuple[str, int]] = []
+
+        while not events and select.select([self.fd], [], [], timeout)[0]:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    if (directory := self.directories.pop(wd, None)) is not None:
+                        del self.watches[directory]
+                elif name and (directory := self.directories.get(wd)):
+                    events.append((os.path.join(directory, name), mask))
+
+        return events
+
+    def close(self):
+        """Release the inotify instance."""
+        os.close(self.fd)
+
+
 @dataclass
 class DirectoryWatcher:
-    """Iterator that detects and yields file changes by polling the filesystem."""
+    """Iterator that detects and yields file changes in the watched directory.
+
+    The watcher polls the filesystem every interval by default. The auto backend
+    relies on inotify when available and falls back to polling.
+    """
 
     path: FileSystemPath
     interval: float = 0.6
@@ -28,8 +153,17 @@ class DirectoryWatcher:
 
     ignore_file: Optional[FileSystemPath] = extra_field(default=None)
     ignore_patterns: Sequence[str] = extra_field(default=())
+    backend: Literal["auto", "inotify", "poll"] = extra_field(default="poll")
+    debounce: float = extra_field(default=0.05)
 
     files: Dict[str, float] = extra_field(init=False, default_factory=dict)
+    listings: Dict[str, Tuple[int, List[str], List[str]]] = extra_field(
+        init=False,
+        default_factory=dict,
+    )
+    ignored: Dict[str, bool] = extra_field(init=False, default_factory=dict)
+    negated: List[List[str]] = extra_field(init=False, default_factory=list)
+    observer: Optional[InotifyObserver] = extra_field(init=False, default=None)
 
     def __post_init__(self):
         self.ignore_patterns = list(self.ignore_patterns)
@@ -51,12 +185,62 @@ class DirectoryWatcher:
                 ]
 
         self.ignore = PathSpec.from_lines("gitwildmatch", self.ignore_patterns)
+        self.negated = [
+            pattern[1:].strip("/").split("/")
+            for pattern in self.ignore_patterns
+            if pattern.startswith("!")
+        ]
 
     def __iter__(self) -> Iterator[FileChanges]:
-        while True:
+        self.observer = self.create_observer()
+
+        try:
             if changes := self.poll():
                 yield changes
-            time.sleep(self.interval)
+
+            while self.observer:
+                events = self.collect(self.observer)
+                changes = self.poll() if events is None else self.update(events)
+                if changes:
+                    yield changes
+
+            while True:
+                time.sleep(self.interval)
+                if changes := self.poll():
+                    yield changes
+
+        finally:
+            self.stop_observer()
+
+    def create_observer(self) -> Optional[InotifyObserver]:
+        """Create the inotify observer unless the watcher should poll."""
+        if self.backend == "poll":
+            return None
+        try:
+            return InotifyObserver()
+        except OSError:
+            if self.backend == "inotify":
+                raise
+            return None
+
+    def stop_observer(self):
+        """Close the observer and fall back to polling."""
+        if self.observer:
+            self.observer.close()
+            self.observer = None
+
+    def collect(self, observer: InotifyObserver) -> Optional[List[Tuple[str, int]]]:
+        """Wait for events and keep collecting them until the directory settles."""
+        events = observer.read()
+        deadline = time.monotonic() + self.interval
+
+        while events is not None:
+            timeout = min(self.debounce, deadline - time.monotonic())
+            if timeout <= 0 or (more := observer.read(timeout)) == []:
+                break
+            events = None if more is None else events + more
+
+        return events
 
     def poll(self) -> FileChanges:
         """Return the files created, edited, or removed since the last poll."""
@@ -79,25 +263,137 @@ class DirectoryWatcher:
         self.files = new_files
         return changes
 
+    def update(self, events: Iterable[Tuple[str, int]]) -> FileChanges:
+        """Return the changes affecting the paths reported by the observer."""
+        base_path = str(Path(self.path).resolve())
+        candidates: Dict[str, bool] = {}
+
+        for path, mask in events:
+            relative = path[len(base_path) + 1 :]
+            candidates[relative] = candidates.get(relative, False) or bool(
+                mask & IN_ISDIR
+            )
+
+        previous = {
+            relative: self.files[relative]
+            for relative in candidates
+            if relative in self.files
+        }
+
+        if directories := [relative for relative, d in candidates.items() if d]:
+            prefixes = tuple(relative + os.sep for relative in directories)
+            previous.update(
+                (filename, mtime)
+                for filename, mtime in self.files.items()
+                if filename.startswith(prefixes)
+            )
+            for relative in directories:
+                if self.observer:
+                    self.observer.discard(os.path.join(base_path, relative))
+                self.listings.pop(relative, None)
+
+        current: Dict[str, float] = {}
+
+        for relative in candidates:
+            try:
+                st = os.stat(os.path.join(base_path, relative))
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                if not self.is_ignored(relative + os.sep):
+                    current.update(self.walk(relative))
+            elif not self.is_ignored(relative):
+                current[relative] = st.st_mtime
+
+        changes: FileChanges = {}
+
+        for filename, mtime in current.items():
+            if (previous_mtime := previous.get(filename)) == mtime:
+                continue
+            changes[filename] = "edited" if previous_mtime else "created"
+
+        for filename in previous.keys() - current.keys():
+            changes[filename] = "removed"
+            del self.files[filename]
+
+        self.files.update(current)
+        return changes
+
+    def is_ignored(self, path: str) -> bool:
+        """Match the path against the ignore spec and remember the result.
+
+        Directories end with a trailing separator. They're only ignored when no
+        negated pattern could match a file below them.
+        """
+        if (ignored := self.ignored.get(path)) is None:
+            ignored = self.ignore.match_file(path)
+            if ignored and path.endswith(os.sep):
+                ignored = not self.may_include_below(path[:-1])
+            if len(self.ignored) >= IGNORED_CACHE_SIZE:
+                self.ignored.clear()
+            self.ignored[path] = ignored
+        return ignored
+
+    def may_include_below(self, directory: str) -> bool:
+        """Check if a negated pattern could match a file below the directory."""
+        parts = directory.split(os.sep)
+
+        for segments in self.negated:
+            if len(segments) == 1 or segments[0] == "**":
+                return True
+            for part, segment in zip(parts, segments):
+                if segment == "**":
+                    return True
+                if not fnmatchcase(part, segment):
+                    break
+            else:
+                return True
+
+        return False
+
     def walk(
         self,
         path: Optional[FileSystemPath] = None,
     ) -> Iterator[Tuple[str, float]]:
         """Walk down the watched directories."""
-        base_path = Path(self.path).resolve()
-        directory = base_path / path if path else base_path
+        base_path = str(Path(self.path).resolve())
+        relative = os.fspath(path) if path else ""
+        directory = os.path.join(base_path, relative) if relative else base_path
 
-        for entry in os.scandir(directory):
-            entry_path = Path(entry.path)
-            relative_path = entry_path.relative_to(base_path)
+        if self.observer and not self.observer.add(directory):
+            self.stop_observer()
 
-            if self.ignore.match_file(relative_path):
-                continue
+        mtime = os.stat(directory).st_mtime_ns
+        listing = self.listings.get(relative)
 
-            if entry_path.is_dir():
-                yield from self.walk(relative_path)
-            else:
-                yield str(relative_path), entry.stat().st_mtime
+        if listing and listing[0] == mtime:
+            _, filenames, subdirectories = listing
+            for filename in filenames:
+                try:
+                    yield filename, os.stat(os.path.join(base_path, filename)).st_mtime
+                except FileNotFoundError:
+                    pass
+
+        else:
+            filenames: List[str] = []
+            subdirectories: List[str] = []
+
+            for entry in os.scandir(directory):
+                name = os.path.join(relative, entry.name) if relative else entry.name
+
+                if entry.is_dir():
+                    if not self.is_ignored(name + os.sep):
+                        subdirectories.append(name)
+                elif not self.is_ignored(name):
+                    filenames.append(name)
+                    yield name, entry.stat().st_mtime
+
+            # Entries added in the same timestamp tick wouldn't bump the mtime.
+            if time.time_ns() - mtime > RACY_LISTING_NS:
+                self.listings[relative] = mtime, filenames, subdirectories
+
+        for subdirectory in subdirectories:
+            yield from self.walk(subdirectory)
 
 
 def detect_repeated_changes(
@@ -14,6 +14,7 @@ __all__ = [
     "NamespaceFileScope",
     "NamespaceContainer",
     "NamespacePin",
+    "ScopeResolver",
     "NamespaceProxy",
     "NamespaceProxyDescriptor",
     "MergeCallback",
@@ -29,19 +30,22 @@ __all__ = [
 ]
 
 
+import os
 import shutil
-from collections import defaultdict
-from contextlib import nullcontext
-from copy import deepcopy
+from collections import defaultdict, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from copy import copy, deepcopy
 from dataclasses import dataclass, field
 from functools import partial
 from itertools import count
-from pathlib import Path, PurePath, PurePosixPath
+from pathlib import Path, PurePath
 from typing import (
     Any,
     Callable,
     ClassVar,
     DefaultDict,
+    Deque,
     Dict,
     Generic,
     Iterable,
@@ -62,7 +66,7 @@ from typing import (
     get_origin,
     overload,
 )
-from zipfile import ZIP_BZIP2, ZIP_DEFLATED, ZIP_LZMA, ZIP_STORED, ZipFile
+from zipfile import ZIP_BZIP2, ZIP_DEFLATED, ZIP_LZMA, ZIP_STORED, ZipFile, ZipInfo
 
 from typing_extensions import Self
 
@@ -75,12 +79,16 @@ from beet.core.container import (
     Pin,
     SupportsMerge,
 )
-from beet.core.file import File, FileOrigin, JsonFile, PngFile
+from beet.core.file import BlobStore, File, FileOrigin, JsonFile, PngFile
 from beet.core.utils import (
     FileSystemPath,
     JsonDict,
     SupportedFormats,
     TextComponent,
+    clone_file,
+    compress_zip_entry,
+    get_zip_stamp,
+    write_zip_entry,
 )
 from beet.resources.pack_format_registry import PackFormatRegistryContainer
 from beet.toolchain.config import FormatSpecifier
@@ -157,7 +165,12 @@ class NamespaceFile(Protocol):
     def copy(self: T) -> T: ...
 
     @classmethod
-    def load(cls: Type[T], origin: FileOrigin, path: FileSystemPath) -> T: ...
+    def load(
+        cls: Type[T],
+        origin: FileOrigin,
+        path: FileSystemPath,
+        source_stamp: Optional[Tuple[int, int]] = None,
+    ) -> T: ...
 
     def dump(self, origin: FileOrigin, path: FileSystemPath): ...
 
@@ -436,6 +449,59 @@ class NamespacePin(Pin[Type[NamespaceFileType], NamespaceContainer[NamespaceFile
     """Descriptor for accessing namespace containers by attribute lookup."""
 
 
+class ScopeResolver:
+    """Trie that resolves the file type and key of namespace file paths."""
+
+    children: Dict[str, "ScopeResolver"]
+    extensions: Dict[str, Type[NamespaceFile]]
+
+    def __init__(
+        self,
+        scope_map: Optional[
+            Mapping[Tuple[Tuple[str, ...], str], Type[NamespaceFile]]
+        ] = None,
+    ):
+        self.children = {}
+        self.extensions = {}
+
+        if scope_map is None:
+            scope_map = {}
+
+        for (scope, extension), file_type in scope_map.items():
+            node = self
+            for part in scope:
+                if (child := node.children.get(part)) is None:
+                    child = node.children[part] = ScopeResolver()
+                node = child
+            node.extensions[extension] = file_type
+
+    def resolve(
+        self,
+        scope: Sequence[str],
+        basename: str,
+    ) -> Optional[Tuple[Type[NamespaceFile], str]]:
+        """Return the file type and the key of the file at the given scope."""
+        nodes: List[ScopeResolver] = [self]
+        for part in scope:
+            if (child := nodes[-1].children.get(part)) is None:
+                break
+            nodes.append(child)
+
+        extensions = None
+
+        for depth in range(len(nodes) - 1, -1, -1):
+            if not (table := nodes[depth].extensions):
+                continue
+            if extensions is None:
+                extensions = list_extensions(basename)
+            for extension in extensions:
+                if file_type := table.get(extension):
+                    stem = basename[: len(basename) - len(extension)]
+                    return file_type, "/".join([*scope[depth:], stem])
+
+        return None
+
+
 class Namespace(
     MergeMixin,
     Container[Type[NamespaceFile], NamespaceContainer[NamespaceFile]],
@@ -449,6 +515,9 @@ class Namespace(
     directory: ClassVar[str]
     field_map: ClassVar[Mapping[Type[NamespaceFile], str]]
     scope_map: ClassVar[Mapping[Tuple[Tuple[str, ...], str], Type[NamespaceFile]]]
+    scope_resolvers: ClassVar[
+        Dict[Tuple[Type[NamespaceFile], ...], Tuple[Any, ScopeResolver]]
+    ]
 
     def __init_subclass__(cls):
         pins = NamespacePin[NamespaceFile].collect_from(cls)
@@ -458,6 +527,27 @@ class Namespace(
             for pin in pins.values()
             for scope in list_input_scopes(pin.key.scope)
         }
+        cls.scope_resolvers = {}
+
+    @classmethod
+    def get_scope_resolver(
+        cls,
+        extend_namespace: Iterable[Type[NamespaceFile]] = (),
+    ) -> ScopeResolver:
+        """Return the compiled scope resolver for the given namespace extensions."""
+        key = tuple(extend_namespace)
+
+        if (cached := cls.scope_resolvers.get(key)) and cached[0] is cls.scope_map:
+            return cached[1]
+
+        scope_map = dict(cls.scope_map)
+        for file_type in key:
+            for scope in list_input_scopes(file_type.scope):
+                scope_map[scope, file_type.extension] = file_type
+
+        resolver = ScopeResolver(scope_map)
+        cls.scope_resolvers[key] = cls.scope_map, resolver
+        return resolver
 
     def __init__(self):
         super().__init__()
@@ -604,8 +694,20 @@ class Namespace(
         overlay_name: Optional[str] = None,
         extend_namespace: Iterable[Type[NamespaceFile]] = (),
         extend_namespace_extra: Optional[Mapping[str, Optional[Type[PackFile]]]] = None,
+        executor: Optional[Executor] = None,
+        stats: Optional[Mapping[PurePath, os.stat_result]] = None,
+        source_stamp: Optional[Tuple[int, int]] = None,
     ) -> Iterator[Tuple[str, "Namespace"]]:
-        """Load namespaces by walking through a zipfile or directory."""
+        """Load namespaces by walking through a zipfile or directory.
+
+        When an executor is provided, the files are loaded in parallel. The
+        namespace is only yielded once all its files are available, and files
+        are inserted in the same order as when loading them sequentially.
+
+        The stats map the filenames that were already found in the directory
+        index, which lets the files skip the existence check. The source stamp of
+        zipfile origins is forwarded to the loaded files.
+        """
         preparts = tuple(filter(None, prefix.split("/")))
         if preparts and preparts[0] != (
             cls.directory if overlay_name is None else overlay_name
@@ -616,14 +718,38 @@ class Namespace(
         if extend_namespace_extra:
             _update_with_none(extra_info, extend_namespace_extra)
 
-        scope_map = dict(cls.scope_map)
-        for file_type in extend_namespace:
-            for scope in list_input_scopes(file_type.scope):
-                scope_map[scope, file_type.extension] = file_type
+        resolver = cls.get_scope_resolver(extend_namespace)
 
         name = None
         namespace = None
 
+        pending: List[Tuple[MutableMapping[str, Any], str, Future[Any]]] = []
+
+        def load(
+            container: MutableMapping[str, Any],
+            key: str,
+            file_type: Union[Type[PackFile], Type[NamespaceFile]],
+            filename: PurePath,
+        ):
+            if stats and filename in stats:
+                path = Path(origin, filename)  # pyright: ignore[reportArgumentType]
+                if not pending:
+                    container[key] = file_type(source_path=path)
+                    return
+                future: Future[Any] = Future()
+                future.set_result(file_type(source_path=path))
+                pending.append((container, key, future))
+            elif executor is None:
+                container[key] = file_type.load(origin, filename, source_stamp)
+            else:
+                future = executor.submit(file_type.load, origin, filename, source_stamp)
+                pending.append((container, key, future))
+
+        def flush():
+            for container, key, future in pending:
+                container[key] = future.result()
+            pending.clear()
+
         for filename in filenames:
             parts = preparts + filename.parts
 
@@ -643,33 +769,22 @@ class Namespace(
             if directory != cls.directory:
                 continue
             if name != namespace_dir:
+                flush()
                 if name and namespace:
                     yield name, namespace
                 name, namespace = namespace_dir, cls()
 
             assert name and namespace is not None
-            extensions = list_extensions(PurePosixPath(basename))
 
             if file_type := extra_info.get(path := "/".join(scope + [basename])):
-                namespace.extra[path] = file_type.load(origin, filename)
+                load(namespace.extra, path, file_type, filename)
                 continue
 
-            file_dir: List[str] = []
+            if resolved := resolver.resolve(scope, basename):
+                file_type, key = resolved
+                load(namespace[file_type], key, file_type, filename)
 
-            while True:
-                path = tuple(scope)
-                for extension in extensions:
-                    if file_type := scope_map.get((path, extension)):
-                        key = "/".join(
-                            file_dir + [basename[: len(basename) - len(extension)]]
-                        )
-                        namespace[file_type][key] = file_type.load(origin, filename)
-                        break
-                else:
-                    if scope:
-                        file_dir.insert(0, scope.pop())
-                        continue
-                break
+        flush()
 
         if name and namespace:
             yield name, namespace
@@ -703,6 +818,27 @@ class NamespaceProxy(
     def join_key(self, key1: str, key2: str) -> str:
         return f"{key1}:{key2}"
 
+    def match_prefixes(self, prefixes: Tuple[str, ...]) -> Iterable[str]:
+        keys: List[str] = []
+
+        for prefix in prefixes:
+            namespace, separator, file_path = prefix.partition(":")
+
+            if separator:
+                if namespace in self.proxy:
+                    container = self.proxy[namespace][self.proxy_key]
+                    keys.extend(
+                        f"{namespace}:{key}"
+                        for key in container.keys_with_prefix(file_path)  # pyright: ignore[reportAttributeAccessIssue]
+                    )
+                continue
+
+            for key1, mapping in self.proxy.items():
+                if key1.startswith(namespace):
+                    keys.extend(f"{key1}:{key2}" for key2 in mapping[self.proxy_key])
+
+        return keys
+
     def setdefault(
         self,
         key: str,
@@ -1037,6 +1173,7 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
 
     merge_policy: MergePolicy
     unveiled: Dict[Union[Path, UnveilMapping], Set[str]]
+    mount_executor: Optional[Executor]
 
     namespace_type: ClassVar[Type[Namespace]]
     default_name: ClassVar[str]
@@ -1093,6 +1230,7 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
             self.merge_policy.extend(merge_policy)
 
         self.unveiled = {}
+        self.mount_executor = None
 
         if mcmeta is not None:
             self.mcmeta = mcmeta
@@ -1513,15 +1651,34 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
         if not self.description:
             self.description = ""
 
+    @contextmanager
+    def parallel_mount(self, max_workers: Optional[int] = None):
+        """Index mounted directories and load zipped files on multiple threads."""
+        with ThreadPoolExecutor(max_workers) as executor:
+            previous_executor = self.mount_executor
+            self.mount_executor = executor
+            try:
+                yield self
+            finally:
+                self.mount_executor = previous_executor
+
     def mount(
         self,
         prefix: str,
         origin: FileOrigin,
         origin_folders: Optional[Dict[str, List[PurePath]]] = None,
-    ):
-        """Mount files from a zipfile or from the filesystem."""
+        origin_stats: Optional[Dict[PurePath, os.stat_result]] = None,
+        origin_stamp: Optional[Tuple[int, int]] = None,
+    ) -> List[PackFile]:
+        """Mount files from a zipfile or from the filesystem.
+
+        Return the files that were loaded from the origin.
+        """
         files: Dict[str, PackFile] = {}
 
+        if origin_stamp is None and isinstance(origin, ZipFile):
+            origin_stamp = get_zip_stamp(origin)
+
         for expected_filename, file_type in self.resolve_extra_info().items():
             filename = (
                 expected_filename
@@ -1529,19 +1686,27 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
                 else f"{self.overlay_name}/{expected_filename}"
             )
             if not prefix:
-                if loaded := file_type.try_load(origin, filename):
+                if loaded := file_type.try_load(origin, filename, origin_stamp):
                     files[expected_filename] = loaded
             elif prefix == filename:
-                if loaded := file_type.try_load(origin, ""):
+                if loaded := file_type.try_load(origin, "", origin_stamp):
                     files[expected_filename] = loaded
             elif filename.startswith(prefix + "/"):
-                if loaded := file_type.try_load(origin, filename[len(prefix) + 1 :]):
+                path = filename[len(prefix) + 1 :]
+                if loaded := file_type.try_load(origin, path, origin_stamp):
                     files[expected_filename] = loaded
 
         self.extra.merge(files)
 
+        executor = (
+            self.mount_executor
+            if self.overlay_parent is None
+            else self.overlay_parent.mount_executor
+        )
+
         if origin_folders is None:
-            origin_folders = list_origin_folders(prefix, origin)
+            origin_stats = {}
+            origin_folders = list_origin_folders(prefix, origin, origin_stats, executor)
 
         scan_folder = (
             self.namespace_type.directory
@@ -1558,9 +1723,17 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
                 self.overlay_name,
                 self.extend_namespace,
                 self.extend_namespace_extra,
+                executor,
+                origin_stats,
+                origin_stamp,
             )
         }
 
+        mounted: List[PackFile] = list(files.values())
+        for namespace in namespaces.values():
+            mounted.extend(namespace.extra.values())
+            mounted.extend(item for _, item in namespace.content)  # pyright: ignore[reportArgumentType]
+
         self.merge(namespaces)  # pyright: ignore[reportArgumentType]
 
         if self.overlay_parent is None:
@@ -1578,17 +1751,23 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
                         overlay.supported_formats = x
                     overlay.extend_namespace = self.extend_namespace
                     overlay.extend_namespace_extra = self.extend_namespace_extra
-                    overlay.mount(prefix, origin, origin_folders)
+                    mounted += overlay.mount(
+                        prefix, origin, origin_folders, origin_stats, origin_stamp
+                    )
 
             remaining_overlays = list(origin_folders)
             for name in remaining_overlays:
                 overlay = self.overlays[name]
                 overlay.extend_namespace = self.extend_namespace
                 overlay.extend_namespace_extra = self.extend_namespace_extra
-                overlay.mount(prefix, origin, origin_folders)
+                mounted += overlay.mount(
+                    prefix, origin, origin_folders, origin_stats, origin_stamp
+                )
                 if not overlay:
                     del self.overlays[name]
 
+        return mounted
+
     def unveil(self, prefix: str, origin: Union[FileSystemPath, UnveilMapping]) -> bool:
         """Track mounted resource prefix."""
         if not isinstance(origin, UnveilMapping):
@@ -1610,6 +1789,14 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
         mounted.add(prefix)
         return True
 
+    def deduplicate(self, blobs: Optional[BlobStore] = None) -> BlobStore:
+        """Share the buffers of files with identical serialized content."""
+        if blobs is None:
+            blobs = BlobStore()
+        for _, item in self.list_files():
+            item.share_content(blobs)
+        return blobs
+
     def dump(self, origin: FileOrigin):
         """Write the content of the pack to a zipfile or to the filesystem"""
         _dump_files(origin, self.list_files())
@@ -1622,8 +1809,31 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
         compression: Optional[Literal["none", "deflate", "bzip2", "lzma"]] = None,
         compression_level: Optional[int] = None,
         overwrite: Optional[bool] = False,
+        checksums: Optional[MutableMapping[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        blobs: Optional[BlobStore] = None,
     ) -> Path:
-        """Save the pack at the specified location."""
+        """Save the pack at the specified location.
+
+        When saving to a directory, the checksums mapping is used to only
+        write files that changed since the previous save. The mapping is keyed
+        by output path, updated in place, and should be provided again on the
+        next save. Files that were modified externally are written again, and
+        any file that isn't part of the pack is removed from the output
+        directory. Unloaded source files are only hashed when their stat
+        changed.
+
+        When saving to a zipfile, providing an executor compresses the files
+        in parallel. The entries are written in the same order and with the same
+        headers as when saving serially.
+
+        Providing a blob store deduplicates identical payloads. In zipfiles,
+        identical payloads are only compressed once. In directories, subsequent
+        occurrences are created as copy-on-write clones of the first one when the
+        filesystem supports reflinks, and written normally otherwise. The number
+        of bytes that didn't need to be compressed or written again is accumulated
+        in the blob store.
+        """
         if path:
             path = Path(path).resolve()
             self.zipped = path.suffix == ".zip"
@@ -1661,12 +1871,14 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
                     break
 
         output_path = self.path / f"{self.name}{suffix}"
+        incremental = checksums is not None and not self.zipped
 
         if output_path.exists():
             if not overwrite:
                 raise PackOverwrite(output_path)
             if output_path.is_dir():
-                shutil.rmtree(output_path)
+                if not incremental:
+                    shutil.rmtree(output_path)
             else:
                 output_path.unlink()
 
@@ -1675,8 +1887,21 @@ class Pack(MatchMixin, MergeMixin, Container[str, NamespaceType]):
         else:
             output_path.mkdir(parents=True, exist_ok=True)
 
-        with factory(output_path) as pack:
-            self.dump(pack)
+        if incremental:
+            assert checksums is not None
+            _dump_files_incremental(
+                output_path,
+                self.list_files(),
+                checksums.setdefault(str(output_path), {}),
+            )
+        elif self.zipped and (executor or blobs):
+            with factory(output_path) as pack:
+                _dump_zip_entries(pack, self.list_files(), executor, blobs)
+        elif blobs:
+            _dump_files_deduplicated(output_path, self.list_files(), blobs)
+        else:
+            with factory(output_path) as pack:
+                self.dump(pack)
 
         return output_path
 
@@ -1701,6 +1926,162 @@ def _dump_files(origin: FileOrigin, files: Iterable[Tuple[str, PackFile]]):
             f.dump(origin, "/".join(directory + (filename,)))
 
 
+ZIP_DUMP_WINDOW = 64
+
+
+def _dump_zip_entries(
+    origin: ZipFile,
+    files: Iterable[Tuple[str, PackFile]],
+    executor: Optional[Executor] = None,
+    blobs: Optional[BlobStore] = None,
+):
+    def dump_entry(
+        full_path: str,
+        item: PackFile,
+        data: Optional[bytes] = None,
+    ) -> Tuple[ZipInfo, bytes]:
+        if data is None and (entry := item.raw_zip_entry(origin, full_path)):
+            return entry
+        zinfo = item.zip_info(origin, full_path)
+        if data is not None:
+            return compress_zip_entry(zinfo, data, origin.compresslevel)
+        with item.view() as view:
+            return compress_zip_entry(zinfo, view, origin.compresslevel)
+
+    def submit(*args: Any) -> Future[Tuple[ZipInfo, bytes]]:
+        if executor:
+            return executor.submit(dump_entry, *args)
+        future: Future[Tuple[ZipInfo, bytes]] = Future()
+        future.set_result(dump_entry(*args))
+        return future
+
+    keyed: List[Tuple[str, PackFile, Optional[str]]] = []
+    remaining: Dict[str, int] = {}
+
+    for full_path, item in files:
+        key = None
+        if blobs is not None:
+            key, _ = item.dump_digest()
+            remaining[key] = remaining.get(key, 0) + 1
+        keyed.append((full_path, item, key))
+
+    shared: Dict[str, Future[Tuple[ZipInfo, bytes]]] = {}
+    pending: Deque[
+        Tuple[str, PackFile, Optional[str], bool, Future[Tuple[ZipInfo, bytes]]]
+    ] = deque()
+
+    def write_next():
+        full_path, item, key, duplicate, future = pending.popleft()
+        entry, data = future.result()
+
+        if duplicate:
+            zinfo = item.zip_info(origin, full_path)
+            zinfo.flag_bits = entry.flag_bits
+            zinfo.file_size = entry.file_size
+            zinfo.compress_size = entry.compress_size
+            zinfo.CRC = entry.CRC
+            entry = zinfo
+            if blobs is not None:
+                blobs.deduplicated += entry.file_size
+
+        write_zip_entry(origin, entry, data)
+
+        if key is not None:
+            remaining[key] -= 1
+            if not remaining[key]:
+                shared.pop(key, None)
+
+    for full_path, item, key in keyed:
+        if key is not None and (future := shared.get(key)):
+            pending.append((full_path, item, key, True, future))
+        else:
+            data = None
+            if key is not None:
+                _, data = item.dump_digest()
+            future = submit(full_path, item, data)
+            if key is not None and remaining[key] > 1:
+                shared[key] = future
+            pending.append((full_path, item, key, False, future))
+
+        if len(pending) >= ZIP_DUMP_WINDOW:
+            write_next()
+
+    while pending:
+        write_next()
+
+
+def _dump_files_deduplicated(
+    directory: Path,
+    files: Iterable[Tuple[str, PackFile]],
+    blobs: BlobStore,
+):
+    written: Dict[str, Path] = {}
+    parents: Set[Path] = set()
+
+    for full_path, item in files:
+        path = directory / full_path
+
+        if path.parent not in parents:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            parents.add(path.parent)
+
+        key, data = item.dump_digest()
+
+        if (target := written.get(key)) and clone_file(target, path):
+            blobs.deduplicated += path.stat().st_size
+            continue
+
+        written.setdefault(key, path)
+
+        if data is None:
+            item.dump(directory, full_path)
+        else:
+            path.write_bytes(data)
+
+
+def _dump_files_incremental(
+    directory: Path,
+    files: Iterable[Tuple[str, PackFile]],
+    checksums: MutableMapping[str, Any],
+):
+    previous = dict(checksums)
+    checksums.clear()
+
+    for full_path, item in files:
+        path = directory / full_path
+        entry = previous.get(full_path)
+
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        stamp = None
+        if stat := item.source_stat():
+            stamp = [stat.st_size, stat.st_mtime_ns]
+            if entry and entry[1:] == [mtime, stamp]:
+                checksums[full_path] = entry
+                continue
+
+        checksum = item.checksum()
+
+        if mtime is None or not entry or entry[:2] != [checksum, mtime]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            item.dump(directory, full_path)
+            mtime = path.stat().st_mtime_ns
+
+        checksums[full_path] = [checksum, mtime, stamp]
+
+    for root, dirs, filenames in os.walk(directory, topdown=False):
+        parent = Path(root)
+        for filename in filenames:
+            path = parent / filename
+            if path.relative_to(directory).as_posix() not in checksums:
+                path.unlink()
+        if parent != directory and not any(parent.iterdir()):
+            parent.rmdir()
+
+
 K = TypeVar("K")
 V = TypeVar("V")
 
@@ -1,5 +1,6 @@
 __all__ = [
     "list_files",
+    "index_directory",
     "list_origin",
     "list_origin_folders",
     "list_extensions",
@@ -7,9 +8,10 @@ __all__ = [
 
 
 import os
-from itertools import accumulate
+import stat
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
 from pathlib import Path, PurePath, PurePosixPath
-from typing import Dict, Iterator, List, Mapping
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
 from zipfile import ZipFile
 
 from beet.core.file import FileOrigin
@@ -22,7 +24,85 @@ def list_files(directory: FileSystemPath) -> Iterator[Path]:
             yield Path(root, filename).relative_to(directory)
 
 
-def list_origin(origin: FileOrigin) -> List[PurePath]:
+DirectoryEntry = Tuple[str, str, Optional[os.stat_result]]
+
+
+def index_directory(
+    directory: FileSystemPath,
+    executor: Optional[Executor] = None,
+) -> Dict[PurePath, os.stat_result]:
+    root = os.fspath(directory)
+    index: Dict[PurePath, os.stat_result] = {}
+
+    if executor is None:
+        _index_directory(index, "", root)
+        return index
+
+    scanned: Dict[str, List[DirectoryEntry]] = {}
+    pending = {executor.submit(_scan_directory, root): ""}
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            prefix = pending.pop(future)
+            scanned[prefix] = entries = future.result()
+            for name, path, st in entries:
+                if st is None:
+                    pending[executor.submit(_scan_directory, path)] = f"{prefix}{name}/"
+
+    _collect_directory(index, "", scanned)
+    return index
+
+
+def _scan_directory(path: str) -> List[DirectoryEntry]:
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+    result: List[DirectoryEntry] = []
+
+    for entry in entries:
+        if entry.is_dir():
+            if not entry.is_symlink():
+                result.append((entry.name, entry.path, None))
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            result.append((entry.name, entry.path, st))
+
+    return result
+
+
+def _index_directory(index: Dict[PurePath, os.stat_result], prefix: str, path: str):
+    for name, entry_path, st in _scan_directory(path):
+        if st is None:
+            _index_directory(index, f"{prefix}{name}/", entry_path)
+        else:
+            index[PurePosixPath(prefix + name)] = st
+
+
+def _collect_directory(
+    index: Dict[PurePath, os.stat_result],
+    prefix: str,
+    scanned: Dict[str, List[DirectoryEntry]],
+):
+    for name, _, st in scanned[prefix]:
+        if st is None:
+            _collect_directory(index, f"{prefix}{name}/", scanned)
+        else:
+            index[PurePosixPath(prefix + name)] = st
+
+
+def list_origin(
+    origin: FileOrigin,
+    stats: Optional[Dict[PurePath, os.stat_result]] = None,
+    executor: Optional[Executor] = None,
+) -> List[PurePath]:
     if isinstance(origin, ZipFile):
         filenames = (
             PurePosixPath(file_info.filename)
@@ -34,11 +114,19 @@ def list_origin(origin: FileOrigin) -> List[PurePath]:
     elif Path(origin).is_file():
         filenames = [PurePosixPath()]
     else:
-        filenames = list_files(origin)
+        index = index_directory(origin, executor)
+        if stats is not None:
+            stats.update(index)
+        return list(index)
     return sorted(filenames)
 
 
-def list_origin_folders(prefix: str, origin: FileOrigin) -> Dict[str, List[PurePath]]:
+def list_origin_folders(
+    prefix: str,
+    origin: FileOrigin,
+    stats: Optional[Dict[PurePath, os.stat_result]] = None,
+    executor: Optional[Executor] = None,
+) -> Dict[str, List[PurePath]]:
     preparts = tuple(filter(None, prefix.split("/")))
 
     folders: Dict[str, List[PurePath]] = {}
@@ -46,7 +134,7 @@ def list_origin_folders(prefix: str, origin: FileOrigin) -> Dict[str, List[PureP
     current_name = ""
     current_folder: List[PurePath] = []
 
-    for filename in list_origin(origin):
+    for filename in list_origin(origin, stats, executor):
         parts = preparts + filename.parts
 
         if len(parts) > 1:
@@ -63,10 +151,9 @@ def list_origin_folders(prefix: str, origin: FileOrigin) -> Dict[str, List[PureP
     return folders
 
 
-def list_extensions(path: PurePath) -> List[str]:
-    extensions: List[str] = list(
-        accumulate(reversed(path.suffixes), lambda a, b: b + a)
-    )
-    extensions.reverse()
+def list_extensions(path: Union[PurePath, str]) -> List[str]:
+    name = path if isinstance(path, str) else path.name
+    suffixes = [] if name.endswith(".") else name.lstrip(".").split(".")[1:]
+    extensions = ["." + ".".join(suffixes[i:]) for i in range(len(suffixes))]
     extensions.append("")
     return extensions
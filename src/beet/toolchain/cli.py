@@ -25,6 +25,7 @@ from beet.core.error import BeetException, WrappedException
 from beet.core.utils import format_exc
 
 from .project import Project
+from .worker import WorkerError
 
 
 def format_error(
@@ -52,6 +53,8 @@ def error_handler(should_exit: bool = False, format_padding: int = 0) -> Iterato
         message = str(exc)
         if not exc.hide_wrapped_exception:
             exception = exc.__cause__
+            if isinstance(exc, WorkerError) and exc.remote_traceback:
+                exception = exc.remote_traceback
     except BeetException as exc:
         message = str(exc)
     except (click.Abort, KeyboardInterrupt):
@@ -1,5 +1,5 @@
 import time
-from typing import Optional, Sequence
+from typing import Literal, Optional, Sequence
 
 import click
 
@@ -72,11 +72,18 @@ def build(
     default=0.6,
     help="Configure the polling interval.",
 )
+@click.option(
+    "-b",
+    "--backend",
+    type=click.Choice(["auto", "inotify", "poll"]),
+    help="Configure how file changes are detected.",
+)
 def watch(
     project: Project,
     reload: bool,
     link: Optional[str],
     interval: float,
+    backend: Optional[Literal["auto", "inotify", "poll"]],
 ):
     """Watch the project directory and build on file changes."""
     text = "Linking and watching project..." if link else "Watching project..."
@@ -84,7 +91,7 @@ def watch(
         if link:
             click.echo(project.link(world=link))
 
-        for changes in project.watch(interval):
+        for changes in project.watch(interval, backend):
             filename, action = next(iter(changes.items()))
 
             text = (
@@ -39,7 +39,7 @@ from typing import (
 
 from pydantic import BaseModel, ValidationError, ConfigDict
 
-from beet.core.cache import Cache, MultiCache
+from beet.core.cache import Cache, LoadCache, MultiCache
 from beet.core.container import Container
 from beet.core.error import BubbleException, WrappedException
 from beet.core.utils import (
@@ -141,9 +141,14 @@ class ProjectCache(MultiCache[Cache]):
     The `generated` attribute is a MultiCache instance that's
     meant to be tracked by version control, unlike the main project
     cache that usually lives in the ignored `.beet_cache` directory.
+    It always keeps its index in json regardless of the cache type.
+
+    The `load_cache` attribute is a LoadCache instance that keeps the content
+    of loaded files across builds.
     """
 
     generated: MultiCache[Cache]
+    load_cache: LoadCache
 
     def __init__(
         self,
@@ -153,18 +158,28 @@ class ProjectCache(MultiCache[Cache]):
         gitignore: bool = True,
         cache_type: Type[Cache] = Cache,
     ):
-        super().__init__(directory, default_cache, gitignore, cache_type=Cache)
+        super().__init__(directory, default_cache, gitignore, cache_type=cache_type)
         self.generated = MultiCache(
             generated_directory,
             default_cache,
             gitignore=False,
-            cache_type=cache_type,
         )
+        self.load_cache = LoadCache(self.path / "load.sqlite")
+
+    def clear(self):
+        super().clear()
+        self.load_cache.clear()
 
     def flush(self):
+        self.load_cache.flush()
         super().flush()
         self.generated.flush()
 
+    def close(self):
+        super().close()
+        self.generated.close()
+        self.load_cache.close()
+
 
 @dataclass(eq=False, frozen=True)
 class Context:
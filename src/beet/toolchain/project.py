@@ -1,34 +1,61 @@
 __all__ = [
     "Project",
     "ProjectBuilder",
+    "IndependentSubprojects",
+    "SubprojectError",
+    "CacheOptions",
+    "WorkerOptions",
+    "SubprojectOptions",
 ]
 
 
+import hashlib
 import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import ExitStack, contextmanager
 from copy import deepcopy
 from dataclasses import dataclass
 from importlib.metadata import entry_points
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, ClassVar, Iterable, Iterator, List, Optional, Sequence
+from typing import (
+    Any,
+    ClassVar,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
 from beet.contrib.autosave import Autosave
 from beet.contrib.json_reporter import JsonReporter
 from beet.contrib.link import LinkManager
-from beet.contrib.load import load
-from beet.contrib.output import output
+from beet.contrib.load import LoadOptions, load
+from beet.contrib.output import OutputOptions, output
 from beet.contrib.render import render
+from beet.core.cache import Cache, SqliteCache
+from beet.core.error import BubbleException, WrappedException
 from beet.core.utils import (
     FileSystemPath,
     JsonDict,
     change_directory,
+    format_exc,
     intersperse,
     log_time_scope,
     normalize_string,
+    time_logger,
 )
 from beet.core.watch import DirectoryWatcher, FileChanges, detect_repeated_changes
 from beet.library.base import LATEST_MINECRAFT_VERSION, Mcmeta
+from beet.library.data_pack import DataPack
+from beet.library.resource_pack import ResourcePack
 
 from .config import (
     PackConfig,
@@ -36,9 +63,53 @@ from .config import (
     load_config,
     locate_config,
 )
-from .context import Context, PluginSpec, ProjectCache
+from .context import Context, PluginOptions, PluginSpec, ProjectCache
 from .template import TemplateManager
-from .worker import WorkerPool
+from .worker import WORKER_START_METHOD, RemoteTraceback, WorkerPool
+
+
+class CacheOptions(PluginOptions):
+    index: Literal["json", "sqlite"] = "json"
+
+
+class WorkerOptions(PluginOptions):
+    process: bool = False
+
+
+class WatchOptions(PluginOptions):
+    backend: Literal["auto", "inotify", "poll"] = "poll"
+
+
+class SubprojectOptions(PluginOptions):
+    independent: bool = False
+    max_workers: Optional[int] = None
+
+
+class SubprojectError(WrappedException):
+    """Raised when an independent subproject fails to build.
+
+    The formatted traceback of the original exception is available as
+    `remote_traceback` unless the exception was meant to bubble up.
+    """
+
+    name: str
+    message: str
+    remote_traceback: Optional[str]
+
+    def __init__(
+        self,
+        name: str,
+        message: str = "",
+        remote_traceback: Optional[str] = None,
+    ):
+        super().__init__(name, message, remote_traceback)
+        self.name = name
+        self.message = message
+        self.remote_traceback = remote_traceback
+        self.hide_wrapped_exception = not remote_traceback
+
+    def __str__(self) -> str:
+        return self.message or f'Subproject "{self.name}" raised an exception.'
 
 
 @dataclass
@@ -94,9 +165,12 @@ class Project:
         else:
             cache_directory = self.directory / self.cache_name
 
+        cache_opts = CacheOptions.model_validate(self.config.meta.get("cache", {}))
+
         self.resolved_cache = ProjectCache(
             directory=cache_directory,
             generated_directory=self.directory / "generated",
+            cache_type=SqliteCache if cache_opts.index == "sqlite" else Cache,
         )
 
         return self.resolved_cache
@@ -123,7 +197,8 @@ class Project:
     def worker_pool(self):
         if self.resolved_worker_pool is not None:
             return self.resolved_worker_pool
-        self.resolved_worker_pool = WorkerPool()
+        worker_opts = WorkerOptions.model_validate(self.config.meta.get("worker", {}))
+        self.resolved_worker_pool = WorkerPool(process=worker_opts.process)
         return self.resolved_worker_pool
 
     def reset(self):
@@ -143,10 +218,21 @@ class Project:
                 json_reporter = ctx.inject(JsonReporter)
                 return json_reporter.data
 
-    def watch(self, interval: float = 0.6) -> Iterator[FileChanges]:
-        """Watch the project."""
+    def watch(
+        self,
+        interval: float = 0.6,
+        backend: Optional[Literal["auto", "inotify", "poll"]] = None,
+    ) -> Iterator[FileChanges]:
+        """Watch the project.
+
+        The backend defaults to the `meta.watch.backend` option.
+        """
         watch_logger = logging.getLogger("watch")
 
+        if backend is None:
+            watch_opts = WatchOptions.model_validate(self.config.meta.get("watch", {}))
+            backend = watch_opts.backend
+
         watcher = DirectoryWatcher(
             self.directory,
             interval,
@@ -159,6 +245,7 @@ class Project:
                 ".*",
                 *self.ignore,
             ],
+            backend=backend,
         )
         watcher = detect_repeated_changes(watcher, min_interval=interval * 2)
 
@@ -287,21 +374,29 @@ class ProjectBuilder:
                 whitelist=self.config.whitelist,
             )
 
+            subproject_opts = ctx.validate("subprojects", SubprojectOptions)
+
             plugins: List[PluginSpec] = [self.bootstrap]
-            plugins.extend(
-                (
-                    item
-                    if isinstance(item, str)
-                    else ProjectBuilder(
-                        Project(
-                            resolved_config=item,
-                            resolved_cache=ctx.cache,
-                            resolved_worker_pool=self.project.worker_pool,
+
+            for index, item in enumerate(self.config.pipeline):
+                if isinstance(item, str):
+                    plugins.append(item)
+                elif not subproject_opts.independent:
+                    plugins.append(
+                        ProjectBuilder(
+                            Project(
+                                resolved_config=item,
+                                resolved_cache=ctx.cache,
+                                resolved_worker_pool=self.project.worker_pool,
+                            )
                         )
                     )
-                )
-                for item in self.config.pipeline
-            )
+                elif isinstance(group := plugins[-1], IndependentSubprojects):
+                    group.subprojects.append((index, item))
+                else:
+                    group = IndependentSubprojects(subproject_opts.max_workers)
+                    group.subprojects.append((index, item))
+                    plugins.append(group)
 
             with change_directory(tmpdir):
                 pipeline = stack.enter_context(ctx.activate())
@@ -312,7 +407,15 @@ class ProjectBuilder:
     def bootstrap(self, ctx: Context):
         """Plugin that handles the project configuration."""
         autosave = ctx.inject(Autosave)
-        autosave.add_output(output(directory=ctx.output_directory))
+        output_opts = ctx.validate("output", OutputOptions)
+        autosave.add_output(
+            output(
+                directory=ctx.output_directory,
+                incremental=output_opts.incremental,
+                zip_workers=output_opts.zip_workers,
+                deduplicate=output_opts.deduplicate,
+            )
+        )
         autosave.add_link(ctx.inject(LinkManager).autosave_handler)
 
         pack_configs = [self.config.resource_pack, self.config.data_pack]
@@ -377,10 +480,14 @@ class ProjectBuilder:
         for plugin in plugins:
             ctx.require(plugin)
 
+        load_opts = ctx.validate("load", LoadOptions)
         ctx.require(
             load(
                 resource_pack=self.config.resource_pack.load,
                 data_pack=self.config.data_pack.load,
+                cache=load_opts.cache,
+                parallel=load_opts.parallel,
+                max_workers=load_opts.max_workers,
             )
         )
 
@@ -438,3 +545,138 @@ class ProjectBuilder:
             if not child_ctx.output_directory:
                 ctx.assets.merge(child_ctx.assets)
                 ctx.data.merge(child_ctx.data)
+
+
+class IndependentSubprojects:
+    """Plugin that builds consecutive independent subprojects in separate processes.
+
+    Every subproject gets its own context, cache and worker pool in a spawned
+    process, and saves its packs in its cache directory. The saved packs are
+    merged in pipeline order, so the output doesn't depend on which subproject
+    finishes first. Logs are forwarded to the parent process.
+    """
+
+    subprojects: List[Tuple[int, ProjectConfig]]
+    max_workers: Optional[int]
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.subprojects = []
+        self.max_workers = max_workers
+
+    def __call__(self, ctx: Context):
+        context = multiprocessing.get_context(WORKER_START_METHOD)
+        log_queue = context.Queue()
+        listener = QueueListener(log_queue, SubprojectLogHandler())
+        listener.start()
+
+        try:
+            with ProcessPoolExecutor(
+                self.max_workers,
+                mp_context=context,
+                initializer=init_subproject_process,
+                initargs=(log_queue, logging.getLogger().getEffectiveLevel()),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        build_subproject,
+                        config,
+                        *self.get_cache_directories(ctx.cache, index, config),
+                        ctx.cache.cache_type,
+                    )
+                    for index, config in self.subprojects
+                ]
+
+                try:
+                    for (index, _), future in zip(self.subprojects, futures):
+                        name, elapsed, paths = future.result()
+                        time_logger.debug(
+                            'Build subproject "%s" (pipeline entry %d). (took %.2fs)',
+                            name,
+                            index,
+                            elapsed,
+                        )
+                        if paths:
+                            ctx.assets.merge(ResourcePack(path=paths[0]))
+                            ctx.data.merge(DataPack(path=paths[1]))
+                except SubprojectError as exc:
+                    if exc.remote_traceback:
+                        exc.__cause__ = RemoteTraceback(exc.remote_traceback)
+                    raise
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            listener.stop()
+
+    def get_cache_directories(
+        self,
+        cache: ProjectCache,
+        index: int,
+        config: ProjectConfig,
+    ) -> Tuple[Path, Path]:
+        """Return the cache directory and the generated directory of the subproject."""
+        key = hashlib.sha1(f"{index}:{config!r}".encode()).hexdigest()
+        return (
+            cache.path / "subprojects" / key[:16],
+            cache.generated.path / "subprojects" / key[:16],
+        )
+
+
+class SubprojectLogHandler(logging.Handler):
+    """Logging handler that dispatches records forwarded by subproject processes."""
+
+    def emit(self, record: logging.LogRecord):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def init_subproject_process(log_queue: Any, level: int):
+    """Forward the logs of the subproject process to the parent process."""
+    logger = logging.getLogger()
+    logger.handlers[:] = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+
+
+def build_subproject(
+    config: ProjectConfig,
+    cache_directory: Path,
+    generated_directory: Path,
+    cache_type: Type[Cache],
+) -> Tuple[str, float, Optional[Tuple[Path, Path]]]:
+    """Build an independent subproject and save its packs in the cache directory.
+
+    Return the name of the subproject, the build time and the path of the
+    saved resource pack and data pack. Nothing is saved when the subproject
+    has its own output directory.
+    """
+    project = Project(
+        resolved_config=config,
+        resolved_cache=ProjectCache(
+            directory=cache_directory,
+            generated_directory=generated_directory,
+            cache_type=cache_type,
+        ),
+    )
+    name = config.name or project.directory.stem
+    start = time.time()
+
+    try:
+        with ProjectBuilder(project).build() as ctx:
+            if ctx.output_directory:
+                return name, time.time() - start, None
+            packs = cache_directory / "packs"
+            paths = (
+                ctx.assets.save(path=packs / "resource_pack", overwrite=True),
+                ctx.data.save(path=packs / "data_pack", overwrite=True),
+            )
+    except WrappedException as exc:
+        if exc.hide_wrapped_exception:
+            raise SubprojectError(name, str(exc)) from None
+        raise SubprojectError(name, str(exc), format_exc(exc.__cause__)) from None
+    except BubbleException as exc:
+        raise SubprojectError(name, str(exc)) from None
+    except Exception as exc:
+        raise SubprojectError(name, remote_traceback=format_exc(exc)) from None
+
+    return name, time.time() - start, paths
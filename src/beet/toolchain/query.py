@@ -48,6 +48,7 @@ from pathspec import PathSpec
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 from pydantic import BaseModel, RootModel, field_validator, ConfigDict
 
+from beet.core.container import compile_match_patterns
 from beet.core.file import File
 from beet.library.base import NamespaceFile, Pack, create_group_map, get_output_scope
 
@@ -170,7 +171,8 @@ class PathSpecOption(RootModel[ListOption[str]]):
     def compile(patterns: ResolvedPathSpecOption) -> CompiledPathSpecOption:
         if not patterns:
             return None
-        return PathSpec.from_lines("gitwildmatch", patterns)
+        spec, _ = compile_match_patterns(tuple(patterns))
+        return spec
 
 
 ResolvedPackMatchOption = Mapping[str, Mapping[str, ResolvedPathSpecOption]]
@@ -429,6 +431,7 @@ class PreparedPackMatchQuery(Generic[PackType]):
             for group_name, pathspec in value.items():
                 if pathspec and group_name in group_map:
                     packs, file_type = group_map[group_name]
+                    patterns = self.match[prefix][group_name]
 
                     for pack in packs:
                         pack_and_overlays = [pack]
@@ -436,8 +439,11 @@ class PreparedPackMatchQuery(Generic[PackType]):
                             pack_and_overlays.extend(pack.overlays.values())
 
                         for p in pack_and_overlays:
-                            for path, file_instance in p[file_type].items():
-                                if pathspec.match_file(path):
+                            proxy = p[file_type]
+                            if not (matched := proxy.match(*patterns)):
+                                continue
+                            for path, file_instance in proxy.items():
+                                if path in matched:
                                     selected.setdefault(file_type, {}).setdefault(
                                         prefix, []
                                     ).append((p, file_instance, path))
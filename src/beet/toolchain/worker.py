@@ -1,6 +1,8 @@
 __all__ = [
     "Worker",
     "WorkerThread",
+    "WorkerProcess",
+    "RemoteTraceback",
     "WorkerError",
     "WorkerPool",
     "WorkerPoolHandle",
@@ -11,10 +13,12 @@ __all__ = [
 
 
 import logging
-from contextlib import ExitStack, contextmanager
+import multiprocessing
+from contextlib import ExitStack, contextmanager, suppress
 from dataclasses import dataclass, field
+from multiprocessing.connection import Connection as Pipe
 from queue import Queue
-from threading import Thread
+from threading import Lock, Thread
 from typing import (
     Any,
     Dict,
@@ -24,12 +28,20 @@ from typing import (
     Protocol,
     Set,
     Tuple,
+    Type,
     TypeVar,
     Union,
+    cast,
 )
 
 from beet.core.error import BubbleException, WrappedException
-from beet.core.utils import SENTINEL_OBJ, Sentinel, format_obj, pop_traceback
+from beet.core.utils import (
+    SENTINEL_OBJ,
+    Sentinel,
+    format_exc,
+    format_obj,
+    pop_traceback,
+)
 
 T = TypeVar("T")
 U = TypeVar("U")
@@ -41,6 +53,10 @@ SelfType = TypeVar("SelfType")
 logger = logging.getLogger(__name__)
 
 
+WORKER_START_METHOD = "spawn"
+WORKER_SHUTDOWN_TIMEOUT = 10.0
+
+
 class Worker(Protocol[SendType, RecvType]):
     """Protocol for detecting workers.
 
@@ -53,13 +69,23 @@ class Worker(Protocol[SendType, RecvType]):
 
 
 class WorkerError(WrappedException):
-    """Raised when a worker raises an exception."""
+    """Raised when a worker raises an exception.
+
+    When the worker runs in a process, the formatted traceback of the
+    original exception is available as `remote_traceback`.
+    """
 
     worker: Any
+    remote_traceback: Optional["RemoteTraceback"]
 
-    def __init__(self, worker: Any):
+    def __init__(
+        self,
+        worker: Any,
+        remote_traceback: Optional["RemoteTraceback"] = None,
+    ):
         super().__init__(worker)
         self.worker = worker
+        self.remote_traceback = remote_traceback
 
     def __str__(self) -> str:
         return f"Worker {format_obj(self.worker)} raised an exception."
@@ -255,12 +281,237 @@ class WorkerThread(Thread, Generic[T, U]):
         self.join()
 
 
+class RemoteTraceback(Exception):
+    """Carries the formatted traceback of an exception raised in a worker process."""
+
+    def __init__(self, tb: str):
+        super().__init__(tb)
+        self.tb = tb
+
+    def __str__(self) -> str:
+        return self.tb
+
+
+class PipeRelay:
+    """Multiplex channels over the pipe connecting a worker process."""
+
+    pipe: Pipe
+    lock: Lock
+    channels: Dict[int, Channel[Any, Any]]
+    forwarders: Dict[int, Thread]
+    halted: BaseException
+
+    def __init__(self, pipe: Pipe):
+        self.pipe = pipe
+        self.lock = Lock()
+        self.channels = {}
+        self.forwarders = {}
+        self.halted = RuntimeError("Channel forwarding halted.")
+
+    def send(self, *message: Any):
+        """Pickle a message through the pipe."""
+        with self.lock:
+            self.pipe.send(message)
+
+    def attach(self, cid: int, channel: Channel[Any, Any]):
+        """Forward the messages received by the channel through the pipe."""
+        self.channels[cid] = channel
+        forwarder = Thread(target=self.forward, args=(cid, channel), daemon=True)
+        self.forwarders[cid] = forwarder
+        forwarder.start()
+
+    def forward(self, cid: int, channel: Channel[Any, Any]):
+        while True:
+            try:
+                message = next(channel.recv_queue)
+            except StopIteration:
+                with suppress(OSError):
+                    self.send("close", cid)
+                break
+            except BaseException as exc:
+                if exc is self.halted:
+                    break
+                message = exc
+                action = "throw"
+            else:
+                action = "send"
+            try:
+                self.send(action, cid, message)
+            except Exception as exc:
+                if not channel.closed:
+                    channel.throw(exc)
+
+    def dispatch(self, action: str, cid: int, *args: Any):
+        """Deliver a message received from the pipe to its channel."""
+        channel = self.channels.get(cid)
+
+        if channel is None or channel.closed:
+            return
+        if action == "send":
+            channel.send(*args)
+        elif action == "throw":
+            channel.throw(*args)
+        elif action == "close":
+            del self.channels[cid]
+            channel.close()
+
+
+def run_worker_process(func: Worker[Any, Any], pipe: Pipe, long_lived: bool):
+    """Serve the worker in the child process until the parent shuts it down."""
+    relay = PipeRelay(pipe)
+    connection = Connection[Any, Any](long_lived=long_lived)
+    workers: Dict[int, Channel[Any, Any]] = {}
+
+    def receive():
+        try:
+            while (message := pipe.recv())[0] != "shutdown":
+                if message[0] == "open":
+                    workers[message[1]], channel = Channel.entangled_pair()
+                    relay.attach(message[1], channel)
+                    connection.send(workers[message[1]])
+                else:
+                    relay.dispatch(*message)
+        except (EOFError, OSError):
+            for channel in list(relay.channels.values()):
+                channel.close()
+        connection.close()
+
+    Thread(target=receive, daemon=True).start()
+
+    bubble: Optional[BubbleException] = None
+    cause: Optional[BaseException] = None
+    try:
+        func(connection)
+    except BubbleException as exc:
+        bubble = exc
+    except Exception as exc:
+        cause = pop_traceback(exc)
+
+    failed = None
+    if bubble or cause:
+        client = connection.current_client
+        failed = next((cid for cid, c in workers.items() if c is client), None)
+
+    for cid, channel in list(workers.items()):
+        if cid == failed:
+            channel.throw(relay.halted)
+        else:
+            channel.close()
+        relay.forwarders[cid].join()
+
+    tb = cause and RemoteTraceback(format_exc(cause))
+    try:
+        relay.send("exit", failed, bubble, cause, tb)
+    except OSError:
+        pass
+    except Exception:
+        with suppress(OSError):
+            relay.send("exit", failed, None, None, tb)
+
+
+class WorkerProcess(Generic[T, U]):
+    """The process that runs the worker.
+
+    Messages sent through the channels of the connection are pickled and
+    relayed over a pipe. Worker processes can be used as context managers.
+    When exiting the scope the process will be joined automatically.
+
+    Processes are always started with the spawn method, so the worker must be
+    an importable module-level function, and every message and exception sent
+    through the channels must be picklable. Worker processes aren't daemonic
+    and can start processes of their own. They stop serving clients when the
+    pipe to the parent breaks, and get terminated when they don't exit in
+    time after shutting down.
+    """
+
+    func: Worker[T, U]
+    connection: Connection[T, U]
+    exc: Optional[Exception]
+
+    def __init__(self, func: Worker[T, U], connection: Connection[T, U]):
+        self.func = func
+        self.connection = connection
+        self.exc = None
+
+        context = multiprocessing.get_context(WORKER_START_METHOD)
+        self.pipe, self.child_pipe = cast(Tuple[Pipe, Pipe], context.Pipe())
+        self.relay = PipeRelay(self.pipe)
+        self.process = context.Process(
+            target=run_worker_process,
+            args=(func, self.child_pipe, connection.long_lived),
+        )
+        self.dispatcher = Thread(target=self.dispatch, daemon=True)
+        self.receiver = Thread(target=self.receive, daemon=True)
+
+    def start(self):
+        self.process.start()
+        self.child_pipe.close()
+        self.dispatcher.start()
+        self.receiver.start()
+
+    def dispatch(self):
+        for cid, channel in enumerate(self.connection):
+            try:
+                self.relay.send("open", cid)
+            except OSError as exc:
+                channel.throw(exc)
+            else:
+                self.relay.attach(cid, channel)
+        for forwarder in self.relay.forwarders.values():
+            forwarder.join()
+        with suppress(OSError):
+            self.relay.send("shutdown")
+
+    def receive(self):
+        try:
+            while (message := self.pipe.recv())[0] != "exit":
+                self.relay.dispatch(*message)
+            _, cid, bubble, cause, tb = message
+            failed = [cid]
+        except (EOFError, OSError):
+            bubble, cause = None, None
+            tb = RemoteTraceback("Worker process exited unexpectedly.")
+            failed = list(self.relay.channels)
+
+        if bubble:
+            exc = bubble
+        elif cause or tb:
+            exc = WorkerError(self.func, tb)
+            exc.__cause__ = cause or tb
+        else:
+            return
+
+        self.exc = exc
+        for cid in failed:
+            if (channel := self.relay.channels.get(cid)) and not channel.closed:
+                channel.throw(exc)
+
+    def join(self, timeout: Optional[float] = None):
+        self.dispatcher.join(timeout)
+        self.process.join(WORKER_SHUTDOWN_TIMEOUT if timeout is None else timeout)
+        if self.process.is_alive():
+            logger.warning("Terminating worker process %s.", format_obj(self.func))
+            self.process.terminate()
+            self.process.join()
+        self.receiver.join()
+        self.pipe.close()
+        if self.exc:
+            raise self.exc
+
+    def __enter__(self: SelfType) -> SelfType:
+        return self
+
+    def __exit__(self, *_):
+        self.join()
+
+
 @dataclass
 class WorkerPoolHandle:
-    """Persistent handle that spawns and manages worker threads."""
+    """Persistent handle that spawns and manages worker threads or processes."""
 
     exit_stack: Optional[ExitStack]
     long_lived: bool = False
+    process: bool = False
     connections: Dict[Worker[Any, Any], Connection[Any, Any]] = field(
         default_factory=dict
     )
@@ -290,9 +541,9 @@ class WorkerPoolHandle:
 
     @contextmanager
     def spawn(self, func: Worker[T, U]) -> Iterator[Connection[T, U]]:
-        """Create a worker thread and return the connection.
+        """Create a worker thread or process and return the connection.
 
-        The thread will be joined at the end of the scope.
+        The worker will be joined at the end of the scope.
         """
         ident = format_obj(func)
         self.active_workers[ident] = func
@@ -300,10 +551,14 @@ class WorkerPoolHandle:
         connection = Connection[Any, Any](long_lived=self.long_lived)
         self.connections[func] = connection
 
+        worker_type: Type[Union[WorkerThread[T, U], WorkerProcess[T, U]]] = (
+            WorkerProcess if self.process else WorkerThread
+        )
+
         try:
-            with WorkerThread(func, connection) as thread:
+            with worker_type(func, connection) as worker:
                 with connection:
-                    thread.start()
+                    worker.start()
                     yield connection
         finally:
             del self.connections[func]
@@ -312,16 +567,24 @@ class WorkerPoolHandle:
 
 @dataclass
 class WorkerPool:
-    """Class that creates and keeps a reference to the pool handle."""
+    """Class that creates and keeps a reference to the pool handle.
+
+    Workers run in threads by default. Process pools run each worker in
+    its own long-lived process so that CPU-heavy workers don't compete
+    with the build for the GIL. Projects enable them with the
+    meta.worker.process option. See WorkerProcess for the requirements on
+    process workers.
+    """
 
     resolved_handle: Optional[WorkerPoolHandle] = None
+    process: bool = False
 
     @contextmanager
     def handle(self) -> Iterator[WorkerPoolHandle]:
         """Ensure that the pool is active and return the handle."""
         if self.resolved_handle is None:
             with ExitStack() as stack:
-                self.resolved_handle = WorkerPoolHandle(stack)
+                self.resolved_handle = WorkerPoolHandle(stack, process=self.process)
 
                 try:
                     yield self.resolved_handle
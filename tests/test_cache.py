@@ -1,7 +1,16 @@
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from threading import Thread
 from time import sleep
+from typing import Any, Callable, Dict, Iterator, List
+from urllib.request import Request
 
-from beet.core.cache import Cache, MultiCache
+import pytest
+
+from beet.core.cache import Cache, LoadCache, MultiCache, SqliteCache
+from beet.core.file import JsonFile
+from beet.toolchain.context import ProjectCache
 
 
 def test_cache(tmp_path: Path):
@@ -182,3 +191,312 @@ def test_transaction(tmp_path: Path):
             foo.json["something"] = 42
         assert "something" not in (tmp_path / "test-foo" / "index.json").read_text()
     assert "something" in (tmp_path / "test-foo" / "index.json").read_text()
+
+
+def test_load_cache(tmp_path: Path):
+    source = tmp_path / "source.json"
+    source.write_text('{"hello": "world"}')
+
+    load_cache = LoadCache(tmp_path / "load.sqlite")
+    json_file = JsonFile(source_path=source)
+    load_cache.attach(json_file)
+    assert json_file.data == {"hello": "world"}
+    assert load_cache.dirty
+    load_cache.flush()
+    assert not load_cache.dirty
+    load_cache.close()
+
+    load_cache = LoadCache(tmp_path / "load.sqlite")
+    entry = load_cache.get_entry(str(source))
+    assert entry is not None
+    [stat, raw, value] = entry
+    assert stat == load_cache.stat(source)
+    assert raw == '{"hello": "world"}'
+    assert value is not None
+
+    json_file = JsonFile(source_path=source)
+    load_cache.attach(json_file)
+    json_file.data["hello"] = "cached"
+
+    json_file = JsonFile(source_path=source)
+    load_cache.attach(json_file)
+    assert json_file.data == {"hello": "world"}
+    assert not load_cache.dirty
+
+    source.write_text('{"hello": "changed"}')
+
+    json_file = JsonFile(source_path=source)
+    load_cache.attach(json_file)
+    assert json_file.data == {"hello": "changed"}
+    assert load_cache.dirty
+
+
+def test_load_cache_attach_once(tmp_path: Path):
+    source = tmp_path / "source.json"
+    source.write_text('{"hello": "world"}')
+
+    json_file = JsonFile(source_path=source)
+    LoadCache(tmp_path / "a.sqlite").attach(json_file)
+    reader = json_file.reader
+    LoadCache(tmp_path / "b.sqlite").attach(json_file)
+    assert json_file.reader is reader
+
+
+def test_sqlite_cache(tmp_path: Path):
+    with SqliteCache(tmp_path) as cache:
+        cache.json["hello"] = "world"
+        foo = cache.get_path("foo")
+        foo.write_text("0")
+        assert cache.has_changed(foo)
+
+    assert (tmp_path / "index.sqlite").is_file()
+    assert not (tmp_path / "index.json").exists()
+
+    with SqliteCache(tmp_path) as cache:
+        assert cache.json["hello"] == "world"
+        assert cache.get_path("foo") == foo
+        assert not cache.has_changed(foo)
+
+        other = SqliteCache(tmp_path)
+        bar = other.get_path("bar")
+        bar.write_text("0")
+        assert other.has_changed(bar)
+        other.flush()
+        other.close()
+
+        cache.invalidate_changes(foo)
+
+    with SqliteCache(tmp_path) as cache:
+        assert cache.has_changed(foo)
+        assert not cache.has_changed(tmp_path / "0x1")
+
+
+def test_sqlite_cache_legacy_index(tmp_path: Path):
+    with Cache(tmp_path) as cache:
+        cache.json["hello"] = "world"
+        foo = cache.get_path("foo")
+        foo.write_text("0")
+        assert cache.has_changed(foo)
+
+    with SqliteCache(tmp_path) as cache:
+        assert cache.json["hello"] == "world"
+        assert not cache.has_changed(foo)
+
+    assert not (tmp_path / "index.json").exists()
+
+
+def test_multi_cache_sqlite(tmp_path: Path):
+    with MultiCache(tmp_path, cache_type=SqliteCache) as cache:
+        cache["foo"].json["hello"] = "world"
+
+    assert cache["foo"].connection is None
+
+    with MultiCache(tmp_path, cache_type=SqliteCache) as cache:
+        cache.preload()
+        assert list(cache) == ["foo"]
+        assert cache["foo"].json["hello"] == "world"
+        cache.clear()
+
+    assert not tmp_path.exists()
+
+
+def test_project_cache_sqlite(tmp_path: Path):
+    with ProjectCache(
+        tmp_path / "cache",
+        tmp_path / "generated",
+        cache_type=SqliteCache,
+    ) as cache:
+        cache["foo"].json["hello"] = "world"
+        cache.generated["bar"].json["hello"] = "world"
+
+    assert isinstance(cache["foo"], SqliteCache)
+    assert cache["foo"].connection is None
+    assert not isinstance(cache.generated["bar"], SqliteCache)
+    assert (tmp_path / "generated" / "bar" / "index.json").is_file()
+
+
+class FileServer(ThreadingHTTPServer):
+    files: Dict[str, bytes]
+    etags: Dict[str, str]
+    requests: List[Dict[str, Any]]
+    unsatisfiable: Dict[str, Callable[[], Any]]
+
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    server: FileServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(
+            {
+                "method": self.command,
+                "path": self.path,
+                "port": self.client_address[1],
+                **self.headers,
+            }
+        )
+
+        if self.headers.get("Range") and (
+            callback := self.server.unsatisfiable.get(self.path)
+        ):
+            callback()
+            self.send_response(416)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", self.path.removeprefix("/redirect"))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = self.server.files[self.path]
+        etag = self.server.etags[self.path]
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start = 0
+        if (r := self.headers.get("Range")) and self.headers.get("If-Range") == etag:
+            start = int(r.removeprefix("bytes=").removesuffix("-"))
+            self.send_response(206)
+        else:
+            self.send_response(200)
+
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def do_POST(self):
+        self.server.requests.append({"method": self.command, "path": self.path})
+        data = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args: Any):
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[FileServer]:
+    with FileServer(("127.0.0.1", 0), FileRequestHandler) as server:
+        server.files = {f"/{i}": f"file {i}".encode() * 1000 for i in range(8)}
+        server.etags = {path: '"v1"' for path in server.files}
+        server.requests = []
+        server.unsatisfiable = {}
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+
+
+def test_download(tmp_path: Path, server: FileServer):
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    with Cache(tmp_path) as cache:
+        path = cache.download(f"{url}/redirect/0")
+        assert path.read_bytes() == server.files["/0"]
+        assert cache.download(f"{url}/redirect/0") == path
+
+    assert len(server.requests) == 2
+    assert server.requests[0]["port"] == server.requests[1]["port"]
+
+
+def test_download_no_proxy(
+    tmp_path: Path,
+    server: FileServer,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setenv("http_proxy", "http://127.0.0.1:9")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    with Cache(tmp_path) as cache:
+        assert cache.download(f"{url}/0").read_bytes() == server.files["/0"]
+        assert cache.download(f"{url}/1").read_bytes() == server.files["/1"]
+
+    assert server.requests[0]["port"] == server.requests[1]["port"]
+
+
+def test_download_revalidate(tmp_path: Path, server: FileServer):
+    url = f"http://127.0.0.1:{server.server_port}/0"
+
+    with Cache(tmp_path) as cache:
+        cache.download(url)
+        cache.timeout(timedelta())
+
+    with Cache(tmp_path) as cache:
+        path = cache.download(url)
+        assert path.read_bytes() == server.files["/0"]
+        assert server.requests[-1]["If-None-Match"] == '"v1"'
+        cache.timeout(timedelta())
+
+    server.files["/0"] = b"changed"
+    server.etags["/0"] = '"v2"'
+
+    with Cache(tmp_path) as cache:
+        path = cache.download(url)
+        assert path.read_bytes() == b"changed"
+        assert cache.download(url) == path
+
+    assert len(server.requests) == 3
+
+
+def test_download_resume(tmp_path: Path, server: FileServer):
+    url = f"http://127.0.0.1:{server.server_port}/1"
+
+    with Cache(tmp_path) as cache:
+        path = cache.get_path(url)
+        path.with_name(path.name + ".part").write_bytes(server.files["/1"][:100])
+        cache.index["downloads"] = {url: {"partial": {"etag": '"v1"'}}}
+
+        assert cache.download(url).read_bytes() == server.files["/1"]
+        assert server.requests[-1]["Range"] == "bytes=100-"
+        assert cache.index["downloads"][url]["etag"] == '"v1"'
+
+
+def test_download_unsatisfiable_range(tmp_path: Path, server: FileServer):
+    url = f"http://127.0.0.1:{server.server_port}/2"
+
+    with Cache(tmp_path) as cache:
+        path = cache.get_path(url)
+        part = path.with_name(path.name + ".part")
+        part.write_bytes(server.files["/2"][:100])
+        server.unsatisfiable["/2"] = part.unlink
+        cache.index["downloads"] = {url: {"partial": {"etag": '"v1"'}}}
+
+        assert cache.download(url).read_bytes() == server.files["/2"]
+        assert server.requests[-2]["Range"] == "bytes=100-"
+        assert "Range" not in server.requests[-1]
+
+
+def test_download_post(tmp_path: Path, server: FileServer):
+    url = f"http://127.0.0.1:{server.server_port}/echo"
+
+    with Cache(tmp_path) as cache:
+        path = cache.download(Request(url, data=b"hello"), tmp_path / "echo")
+        assert path.read_bytes() == b"hello"
+
+    assert server.requests[-1]["method"] == "POST"
+
+
+def test_parallel_downloads(tmp_path: Path, server: FileServer):
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    with Cache(tmp_path) as cache:
+        with cache.parallel_downloads(max_per_host=2):
+            paths = [cache.download(f"{url}{p}") for p in server.files] * 2
+
+        for path, data in zip(paths, list(server.files.values()) * 2):
+            assert path.read_bytes() == data
+
+    assert len(server.requests) == len(server.files)
+    assert len({request["port"] for request in server.requests}) <= 2
@@ -1,8 +1,16 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import pytest
 
 from beet import (
+    BlobStore,
+    Cache,
     BlockTag,
     DataPack,
     Drop,
@@ -14,9 +22,15 @@ from beet import (
     Mcmeta,
     MergePolicy,
     PackQuery,
+    ResourcePack,
+    Sound,
     Structure,
 )
+from beet.contrib.vanilla import ClientJar
+from beet.core.container import compile_match_patterns
 from beet.core.file import TextFile
+from beet.core.utils import clone_file, read_zip_entry
+from beet.library.utils import index_directory, list_files
 
 
 def test_equality():
@@ -146,6 +160,315 @@ def test_context_manager_zipped(tmp_path: Path):
     assert p2 == p1
 
 
+def test_parallel_mount(tmp_path: Path):
+    with DataPack(path=tmp_path / "foobar") as p1:
+        for i in range(20):
+            p1[f"demo{i % 3}:foo{i}"] = Function([f"say {i}"], tags=["minecraft:load"])
+            p1[f"demo{i % 3}:bar{i}"] = LootTable({"pools": [i]})
+        p1.overlays["a"]["demo:thing"] = Function(["say overlay"])
+
+    p2 = DataPack()
+    with p2.parallel_mount(max_workers=4):
+        p2.load(tmp_path / "foobar")
+
+    assert p2.mount_executor is None
+    assert p2 == DataPack(path=tmp_path / "foobar")
+    assert [path for path, _ in p2.list_files()] == [
+        path for path, _ in DataPack(path=tmp_path / "foobar").list_files()
+    ]
+
+
+def test_parallel_mount_zipped(tmp_path: Path):
+    with DataPack(path=tmp_path / "foobar.zip") as p1:
+        for i in range(20):
+            p1[f"demo:foo{i}"] = Function([f"say {i}"])
+
+    p2 = DataPack()
+    with p2.parallel_mount():
+        p2.load(tmp_path / "foobar.zip")
+
+    assert p2 == p1
+    assert list(p2.functions) == list(DataPack(path=tmp_path / "foobar.zip").functions)
+
+
+def test_index_directory(tmp_path: Path):
+    for name in ["a/b.txt", "a.b/c.txt", "a/a/z.txt", "b", "a-b.txt"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(name)
+
+    index = index_directory(tmp_path)
+    assert list(index) == sorted(PurePosixPath(path) for path in list_files(tmp_path))
+    assert index[PurePosixPath("a/b.txt")].st_size == len("a/b.txt")
+
+    with ThreadPoolExecutor(4) as executor:
+        parallel_index = index_directory(tmp_path, executor)
+
+    assert list(parallel_index) == list(index)
+    assert parallel_index == index
+
+
+def test_scope_resolver():
+    resolver = DataPack.namespace_type.get_scope_resolver()
+    assert resolver is DataPack.namespace_type.get_scope_resolver()
+
+    assert resolver.resolve(["function", "a", "b"], "foo.mcfunction") == (
+        Function,
+        "a/b/foo",
+    )
+    assert resolver.resolve(["tags", "function"], "foo.json") == (
+        FunctionTag,
+        "foo",
+    )
+    assert resolver.resolve(["function"], "foo.json") is None
+    assert resolver.resolve(["unknown"], "foo.mcfunction") is None
+
+
+def test_incremental_save(tmp_path: Path):
+    checksums: Dict[str, Any] = {}
+
+    p1 = DataPack("foobar")
+    p1["demo:foo"] = Function(["say foo"])
+    p1["demo:bar"] = Function(["say bar"])
+    p1["demo:nested/thing"] = Function(["say thing"])
+    output_path = p1.save(tmp_path, checksums=checksums)
+
+    assert checksums[str(output_path)].keys() == {
+        "pack.mcmeta",
+        "data/demo/function/foo.mcfunction",
+        "data/demo/function/bar.mcfunction",
+        "data/demo/function/nested/thing.mcfunction",
+    }
+
+    foo = output_path / "data/demo/function/foo.mcfunction"
+    bar = output_path / "data/demo/function/bar.mcfunction"
+    stray = output_path / "data/demo/stray/thing.json"
+    foo_mtime = foo.stat().st_mtime_ns
+    bar.write_text("say modified\n")
+    stray.parent.mkdir()
+    stray.write_text("{}")
+
+    p1.functions["demo:baz"] = Function(["say baz"])
+    del p1.functions["demo:nested/thing"]
+    p1.save(tmp_path, overwrite=True, checksums=checksums)
+
+    assert foo.stat().st_mtime_ns == foo_mtime
+    assert bar.read_text() == "say bar\n"
+    assert not (output_path / "data/demo/function/nested").exists()
+    assert not (output_path / "data/demo/stray").exists()
+    assert "data/demo/function/baz.mcfunction" in checksums[str(output_path)]
+    assert DataPack(path=output_path) == p1
+
+
+def test_incremental_save_source_stat(tmp_path: Path, monkeypatch: Any):
+    source = DataPack()
+    source["demo:foo"] = Function(["say foo"])
+    source.save(tmp_path / "src")
+
+    checksums: Dict[str, Any] = {}
+    p1 = DataPack(path=tmp_path / "src" / source.default_name)
+    output_path = p1.save(tmp_path / "out", checksums=checksums)
+    assert str(output_path) in checksums
+
+    def checksum(self: Any) -> str:
+        raise AssertionError("Expected unchanged source file to be skipped.")
+
+    monkeypatch.setattr(Function, "checksum", checksum)
+    p1.save(tmp_path / "out", overwrite=True, checksums=checksums)
+
+
+def test_parallel_zip(tmp_path: Path):
+    source = tmp_path / "source.mcfunction"
+    source.write_text("say source\n")
+
+    with DataPack(path=tmp_path / "source.zip") as p0:
+        p0["demo:raw"] = Function(["say raw"])
+
+    p1 = DataPack(path=tmp_path / "source.zip")
+    p1.name = "foobar"
+    p1["demo:source"] = Function(source_path=source)
+    for i in range(20):
+        p1[f"demo:foo{19 - i}"] = Function([f"say {i}"] * i)
+
+    serial = p1.save(tmp_path / "serial", zipped=True).read_bytes()
+
+    with ThreadPoolExecutor(4) as executor:
+        first = p1.save(tmp_path / "a", executor=executor).read_bytes()
+        second = p1.save(tmp_path / "b", executor=executor).read_bytes()
+
+    assert first == second == serial
+
+    with ZipFile(tmp_path / "a" / "foobar.zip") as zip_file:
+        assert zip_file.namelist() == [full_path for full_path, _ in p1.list_files()]
+        assert zip_file.testzip() is None
+
+    assert DataPack(path=tmp_path / "a" / "foobar.zip") == p1
+
+
+@pytest.mark.parametrize("compression", ["none", "deflate", "bzip2", "lzma"])
+def test_parallel_zip_compression(tmp_path: Path, compression: Any):
+    p1 = DataPack("foobar", compression=compression)
+    for i in range(20):
+        p1[f"demo:foo{i}"] = Function([f"say {i}"] * i)
+
+    serial = p1.save(tmp_path / "serial", zipped=True).read_bytes()
+
+    with ThreadPoolExecutor(4) as executor:
+        parallel = p1.save(tmp_path / "parallel", zipped=True, executor=executor)
+
+    assert parallel.read_bytes() == serial
+    assert DataPack(path=parallel) == p1
+
+
+def test_parallel_zip_fallback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    with DataPack(path=tmp_path / "source.zip") as p0:
+        p0["demo:raw"] = Function(["say raw"])
+
+    p1 = DataPack(path=tmp_path / "source.zip")
+    p1.name = "foobar"
+    for i in range(20):
+        p1[f"demo:foo{i}"] = Function([f"say {i}"] * i)
+
+    with ThreadPoolExecutor(4) as executor:
+        raw = p1.save(tmp_path / "raw", executor=executor).read_bytes()
+        monkeypatch.setattr("beet.core.utils.ZIP_RAW_WRITE", False)
+        fallback = p1.save(tmp_path / "fallback", executor=executor).read_bytes()
+
+    assert fallback == raw
+
+
+def test_deduplicate(tmp_path: Path):
+    with DataPack(path=tmp_path / "source.zip") as p1:
+        for i in range(10):
+            p1[f"demo:foo{i}"] = Function(["say duplicate"])
+            p1[f"demo:bar{i}"] = Function([f"say {i}"])
+
+    p1 = DataPack(path=tmp_path / "source.zip")
+    assert p1.functions["demo:foo0"].text is not p1.functions["demo:foo9"].text
+
+    blobs = p1.deduplicate()
+    assert p1.functions["demo:foo0"].text is p1.functions["demo:foo9"].text
+    assert blobs.deduplicated == 9 * len("say duplicate\n")
+
+    blobs = BlobStore()
+    blobs.add("say héllo")
+    blobs.add("".join(["say ", "héllo"]))
+    assert blobs.deduplicated == len("say héllo".encode())
+
+    (tmp_path / "a").write_bytes(b"a")
+    reflink = clone_file(tmp_path / "a", tmp_path / "b")
+
+    blobs = BlobStore()
+    output_path = p1.save(tmp_path / "output", zipped=False, blobs=blobs)
+    assert blobs.deduplicated == (9 * len("say duplicate\n") if reflink else 0)
+    assert DataPack(path=output_path) == p1
+
+    foo0 = output_path / "data/demo/function/foo0.mcfunction"
+    foo9 = output_path / "data/demo/function/foo9.mcfunction"
+    assert not foo0.samefile(foo9)
+    foo0.write_text("say changed\n")
+    assert foo9.read_text() == "say duplicate\n"
+
+    blobs = BlobStore()
+    output_path = p1.save(tmp_path / "output", zipped=True, blobs=blobs)
+    assert blobs.deduplicated == 9 * len("say duplicate\n")
+    assert DataPack(path=output_path) == p1
+
+
+def test_deduplicate_source_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    for i in range(4):
+        (tmp_path / f"sound{i}.ogg").write_bytes(b"duplicate" if i % 2 else b"%d" % i)
+
+    p1 = ResourcePack("foobar")
+    for i in range(4):
+        p1[f"demo:sound{i}"] = Sound(source_path=tmp_path / f"sound{i}.ogg")
+    p1["demo:sound4"] = Sound(b"duplicate")
+
+    monkeypatch.setattr("beet.library.base.ZIP_DUMP_WINDOW", 2)
+
+    blobs = BlobStore()
+    output_path = p1.save(tmp_path / "output", zipped=True, blobs=blobs)
+    assert blobs.deduplicated == 2 * len(b"duplicate")
+    serial = p1.save(tmp_path / "serial", zipped=True)
+    assert output_path.read_bytes() == serial.read_bytes()
+    assert all(p1.sounds[f"demo:sound{i}"].source_stat() for i in range(4))
+
+    monkeypatch.setattr("beet.library.base.clone_file", lambda src, dst: False)
+
+    blobs = BlobStore()
+    output_path = p1.save(tmp_path / "output", zipped=False, blobs=blobs)
+    assert blobs.deduplicated == 0
+    assert ResourcePack(path=output_path) == p1
+    assert all(p1.sounds[f"demo:sound{i}"].source_stat() for i in range(4))
+
+
+def test_zip_passthrough(tmp_path: Path):
+    with DataPack(path=tmp_path / "source.zip", compression_level=1) as p1:
+        for i in range(10):
+            p1[f"demo:foo{i}"] = Function([f"say {i} {'a' * i}"] * 100)
+
+    p1 = DataPack(path=tmp_path / "source.zip")
+    p1.functions["demo:foo0"].lines.append("say modified")
+    assert p1.functions["demo:foo1"].text
+    assert p1.functions["demo:foo0"].source_entry is None
+    assert p1.functions["demo:foo1"].source_entry
+
+    with ThreadPoolExecutor(4) as executor:
+        for output_path in [
+            p1.save(tmp_path / "a"),
+            p1.save(tmp_path / "b", executor=executor),
+        ]:
+            assert DataPack(path=output_path) == p1
+
+            with ZipFile(tmp_path / "source.zip") as source, ZipFile(
+                output_path
+            ) as output:
+                for i in range(10):
+                    name = f"data/demo/function/foo{i}.mcfunction"
+                    _, expected = read_zip_entry(source.filename, source.getinfo(name))
+                    _, actual = read_zip_entry(output.filename, output.getinfo(name))
+                    assert (expected == actual) == (i != 0)
+
+    assert p1.save(tmp_path, overwrite=True) == tmp_path / "source.zip"
+    assert DataPack(path=tmp_path / "source.zip") == p1
+
+
+def test_zip_passthrough_changed_source(tmp_path: Path):
+    with DataPack(path=tmp_path / "source.zip") as p1:
+        p1["demo:foo"] = Function(["say original"])
+
+    p1 = DataPack(path=tmp_path / "source.zip")
+    assert p1.functions["demo:foo"].source_entry
+
+    with DataPack(path=tmp_path / "source.zip") as p2:
+        p2.functions["demo:foo"].lines[0] = "say changed"
+
+    output_path = p1.save(tmp_path / "output")
+    assert DataPack(path=output_path).functions["demo:foo"].text == "say original\n"
+
+
+def test_zip_stat_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    with DataPack(path=tmp_path / "source.zip") as p1:
+        for i in range(10):
+            p1[f"demo:foo{i}"] = Function([f"say {i}"])
+        p1.overlays["a"]["demo:thing"] = Function(["say overlay"])
+
+    calls: List[str] = []
+    stat = os.stat
+
+    def counting_stat(path: Any, *args: Any, **kwargs: Any):
+        calls.append(os.fspath(path))
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    p2 = DataPack(path=tmp_path / "source.zip")
+    monkeypatch.undo()
+
+    # Once when checking that the path is a file, and once for the source stamp.
+    assert calls.count(str(tmp_path / "source.zip")) <= 2
+    assert all(f.source_entry for f in p2.functions.values())
+    assert p2.overlays["a"].functions["demo:thing"].source_entry
+
+
 def test_vanilla_compare(minecraft_data_pack: Path):
     assert DataPack(path=minecraft_data_pack) == DataPack(path=minecraft_data_pack)
 
@@ -326,6 +649,40 @@ def test_proxy_match():
     }
 
 
+def test_match_prefix_index():
+    assert compile_match_patterns(("custom:path/to/*", "!custom:path/to/a"))[1] == (
+        "./",
+        "/",
+        "custom:path/to/",
+    )
+    assert compile_match_patterns(("custom:*",))[1] is None
+    assert compile_match_patterns(("/custom:*", "/custom:a*"))[1] == (
+        "./",
+        "/",
+        "custom:",
+    )
+
+    pack = DataPack()
+    pack["custom:path/to/a"] = Function(["say a"])
+    pack["custom:path/to/b"] = Function(["say b"])
+    pack["custom:path/to_b"] = Function(["say b"])
+    pack["x:dir/custom:path/to/c"] = Function(["say c"])
+
+    assert pack.functions.match("custom:path/to/*") == {
+        "custom:path/to/a",
+        "custom:path/to/b",
+    }
+
+    pack["custom:path/to/c"] = Function(["say c"])
+    del pack.functions["custom:path/to/a"]
+
+    assert pack.functions.match("custom:path/to/*", "!c") == {"custom:path/to/b"}
+    assert pack["custom"].functions.match("/path/to/*") == {
+        "path/to/b",
+        "path/to/c",
+    }
+
+
 def test_overload_proxy():
     pack = DataPack()
     pack["demo:foo"] = Function(["say foo"])
@@ -945,3 +1302,64 @@ def test_copy():
     assert p_shallow.overlays["a"].functions["demo:foo"] == Function(["say 1"])
     assert p_shallow.functions["demo:foo"] == Function(["say 2"])
     assert p_shallow["demo"].extra["dank.txt"] == TextFile("ok")
+
+
+def test_vanilla_lazy_client_jar(tmp_path: Path):
+    jar_path = tmp_path / "client.jar"
+
+    with ZipFile(jar_path, "w", ZIP_DEFLATED) as jar:
+        jar.writestr("data/minecraft/tags/block/logs.json", '{"values": ["a"]}')
+        jar.writestr("data/minecraft/function/foo.mcfunction", "say foo\n")
+        jar.writestr("assets/minecraft/lang/en_us.json", '{"a": "b"}')
+
+    cache = Cache(tmp_path / "cache")
+    client_jar = ClientJar(cache, jar_path, lazy=True).mount("data")
+
+    assert not client_jar.assets
+    assert list(client_jar.data.functions) == ["minecraft:foo"]
+
+    directory = cache.get_path(f"{jar_path} vanilla members")
+    assert not directory.exists()
+
+    assert client_jar.data.block_tags["minecraft:logs"].data == {"values": ["a"]}
+    assert sorted(p.name for p in directory.rglob("*") if p.is_file()) == ["logs.json"]
+
+
+def test_vanilla_lazy_client_jar_unsafe_members(tmp_path: Path):
+    jar_path = tmp_path / "client.jar"
+
+    with ZipFile(jar_path, "w", ZIP_DEFLATED) as jar:
+        jar.writestr("data/minecraft/function/foo.mcfunction", "say foo\n")
+        jar.writestr("../../escaped.txt", "escaped")
+        jar.writestr("/absolute.txt", "absolute")
+
+    cache = Cache(tmp_path / "cache")
+    client_jar = ClientJar(cache, jar_path, lazy=True)
+
+    assert list(client_jar.members) == ["data/minecraft/function/foo.mcfunction"]
+
+
+def test_vanilla_content_cache(tmp_path: Path):
+    jar_path = tmp_path / "client.jar"
+
+    with ZipFile(jar_path, "w", ZIP_DEFLATED) as jar:
+        jar.writestr("data/minecraft/tags/block/logs.json", '{"values": ["a"]}')
+        jar.writestr("data/minecraft/tags/block/leaves.json", '{"values": ["b"]}')
+
+    with Cache(tmp_path / "cache") as cache:
+        client_jar = ClientJar(cache, jar_path, lazy=True).mount("data")
+        assert client_jar.data.block_tags["minecraft:logs"].data == {"values": ["a"]}
+
+    directory = cache.get_path(f"{jar_path} vanilla members")
+    shutil.rmtree(directory)
+
+    with Cache(tmp_path / "cache") as cache:
+        client_jar = ClientJar(cache, jar_path, lazy=True).mount("data")
+        assert client_jar.data.block_tags["minecraft:logs"].data == {"values": ["a"]}
+        assert not directory.exists()
+        assert client_jar.data.block_tags["minecraft:leaves"].data == {"values": ["b"]}
+        assert directory.exists()
+
+        reader = client_jar.data.block_tags["minecraft:logs"].reader
+        client_jar.mount("data/minecraft/tags")
+        assert client_jar.data.block_tags["minecraft:logs"].reader is reader
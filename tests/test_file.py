@@ -1,12 +1,14 @@
 import json
 from pathlib import Path
-from typing import List, Literal, Union
+from typing import Any, List, Literal, Union
+from zipfile import ZipFile
 
 import pytest
 from pydantic import BaseModel, RootModel, Field
 from typing_extensions import Annotated
 
-from beet import BinaryFile, JsonFileBase, TextFile
+from beet import BinaryFile, JsonFile, JsonFileBase, TextFile
+from beet.core.utils import JSON_BACKENDS, get_json_backend
 
 
 def test_text_range(tmp_path: Path):
@@ -37,6 +39,27 @@ def test_original(tmp_path: Path):
     assert f.original.ensure_serialized() == "bc"
 
 
+def test_binary_range_dump(tmp_path: Path):
+    p1 = tmp_path / "p1"
+    p1.write_bytes(b"abcdef")
+    f = BinaryFile(source_path=p1, source_start=1, source_stop=4)
+
+    with f.view() as data:
+        assert data == b"bcd"
+    assert f.checksum() == BinaryFile(b"bcd").checksum()
+    assert f == BinaryFile(source_path=p1, source_start=1, source_stop=4)
+
+    f.dump(tmp_path, "p2")
+    assert (tmp_path / "p2").read_bytes() == b"bcd"
+
+    with ZipFile(tmp_path / "p3.zip", "w") as zip_file:
+        f.dump(zip_file, "p3")
+    with ZipFile(tmp_path / "p3.zip") as zip_file:
+        assert zip_file.read("p3") == b"bcd"
+
+    assert f.source_path == p1
+
+
 def test_range_equality(tmp_path: Path):
     p1 = tmp_path / "p1"
     p1.write_text("abc")
@@ -97,3 +120,52 @@ def test_model(data: str):
 def test_copy():
     assert TextFile(source_path="foo.txt").copy().source_path == "foo.txt"
     assert TextFile("hello").copy().text == "hello"
+
+
+def test_copy_on_write():
+    a = JsonFile({"foo": [1]})
+    b = a.copy()
+    assert b.get_content() is a.get_content()
+
+    b.data["foo"].append(2)
+    assert b.data == {"foo": [1, 2]}
+    assert a.data == {"foo": [1]}
+
+    c = a.copy()
+    a.data["foo"].append(3)
+    assert a.data == {"foo": [1, 3]}
+    assert c.data == {"foo": [1]}
+
+
+JSON_VALUES = [
+    {},
+    [],
+    {"a": [1, 2.5, True, False, None], "b": {"c": "d"}},
+    {"z": 1, "a": {"y": [], "b": {}}},
+    {"text": "café ☃ \x7f \x01 \"quoted\" \\ /"},
+    [0.1, 1.0, -0.0, 1e16, 1e-05, 123456789.123, 2**63, 2**70],
+    [1e22, 1e300, -1.5e300, 5e-324, 1.2345678901234568e17],
+    [float("nan"), float("inf"), float("-inf")],
+    {2: "int key", 1: (1, 2)},
+]
+
+
+@pytest.mark.parametrize("backend", list(JSON_BACKENDS))
+@pytest.mark.parametrize("value", JSON_VALUES)
+def test_json_backend(backend: str, value: Any):
+    json_backend = get_json_backend(backend)
+    for indent in [2, 4, None]:
+        for sort_keys in [False, True]:
+            expected = json.dumps(value, indent=indent, sort_keys=sort_keys) + "\n"
+            assert json_backend.dumps(value, indent, sort_keys) == expected
+            assert json_backend.loads(expected) == json.loads(expected)
+
+
+class SortedJsonFile(JsonFile):
+    json_backend = "json"
+    json_sort_keys = True
+
+
+def test_json_file_settings():
+    assert SortedJsonFile({"b": 1, "a": 2}).text == '{\n  "a": 2,\n  "b": 1\n}\n'
+    assert JsonFile({"b": 1, "a": 2}).text == '{\n  "b": 1,\n  "a": 2\n}\n'
@@ -0,0 +1,64 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from beet import Project, ProjectConfig, SubprojectError
+
+
+def create_subprojects(tmp_path: Path, count: int) -> ProjectConfig:
+    for i in range(count):
+        function = tmp_path / f"pack{i}" / "data" / "demo" / "function"
+        function.mkdir(parents=True)
+        (function / "shared.mcfunction").write_text(f"say pack{i}\n")
+        (function / f"only{i}.mcfunction").write_text(f"say only{i}\n")
+
+    return ProjectConfig.model_validate(
+        {
+            "output": "build",
+            "pipeline": [
+                {"name": f"sub{i}", "data_pack": {"load": [f"pack{i}"]}}
+                for i in range(count)
+            ],
+            "meta": {"subprojects": {"independent": True, "max_workers": 2}},
+        }
+    ).resolve(tmp_path)
+
+
+def test_independent_subprojects(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    config = create_subprojects(tmp_path, 3)
+    caplog.set_level(logging.DEBUG, logger="time")
+
+    Project(config).build()
+
+    [data_pack] = (tmp_path / "build").glob("*_data_pack")
+    function = data_pack / "data" / "demo" / "function"
+    assert (function / "shared.mcfunction").read_text() == "say pack2\n"
+    assert sorted(path.name for path in function.iterdir()) == [
+        "only0.mcfunction",
+        "only1.mcfunction",
+        "only2.mcfunction",
+        "shared.mcfunction",
+    ]
+
+    messages = [record.getMessage() for record in caplog.records]
+    for i in range(3):
+        assert any(
+            message.startswith(f'Build subproject "sub{i}" (pipeline entry {i}).')
+            for message in messages
+        )
+
+
+def test_independent_subprojects_error(tmp_path: Path):
+    config = create_subprojects(tmp_path, 2)
+    config.pipeline[1].require.append("broken")
+    (tmp_path / "broken.py").write_text(
+        "def beet_default(ctx):\n    raise ValueError('boom')\n"
+    )
+
+    with pytest.raises(SubprojectError) as exc_info:
+        Project(config).build()
+
+    assert str(exc_info.value) == 'Plugin "broken.beet_default" raised an exception.'
+    assert exc_info.value.remote_traceback
+    assert "ValueError: boom" in exc_info.value.remote_traceback
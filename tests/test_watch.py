@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
+
+import pytest
+
+from beet import Project, ProjectConfig
+from beet.core.watch import DirectoryWatcher
+
+
+def test_negated_pattern_below_ignored_directory(tmp_path: Path):
+    (tmp_path / "build" / "keep").mkdir(parents=True)
+    (tmp_path / "build" / "keep" / "a.txt").write_text("a")
+    (tmp_path / "build" / "b.txt").write_text("b")
+    (tmp_path / "dist").mkdir()
+    (tmp_path / "dist" / "c.txt").write_text("c")
+
+    watcher = DirectoryWatcher(
+        tmp_path,
+        ignore_patterns=["build/", "!build/keep", "dist/"],
+    )
+
+    assert list(watcher.poll()) == [os.path.join("build", "keep", "a.txt")]
+    assert watcher.ignored["dist" + os.sep]
+
+
+def test_ignored_cache_size(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("beet.core.watch.IGNORED_CACHE_SIZE", 4)
+
+    for i in range(10):
+        (tmp_path / f"{i}.txt").write_text("")
+
+    watcher = DirectoryWatcher(tmp_path)
+    assert len(watcher.poll()) == 10
+    assert len(watcher.ignored) <= 4
+
+
+@pytest.mark.parametrize(
+    "meta, backend, expected",
+    [
+        ({}, None, "poll"),
+        ({"watch": {"backend": "auto"}}, None, "auto"),
+        ({"watch": {"backend": "auto"}}, "poll", "poll"),
+    ],
+)
+def test_project_watch_backend(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    meta: Dict[str, Any],
+    backend: Optional[Literal["auto", "inotify", "poll"]],
+    expected: str,
+):
+    backends: List[str] = []
+
+    def create_observer(self: DirectoryWatcher):
+        backends.append(self.backend)
+
+    monkeypatch.setattr(DirectoryWatcher, "create_observer", create_observer)
+
+    (tmp_path / "a.txt").write_text("a")
+    project = Project(ProjectConfig(meta=meta).resolve(tmp_path))
+
+    watcher = project.watch(backend=backend)
+    assert next(watcher) == {"a.txt": "created"}
+    watcher.close()
+    assert backends == [expected]
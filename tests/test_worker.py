@@ -1,6 +1,11 @@
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
 import pytest
 
-from beet import Connection, WorkerError, WorkerPool
+from beet import Connection, Project, ProjectConfig, WorkerError, WorkerPool
 
 
 def worker1(connection: Connection[int, str]):
@@ -55,3 +60,73 @@ def test_error():
 
             assert str(inner.value) == msg
     assert str(outer.value) == msg
+
+
+def test_process_basic():
+    pool = WorkerPool(process=True)
+
+    with pool.handle() as handle:
+        with handle(worker1) as channel1:
+            channel1.send(2)
+            channel1.send(3)
+
+        with handle(worker1) as channel2:
+            channel2.send(4)
+
+    assert list(channel1) == ["0 1", "0 1 2"]
+    assert list(channel2) == ["0 1 2 3"]
+
+
+def test_process_error():
+    msg = 'Worker "tests.test_worker.worker2" raised an exception.'
+
+    with pytest.raises(WorkerError) as outer:
+        with WorkerPool(process=True).handle() as handle:
+            with handle(worker2) as channel:
+                channel.send(None)
+
+            with pytest.raises(WorkerError) as inner:
+                next(channel)
+
+            assert str(inner.value) == msg
+    assert str(outer.value) == msg
+    assert isinstance(outer.value.__cause__, ZeroDivisionError)
+    assert "1 / 0" in str(outer.value.remote_traceback)
+
+
+def worker3(connection: Connection[None, int]):
+    for client in connection:
+        for _ in client:
+            process = multiprocessing.get_context("spawn").Process(target=os.getpid)
+            process.start()
+            process.join()
+            client.send(process.exitcode)
+
+
+def test_process_nested():
+    with WorkerPool(process=True).handle() as handle:
+        with handle(worker3) as channel:
+            channel.send(None)
+
+    assert list(channel) == [0]
+
+
+def test_process_config(tmp_path: Path):
+    config = ProjectConfig(meta={"worker": {"process": True}}).resolve(tmp_path)
+    assert Project(config).worker_pool.process
+    assert not Project(ProjectConfig().resolve(tmp_path)).worker_pool.process
+
+
+def worker4(connection: Connection[None, None]):
+    connection.wait()
+    time.sleep(60)
+
+
+def test_process_terminate(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("beet.toolchain.worker.WORKER_SHUTDOWN_TIMEOUT", 0.5)
+
+    with pytest.raises(WorkerError) as exc_info:
+        with WorkerPool(process=True).handle() as handle:
+            handle(worker4).close()
+
+    assert "exited unexpectedly" in str(exc_info.value.remote_traceback)